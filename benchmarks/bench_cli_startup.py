@@ -0,0 +1,81 @@
+"""
+Benchmark the startup time of the console scripts.
+
+Runs every console script of pyproject.toml with `--help` in a fresh interpreter and
+reports the median wall time, next to a bare interpreter and an import of the SDK
+client the scripts only load once their arguments are parsed. With `--max-ms` it
+exits non-zero when a script is slower, for use as a regression check.
+
+Usage:
+    python benchmarks/bench_cli_startup.py [--repeat 5] [--max-ms 400]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+PYPROJECT = os.path.join(os.path.dirname(__file__), os.pardir, "pyproject.toml")
+
+
+def console_scripts():
+    with open(PYPROJECT, encoding="utf8") as f:
+        text = f.read()
+    section = text.split("[tool.poetry.scripts]", 1)[1].split("\n[", 1)[0]
+    return {
+        name: (module, function)
+        for name, module, function in re.findall(
+            r"^([\w-]+)\s*=\s*'([\w.]+):(\w+)'", section, re.M
+        )
+    }
+
+
+def startup_time(code, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", code], check=True, stdout=subprocess.DEVNULL
+        )
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    results = {
+        "python": startup_time("pass", args.repeat),
+        "import Gift": startup_time("import ibx_sdk.nios.gift", args.repeat),
+    }
+    for name, (module, function) in console_scripts().items():
+        # what the generated console script does
+        code = (
+            f"import sys; sys.argv = ['{name}', '--help']; "
+            f"from {module} import {function}; sys.exit({function}())"
+        )
+        results[name] = startup_time(code, args.repeat)
+
+    slow = []
+    print(f"{'command':<26}{'median':>10}")
+    for name, seconds in results.items():
+        print(f"{name:<26}{seconds * 1000:>8.0f}ms")
+        if (
+            args.max_ms is not None
+            and name not in ("python", "import Gift")
+            and seconds * 1000 > args.max_ms
+        ):
+            slow.append(name)
+    if slow:
+        print(f"slower than {args.max_ms:.0f}ms: {', '.join(slow)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark the import time of the NIOS CSV model package.
+
+Every statement runs in a fresh interpreter. The package import and a single model
+import only build the model modules they need; importing every model module is the
+cost the package import had before it was made lazy.
+
+Usage:
+    python benchmarks/bench_import.py [--repeat 10]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+STATEMENTS = {
+    "python": "pass",
+    "package": "import ibx_sdk.nios.csv",
+    "one model": "from ibx_sdk.nios.csv import HostRecord",
+    "all models": (
+        "import ibx_sdk.nios.csv.dhcp, ibx_sdk.nios.csv.dns, "
+        "ibx_sdk.nios.csv.dns_records, ibx_sdk.nios.csv.other"
+    ),
+}
+
+
+def import_time(statement, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    results = {
+        name: import_time(stmt, args.repeat) for name, stmt in STATEMENTS.items()
+    }
+    baseline = results["all models"]
+    print(f"{'import':<12}{'median':>10}{'vs all':>10}")
+    for name, seconds in results.items():
+        print(f"{name:<12}{seconds * 1000:>8.0f}ms{seconds / baseline:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark sharded multi-process CSV generation against a single process.
+
+Validates and writes host record rows with `validate_many` and `output_to_file` in
+one process, and with `output_to_file_parallel` using a pool of worker processes.
+
+Usage:
+    python benchmarks/bench_parallel.py [--rows 500000] [--workers 4] [--shard 50000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from ibx_sdk.nios.csv.bulk import validate_many
+from ibx_sdk.nios.csv.dns_records import HostRecord
+from ibx_sdk.nios.csv.parallel import output_to_file_parallel
+from ibx_sdk.nios.csv.util import output_to_file
+
+
+def host_rows(count):
+    for i in range(count):
+        yield {
+            "fqdn": f"host{i}.example.com",
+            "view": "default",
+            "addresses": f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}",
+            "configure_for_dns": "true",
+            "EA-Site": f"site{i % 50}",
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--shard", type=int, default=50000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        models = validate_many(HostRecord, host_rows(args.rows)).valid
+        output_to_file(filename="single", data=models, output_dir=tmp)
+        single = time.perf_counter() - start
+        del models
+
+        start = time.perf_counter()
+        output_to_file_parallel(
+            filename="parallel",
+            model=HostRecord,
+            rows=host_rows(args.rows),
+            output_dir=tmp,
+            shard_size=args.shard,
+            max_workers=args.workers,
+        )
+        parallel = time.perf_counter() - start
+
+    print(f"{'rows':<10}{'workers':>8}{'single':>12}{'parallel':>12}{'speedup':>10}")
+    print(
+        f"{args.rows:<10}{args.workers:>8}{single:>11.2f}s{parallel:>11.2f}s"
+        f"{single / parallel:>9.2f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Microbenchmark CSV row serialization per model family.
+
+Compares `model_dump(by_alias=True, exclude_none=True)` with the precomputed
+serialization plan, both as a dict and as a row tuple in header order.
+
+Usage:
+    python benchmarks/bench_serializer.py [--rows 20000] [--repeat 5]
+"""
+
+import argparse
+import timeit
+
+from ibx_sdk.nios.csv.dhcp import IPv4DhcpRange, IPv4Network
+from ibx_sdk.nios.csv.dns import AuthZone
+from ibx_sdk.nios.csv.dns_records import ARecord, HostRecord
+from ibx_sdk.nios.csv.other import NamedACLItem
+from ibx_sdk.nios.csv.serializer import serialization_plan
+
+
+def dhcp_networks(count):
+    items = []
+    for i in range(count):
+        network = IPv4Network(
+            address=f"10.{i >> 8 & 255}.{i & 255}.0",
+            netmask="255.255.255.0",
+            comment="benchmark",
+            dhcp_members=["m1.example.com", "m2.example.com"],
+        )
+        network.add_property("EA-Site", "HQ")
+        items.append(network)
+    return items
+
+
+def dhcp_ranges(count):
+    return [
+        IPv4DhcpRange(
+            start_address=f"10.{i >> 8 & 255}.{i & 255}.10",
+            end_address=f"10.{i >> 8 & 255}.{i & 255}.200",
+            exclusion_ranges=["10.0.0.20-10.0.0.30"],
+        )
+        for i in range(count)
+    ]
+
+
+def dns_zones(count):
+    return [
+        AuthZone(
+            fqdn=f"zone{i}.example.com",
+            zone_format="FORWARD",
+            view="default",
+            grid_primaries=["ns1.example.com/False"],
+        )
+        for i in range(count)
+    ]
+
+
+def dns_a_records(count):
+    return [
+        ARecord(
+            fqdn=f"a{i}.example.com",
+            view="default",
+            address=f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}",
+            ttl=3600,
+        )
+        for i in range(count)
+    ]
+
+
+def dns_host_records(count):
+    return [
+        HostRecord(
+            fqdn=f"host{i}.example.com",
+            view="default",
+            addresses=f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}",
+        )
+        for i in range(count)
+    ]
+
+
+def other_acl_items(count):
+    return [
+        NamedACLItem(parent="acl1", address=f"10.{i >> 8 & 255}.{i & 255}.0/24")
+        for i in range(count)
+    ]
+
+
+CASES = [
+    ("dhcp IPv4Network", dhcp_networks),
+    ("dhcp IPv4DhcpRange", dhcp_ranges),
+    ("dns AuthZone", dns_zones),
+    ("records ARecord", dns_a_records),
+    ("records HostRecord", dns_host_records),
+    ("other NamedACLItem", other_acl_items),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'family / model':<22}{'model_dump':>12}{'plan.dump':>12}{'plan.row':>12}")
+    for name, make_items in CASES:
+        items = make_items(args.rows)
+        plan = serialization_plan(type(items[0]))
+        header = tuple(items[0].model_dump(by_alias=True, exclude_none=True))
+
+        def model_dump():
+            for item in items:
+                item.model_dump(by_alias=True, exclude_none=True)
+
+        def plan_dump():
+            for item in items:
+                plan.dump(item)
+
+        def plan_row():
+            for item in items:
+                plan.row(item, header)
+
+        timings = [
+            min(timeit.repeat(func, number=1, repeat=args.repeat))
+            for func in (model_dump, plan_dump, plan_row)
+        ]
+        print(f"{name:<22}" + "".join(f"{t:>11.3f}s" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
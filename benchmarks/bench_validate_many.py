@@ -0,0 +1,110 @@
+"""
+Benchmark batched validation against per-row model creation.
+
+Compares `Model(**row)` in a loop with `validate_many(Model, rows)` for DNS record and
+DHCP range models.
+
+Usage:
+    python benchmarks/bench_validate_many.py [--rows 50000] [--repeat 3]
+"""
+
+import argparse
+import timeit
+
+from ibx_sdk.nios.csv.bulk import validate_many
+from ibx_sdk.nios.csv.dhcp import IPv4DhcpRange, IPv6DhcpRange
+from ibx_sdk.nios.csv.dns_records import ARecord, HostRecord, MXRecord
+
+
+def a_rows(count):
+    return [
+        {
+            "fqdn": f"a{i}.example.com",
+            "view": "default",
+            "address": f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}",
+            "ttl": "3600",
+            "comment": "benchmark",
+        }
+        for i in range(count)
+    ]
+
+
+def host_rows(count):
+    return [
+        {
+            "fqdn": f"host{i}.example.com",
+            "view": "default",
+            "addresses": f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}",
+            "configure_for_dns": "true",
+        }
+        for i in range(count)
+    ]
+
+
+def mx_rows(count):
+    return [
+        {"fqdn": f"d{i}.example.com", "mx": "mail.example.com", "priority": "10"}
+        for i in range(count)
+    ]
+
+
+def range_rows(count):
+    return [
+        {
+            "start_address": f"10.{i >> 8 & 255}.{i & 255}.10",
+            "end_address": f"10.{i >> 8 & 255}.{i & 255}.200",
+            "network_view": "default",
+            "exclusion_ranges": ["10.0.0.20-10.0.0.30"],
+            "comment": "benchmark",
+        }
+        for i in range(count)
+    ]
+
+
+def ipv6_range_rows(count):
+    return [
+        {
+            "start_address": f"2001:db8:{i:x}::10",
+            "end_address": f"2001:db8:{i:x}::ff",
+            "network_view": "default",
+        }
+        for i in range(count)
+    ]
+
+
+CASES = [
+    ("ARecord", ARecord, a_rows),
+    ("HostRecord", HostRecord, host_rows),
+    ("MXRecord", MXRecord, mx_rows),
+    ("IPv4DhcpRange", IPv4DhcpRange, range_rows),
+    ("IPv6DhcpRange", IPv6DhcpRange, ipv6_range_rows),
+]
+
+
+def per_row(model, rows):
+    return [model(**row) for row in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'model':<16}{'per-row':>12}{'validate_many':>16}{'speedup':>10}")
+    for name, model, make_rows in CASES:
+        rows = make_rows(args.rows)
+        validate_many(model, rows[:10])  # build the cached adapter
+        single = min(
+            timeit.repeat(lambda: per_row(model, rows), number=1, repeat=args.repeat)
+        )
+        batch = min(
+            timeit.repeat(
+                lambda: validate_many(model, rows), number=1, repeat=args.repeat
+            )
+        )
+        print(f"{name:<16}{single:>11.3f}s{batch:>15.3f}s{single / batch:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
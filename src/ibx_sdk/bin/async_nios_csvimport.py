@@ -17,26 +17,17 @@ limitations under the License.
 
 import asyncio
 import getpass
+import logging
 import sys
 from typing import Literal
 
 import click
 from click_option_group import optgroup
 
-from ibx_sdk.logger.ibx_logger import init_logger, increase_log_level
 from ibx_sdk.nios.exceptions import WapiRequestException
-from ibx_sdk.nios.asynchronous.gift import AsyncGift
-
-log = init_logger(
-    logfile_name="wapi.log",
-    logfile_mode="a",
-    console_log=True,
-    level="info",
-    max_size=100000,
-    num_logs=1,
-)
 
-wapi = AsyncGift()
+log = logging.getLogger()
+
 
 help_text = """
 CSV Import Data
@@ -107,6 +98,19 @@ async def main(
         SystemExit: The function exits the system upon completion or upon encounter of an error.
 
     """
+    from ibx_sdk.logger.ibx_logger import init_logger, increase_log_level
+    from ibx_sdk.nios.asynchronous.gift import AsyncGift
+
+    init_logger(
+        logfile_name="wapi.log",
+        logfile_mode="a",
+        console_log=True,
+        level="info",
+        max_size=100000,
+        num_logs=1,
+    )
+    wapi = AsyncGift()
+
     if debug:
         increase_log_level()
 
@@ -16,23 +16,19 @@ limitations under the License.
 """
 
 import getpass
+import logging
 import sys
 
 import click
 from click_option_group import optgroup
 
-from ibx_sdk.logger.ibx_logger import init_logger, increase_log_level
 from ibx_sdk.nios.exceptions import WapiRequestException
-from ibx_sdk.nios.gift import Gift
-
-log = init_logger(
-    logfile_name="wapi.log",
-    logfile_mode="a",
-    console_log=True,
-    level="info",
-    max_size=100000,
-    num_logs=1,
-)
+
+log = logging.getLogger()
+
+
+# created by init_wapi once the arguments are parsed
+wapi = None
 ALGORITHMS = click.Choice(["SHA-256", "SHA-384", "SHA-512"])
 USAGES = click.Choice(
     ["ADMIN", "CAPTIVE_PORTAL", "SFNT_CLIENT_CERT", "IFMAP_DHCP"]
@@ -47,12 +43,36 @@ ALL_USAGES = click.Choice(
         "TAE_CA",
     ]
 )
-wapi = Gift()
 help_text = """
 NIOS SSL Certificate Tools
 """
 
 
+def init_wapi(debug: bool) -> None:
+    """
+    Set up logging and create the WAPI session once a command runs, so the SDK is
+    not imported for `--help` and argument errors.
+
+    Args:
+        debug (bool): If True, it sets the log level to DEBUG.
+    """
+    global wapi
+    from ibx_sdk.logger.ibx_logger import init_logger, increase_log_level
+    from ibx_sdk.nios.gift import Gift
+
+    init_logger(
+        logfile_name="wapi.log",
+        logfile_mode="a",
+        console_log=True,
+        level="info",
+        max_size=100000,
+        num_logs=1,
+    )
+    wapi = Gift()
+    if debug:
+        increase_log_level()
+
+
 @click.group(
     help=help_text,
     context_settings=dict(
@@ -109,8 +129,7 @@ def upload(
     certificate_usage: str,
     debug: bool,
 ):
-    if debug:
-        increase_log_level()
+    init_wapi(debug)
 
     wapi.grid_mgr = grid_mgr
     wapi.wapi_ver = wapi_ver
@@ -174,8 +193,7 @@ def download(
     certificate_usage: str,
     debug: bool,
 ):
-    if debug:
-        increase_log_level()
+    init_wapi(debug)
 
     wapi.grid_mgr = grid_mgr
     wapi.wapi_ver = wapi_ver
@@ -278,8 +296,7 @@ def selfsign(
     san: str,
     debug: bool,
 ):
-    if debug:
-        increase_log_level()
+    init_wapi(debug)
 
     wapi.grid_mgr = grid_mgr
     wapi.wapi_ver = wapi_ver
@@ -400,8 +417,7 @@ def gencsr(
     san: str,
     debug: bool,
 ) -> None:
-    if debug:
-        increase_log_level()
+    init_wapi(debug)
 
     wapi.grid_mgr = grid_mgr
     wapi.wapi_ver = wapi_ver
@@ -1,65 +1,143 @@
-from .dhcp import (
-    NetworkView,
-    IPv4Network,
-    IPv6Network,
-    IPv4SharedNetwork,
-    IPv6SharedNetwork,
-    IPv4NetworkContainer,
-    IPv6NetworkContainer,
-    IPv4OptionSpace,
-    IPv4OptionDefinition,
-    OptionFilter,
-    GridDhcp,
-    DhcpFingerprint,
-    DhcpFingerprintFilter,
-    DhcpMacFilter,
-    MacFilterAddress,
-    MemberDhcp,
-    OptionFilterMatchRule,
-    IPv4DhcpRange,
-    IPv6DhcpRange,
-    DhcpFailoverAssociation,
-    IPv6Optionspace,
-    IPv4FixedAddress,
-    IPv6FixedAddress,
-    IPv6OptionDefinition,
-    RelayAgentFilter,
-)
-from .dns import DnsView, DelegatedZone, AuthZone, ForwardZone, StubZone
-from .dns_records import (
-    HostRecord,
-    ARecord,
-    AAAARecord,
-    CAARecord,
-    CNAMERecord,
-    DNAMERecord,
-    MXRecord,
-    PTRRecord,
-    SRVRecord,
-    NSRecord,
-    TLSARecord,
-    TXTRecord,
-    AliasRecord,
-    NAPTRRecord,
-    Ipv6HostAddress,
-    HostAddress,
-)
-from .other import NamedACL, NamedACLItem
-from .enums import (
-    ZoneFormatTypeEnum,
-    CreatorEnum,
-    TargetRecordTypeEnum,
-    DhcpTypeEnum,
-    IPv6AddressTypeEnum,
-    ProtocolTypeEnum,
-    FingerprintTypeEnum,
-    ServerAssociationTypeEnum,
-    FailoverServerTypeEnum,
-    MatchOptionEnum,
-    LeasePerClientSettingsEnum,
-    ImportActionEnum,
-    HostAddressMatchEnum,
-)
+"""
+NIOS CSV models.
+
+The model classes are imported on first use: `from ibx_sdk.nios.csv import HostRecord`
+only builds the models of `dns_records`, not the other model modules.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .dhcp import (
+        NetworkView,
+        IPv4Network,
+        IPv6Network,
+        IPv4SharedNetwork,
+        IPv6SharedNetwork,
+        IPv4NetworkContainer,
+        IPv6NetworkContainer,
+        IPv4OptionSpace,
+        IPv4OptionDefinition,
+        OptionFilter,
+        GridDhcp,
+        DhcpFingerprint,
+        DhcpFingerprintFilter,
+        DhcpMacFilter,
+        MacFilterAddress,
+        MemberDhcp,
+        OptionFilterMatchRule,
+        IPv4DhcpRange,
+        IPv6DhcpRange,
+        DhcpFailoverAssociation,
+        IPv6Optionspace,
+        IPv4FixedAddress,
+        IPv6FixedAddress,
+        IPv6OptionDefinition,
+        RelayAgentFilter,
+    )
+    from .dns import DnsView, DelegatedZone, AuthZone, ForwardZone, StubZone
+    from .dns_records import (
+        HostRecord,
+        ARecord,
+        AAAARecord,
+        CAARecord,
+        CNAMERecord,
+        DNAMERecord,
+        MXRecord,
+        PTRRecord,
+        SRVRecord,
+        NSRecord,
+        TLSARecord,
+        TXTRecord,
+        AliasRecord,
+        NAPTRRecord,
+        Ipv6HostAddress,
+        HostAddress,
+    )
+    from .other import NamedACL, NamedACLItem
+    from .enums import (
+        ZoneFormatTypeEnum,
+        CreatorEnum,
+        TargetRecordTypeEnum,
+        DhcpTypeEnum,
+        IPv6AddressTypeEnum,
+        ProtocolTypeEnum,
+        FingerprintTypeEnum,
+        ServerAssociationTypeEnum,
+        FailoverServerTypeEnum,
+        MatchOptionEnum,
+        LeasePerClientSettingsEnum,
+        ImportActionEnum,
+        HostAddressMatchEnum,
+    )
+
+# public name to the module defining it
+_LAZY_NAMES = {
+    "NetworkView": "dhcp",
+    "IPv4Network": "dhcp",
+    "IPv6Network": "dhcp",
+    "IPv4SharedNetwork": "dhcp",
+    "IPv6SharedNetwork": "dhcp",
+    "IPv4NetworkContainer": "dhcp",
+    "IPv6NetworkContainer": "dhcp",
+    "IPv4OptionSpace": "dhcp",
+    "IPv4OptionDefinition": "dhcp",
+    "OptionFilter": "dhcp",
+    "GridDhcp": "dhcp",
+    "DhcpFingerprint": "dhcp",
+    "DhcpFingerprintFilter": "dhcp",
+    "DhcpMacFilter": "dhcp",
+    "MacFilterAddress": "dhcp",
+    "MemberDhcp": "dhcp",
+    "OptionFilterMatchRule": "dhcp",
+    "IPv4DhcpRange": "dhcp",
+    "IPv6DhcpRange": "dhcp",
+    "DhcpFailoverAssociation": "dhcp",
+    "IPv6Optionspace": "dhcp",
+    "IPv4FixedAddress": "dhcp",
+    "IPv6FixedAddress": "dhcp",
+    "IPv6OptionDefinition": "dhcp",
+    "RelayAgentFilter": "dhcp",
+    "DnsView": "dns",
+    "DelegatedZone": "dns",
+    "AuthZone": "dns",
+    "ForwardZone": "dns",
+    "StubZone": "dns",
+    "HostRecord": "dns_records",
+    "ARecord": "dns_records",
+    "AAAARecord": "dns_records",
+    "CAARecord": "dns_records",
+    "CNAMERecord": "dns_records",
+    "DNAMERecord": "dns_records",
+    "MXRecord": "dns_records",
+    "PTRRecord": "dns_records",
+    "SRVRecord": "dns_records",
+    "NSRecord": "dns_records",
+    "TLSARecord": "dns_records",
+    "TXTRecord": "dns_records",
+    "AliasRecord": "dns_records",
+    "NAPTRRecord": "dns_records",
+    "Ipv6HostAddress": "dns_records",
+    "HostAddress": "dns_records",
+    "NamedACL": "other",
+    "NamedACLItem": "other",
+    "ZoneFormatTypeEnum": "enums",
+    "CreatorEnum": "enums",
+    "TargetRecordTypeEnum": "enums",
+    "DhcpTypeEnum": "enums",
+    "IPv6AddressTypeEnum": "enums",
+    "ProtocolTypeEnum": "enums",
+    "FingerprintTypeEnum": "enums",
+    "ServerAssociationTypeEnum": "enums",
+    "FailoverServerTypeEnum": "enums",
+    "MatchOptionEnum": "enums",
+    "LeasePerClientSettingsEnum": "enums",
+    "ImportActionEnum": "enums",
+    "HostAddressMatchEnum": "enums",
+}
+# the model modules, which used to be imported with the package
+_MODULES = frozenset(_LAZY_NAMES.values())
 
 __all__ = [
     "NetworkView",
@@ -123,4 +201,19 @@ __all__ = [
     "LeasePerClientSettingsEnum",
     "ImportActionEnum",
     "HostAddressMatchEnum",
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name: str):
+    if name in _MODULES:
+        return import_module(f".{name}", __name__)
+    module = _LAZY_NAMES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,240 @@
+from collections.abc import Iterable, Iterator, Mapping
+from logging import getLogger
+from typing import NamedTuple
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+LOG = getLogger(__name__)
+
+# model class to a cached TypeAdapter(list[model])
+_LIST_ADAPTERS: dict[type, TypeAdapter] = {}
+
+# model class to {field name, alias or CSV column: field name}
+_FIELD_NAMES: dict[type, dict[str, str]] = {}
+# model class to {field name: validation key}, only for models validated by alias
+_VALIDATION_KEYS: dict[type, dict[str, str]] = {}
+# model class to {field name, alias or CSV column: validation key}
+_INPUT_KEYS: dict[type, dict[str, str]] = {}
+
+
+def field_names(model: type[BaseModel]) -> dict[str, str]:
+    """Map every field name, alias and CSV column name of a model to its field name."""
+    names = _FIELD_NAMES.get(model)
+    if names is None:
+        names = {}
+        validation_keys = {}
+        for name, field in model.model_fields.items():
+            names[name] = name
+            for alias in (field.alias, field.serialization_alias):
+                if alias:
+                    names[alias] = name
+            if field.alias and field.alias != name:
+                validation_keys[name] = field.alias
+        _FIELD_NAMES[model] = names
+        _VALIDATION_KEYS[model] = validation_keys
+        _INPUT_KEYS[model] = {
+            key: validation_keys.get(name, name) for key, name in names.items()
+        }
+    return names
+
+
+def validation_keys(model: type[BaseModel]) -> dict[str, str]:
+    """Map the field names of a model that are validated by alias to their alias."""
+    field_names(model)
+    return _VALIDATION_KEYS[model]
+
+
+def to_validation_input(model: type[BaseModel], data: Mapping) -> dict:
+    """Rename the keys of a row so it can be passed to `model_validate`."""
+    field_names(model)
+    keys = _INPUT_KEYS[model]
+    return {keys.get(k, k): v for k, v in data.items()}
+
+
+def construct(model: type[BaseModel], data: Mapping) -> BaseModel:
+    """
+    Create a model from trusted data without validation.
+
+    Keys may be field names, aliases or CSV column names; unknown keys become extra
+    fields on models that allow them (`EA-`, `OPTION-`, `ADMGRP-`, ...). The values must
+    already have the types validation would produce, i.e. `IPv4Address` or
+    `ImportActionEnum` (plain strings write the same CSV), because no conversion takes
+    place.
+
+    Args:
+        model: the model class
+        data: the field values
+
+    Returns:
+        the model instance
+    """
+    names = field_names(model)
+    values = {names.get(k, k): v for k, v in data.items()}
+    return model.model_construct(**values)
+
+
+def construct_many(
+    model: type[BaseModel],
+    rows: Iterable[Mapping],
+    *,
+    validate_every: int = 0,
+) -> Iterator[BaseModel]:
+    """
+    Create models from trusted rows without validation, optionally checking a sample.
+
+    With `validate_every` set to N, every Nth row (starting with the first) is also
+    validated, and its CSV serialization is compared with the one of the unvalidated
+    model, so a source that stopped being trustworthy is caught early.
+
+    Args:
+        model: the model class
+        rows: the field values per row
+        validate_every: validate every Nth row, 0 to never validate
+
+    Yields:
+        the model instances, in row order
+
+    Raises:
+        ValueError: if a sampled row fails validation or serializes differently
+    """
+    names = field_names(model)
+    for index, data in enumerate(rows):
+        item = model.model_construct(
+            **{names.get(k, k): v for k, v in data.items()}
+        )
+        if validate_every and index % validate_every == 0:
+            check_constructed(model, item, data, index)
+        yield item
+
+
+def check_constructed(
+    model: type[BaseModel], item: BaseModel, data: Mapping, index: int = 0
+) -> None:
+    """
+    Validate a row and compare it with the model constructed from it.
+
+    Args:
+        model: the model class
+        item: the model created by `construct`
+        data: the row it was created from
+        index: the row index used in error messages
+
+    Raises:
+        ValueError: if the row fails validation or serializes differently
+    """
+    try:
+        validated = model.model_validate(to_validation_input(model, data))
+    except ValidationError as exc:
+        raise ValueError(f"row {index}: {exc}") from exc
+    expected = validated.model_dump(mode="json", by_alias=True, exclude_none=True)
+    actual = item.model_dump(
+        mode="json", by_alias=True, exclude_none=True, warnings=False
+    )
+    if actual != expected:
+        diff = {
+            key: (actual.get(key), expected.get(key))
+            for key in actual.keys() | expected.keys()
+            if actual.get(key) != expected.get(key)
+        }
+        raise ValueError(
+            f"row {index}: constructed {model.__name__} differs from the validated "
+            f"model (constructed, validated): {diff}"
+        )
+    LOG.debug("row %s: sampled validation of %s passed", index, model.__name__)
+
+
+class BatchValidation(NamedTuple):
+    """
+    The result of `validate_many`.
+
+    Attributes:
+        models: one entry per input row, the validated model or None if the row failed
+        errors: the pydantic error dicts per failed row index, locations relative to
+            the row
+    """
+
+    models: list
+    errors: dict[int, list[dict]]
+
+    @property
+    def valid(self) -> list:
+        """The validated models, without the failed rows."""
+        return [model for model in self.models if model is not None]
+
+
+def list_adapter(model: type[BaseModel]) -> TypeAdapter:
+    """Return the cached `TypeAdapter(list[model])` of a model class."""
+    adapter = _LIST_ADAPTERS.get(model)
+    if adapter is None:
+        adapter = TypeAdapter(list[model])
+        _LIST_ADAPTERS[model] = adapter
+    return adapter
+
+
+def validate_many(
+    model: type[BaseModel],
+    rows: Iterable[Mapping],
+    *,
+    batch_size: int = 10000,
+) -> BatchValidation:
+    """
+    Validate rows into models in batches, collecting the errors of every row.
+
+    Each batch is validated in a single call of a cached `TypeAdapter(list[model])`,
+    which avoids the per-call overhead of creating models one by one. A failing row does
+    not stop the batch: its errors are recorded under its row index and the other rows
+    of the batch are validated again without it.
+
+    Args:
+        model: the model class
+        rows: the field values per row, keyed by field name, alias or CSV column name
+        batch_size: number of rows validated per call
+
+    Returns:
+        the models aligned with the input rows, and the errors per failed row index
+    """
+    adapter = list_adapter(model)
+    field_names(model)
+    keys = _INPUT_KEYS[model]
+    renamed = frozenset(key for key, name in keys.items() if key != name)
+    models = []
+    errors = {}
+
+    def validate_batch(offset: int, batch: list) -> None:
+        try:
+            models.extend(adapter.validate_python(batch))
+            return
+        except ValidationError as exc:
+            failed = {}
+            for error in exc.errors():
+                index, *loc = error["loc"]
+                failed.setdefault(index, []).append({**error, "loc": tuple(loc)})
+        errors.update({offset + index: errs for index, errs in failed.items()})
+        valid = [row for index, row in enumerate(batch) if index not in failed]
+        validated = iter(adapter.validate_python(valid) if valid else [])
+        models.extend(
+            None if index in failed else next(validated)
+            for index in range(len(batch))
+        )
+
+    batch = []
+    offset = 0
+    for row in rows:
+        if renamed.isdisjoint(row):
+            batch.append(row)
+        else:
+            batch.append({keys.get(k, k): v for k, v in row.items()})
+        if len(batch) >= batch_size:
+            validate_batch(offset, batch)
+            offset += len(batch)
+            batch = []
+    if batch:
+        validate_batch(offset, batch)
+    if errors:
+        LOG.warning(
+            "%s of %s %s rows failed validation",
+            len(errors),
+            len(models),
+            model.__name__,
+        )
+    return BatchValidation(models, errors)
@@ -0,0 +1,168 @@
+import os
+from collections.abc import Iterable
+from logging import getLogger
+
+from pydantic import BaseModel
+
+from ..csvtask import CSV_IMPORT_ORDER, csv_import_layer
+from .dhcp import IPv4NetworkContainer, IPv6NetworkContainer
+from .ipindex import to_interval
+from .reader import header_type
+from .util import CsvModelWriter
+
+LOG = getLogger(__name__)
+
+# object type to its position within its layer of CSV_IMPORT_ORDER
+_TYPE_ORDER = {
+    obj_type: position
+    for obj_types in CSV_IMPORT_ORDER
+    for position, obj_type in enumerate(obj_types)
+}
+
+
+def _container_size(item: BaseModel) -> int:
+    try:
+        interval = to_interval(item)
+    except ValueError:
+        return 0
+    return interval.end - interval.start
+
+
+class CsvBundle:
+    """
+    NIOS CSV models of many object types grouped into dependency layers.
+
+    Every object type belongs to a layer of `CSV_IMPORT_ORDER`, i.e. network views
+    before network containers, networks, DHCP ranges and fixed addresses, and DNS
+    views before zones and records. Objects of a layer only reference objects of
+    earlier layers, so each layer can be imported as one large (parallel) job once
+    the previous layer has finished. Unknown object types form the last layer.
+
+    Within a layer, object types keep the order of `CSV_IMPORT_ORDER` and network
+    containers are sorted largest first, so nested containers are created after
+    their parents.
+
+    Args:
+        items: the models, of any object types
+
+    Example:
+        bundle = CsvBundle(network_views + networks + ranges + zones + records)
+        for filename in bundle.write(output_dir="import", import_action="I"):
+            wapi.csv_import(task_operation="CUSTOM", csv_import_file=filename)
+    """
+
+    def __init__(self, items: Iterable[BaseModel] = ()) -> None:
+        # layer to model class to models
+        self._layers: dict[int, dict[type, list[BaseModel]]] = {}
+        self._count = 0
+        self.add_all(items)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, item: BaseModel) -> None:
+        """Add a model to the layer of its object type."""
+        model = type(item)
+        layer = csv_import_layer(header_type(model))
+        self._layers.setdefault(layer, {}).setdefault(model, []).append(item)
+        self._count += 1
+
+    def add_all(self, items: Iterable[BaseModel]) -> None:
+        """Add several models."""
+        for item in items:
+            self.add(item)
+
+    def layers(self) -> list[list[tuple[type[BaseModel], list[BaseModel]]]]:
+        """
+        Return the non-empty layers in import order.
+
+        Every layer is a list of (model class, models) in the order they are
+        imported.
+        """
+        result = []
+        for layer in sorted(self._layers):
+            groups = self._layers[layer]
+            ordered = sorted(
+                groups,
+                key=lambda model: _TYPE_ORDER.get(header_type(model), len(_TYPE_ORDER)),
+            )
+            section = []
+            for model in ordered:
+                items = groups[model]
+                if model in (IPv4NetworkContainer, IPv6NetworkContainer):
+                    items = sorted(items, key=_container_size, reverse=True)
+                section.append((model, items))
+            result.append(section)
+        return result
+
+    def write(
+        self,
+        *,
+        output_dir: str | None = None,
+        file_prefix: str | None = None,
+        import_action: str | None = None,
+    ) -> list[str]:
+        """
+        Write one CSV file per layer, i.e. `layer_01.csv`, `layer_02.csv`, ...
+
+        Every file holds a section with a header row per object type of the layer.
+
+        Args:
+            output_dir: output to a specific directory
+            file_prefix: optional file name prefix
+            import_action: optional import-action added to every row
+
+        Returns:
+            the names of the files written, in import order
+        """
+        files = []
+        for number, layer in enumerate(self.layers(), start=1):
+            name = f"layer_{number:02d}.csv"
+            if file_prefix:
+                name = f"{file_prefix}-{name}"
+            if output_dir:
+                name = os.path.join(output_dir, name)
+            rows = 0
+            with open(name, "w", encoding="utf-8", newline="") as f:
+                for _, items in layer:
+                    with CsvModelWriter(
+                        f, lookahead=None, import_action=import_action
+                    ) as writer:
+                        writer.write_all(items)
+                    rows += writer.rows
+            LOG.info(
+                "Wrote layer %s with %s object types and %s rows to %s",
+                number,
+                len(layer),
+                rows,
+                name,
+            )
+            files.append(name)
+        return files
+
+
+def bundle_csv_models(
+    items: Iterable[BaseModel],
+    *,
+    output_dir: str | None = None,
+    file_prefix: str | None = None,
+    import_action: str | None = None,
+) -> list[str]:
+    """
+    Write models of any object types to one CSV file per dependency layer.
+
+    See `CsvBundle`. Import the files in the returned order, each one after the
+    previous one has finished.
+
+    Args:
+        items: the models
+        output_dir: output to a specific directory
+        file_prefix: optional file name prefix
+        import_action: optional import-action added to every row
+
+    Returns:
+        the names of the files written, in import order
+    """
+    return CsvBundle(items).write(
+        output_dir=output_dir, file_prefix=file_prefix, import_action=import_action
+    )
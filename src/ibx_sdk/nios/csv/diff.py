@@ -0,0 +1,331 @@
+import json
+import os
+from collections.abc import Iterable
+from hashlib import blake2b
+from logging import getLogger
+
+from pydantic import BaseModel
+
+from .enums import ImportActionEnum
+from .reader import header_type, read_csv
+from .serializer import to_dict
+from .util import output_to_file
+
+LOG = getLogger(__name__)
+
+# fields identifying an object per NIOS CSV object type, for types where the default
+# rule of `natural_key_fields` does not apply
+NATURAL_KEYS: dict[str, tuple[str, ...]] = {
+    "hostrecord": ("fqdn", "view"),
+    "ptrrecord": ("fqdn", "address", "dname", "view"),
+    "mxrecord": ("fqdn", "mx", "view"),
+    "nsrecord": ("fqdn", "dname", "view"),
+    "txtrecord": ("fqdn", "text", "view"),
+    "srvrecord": ("fqdn", "priority", "weight", "port", "target", "view"),
+    "caarecord": ("fqdn", "flag", "type", "ca", "view"),
+    "naptrrecord": (
+        "fqdn",
+        "order",
+        "preference",
+        "flags",
+        "services",
+        "regexp",
+        "replacement",
+        "view",
+    ),
+    "tlsarecord": ("named", "certificate_usage", "selector", "matching_type", "view"),
+}
+
+# identity fields used by the default rule, in key order
+_IDENTITY_FIELDS = (
+    "name",
+    "fqdn",
+    "space",
+    "parent",
+    "address",
+    "netmask",
+    "cidr",
+    "start_address",
+    "end_address",
+    "ip_address",
+    "mac_address",
+    "match_value",
+)
+# fields giving the scope of the identity, None means the default view
+_SCOPE_FIELDS = ("view", "network_view")
+_DEFAULT_SCOPE = "default"
+
+# model class to its key fields
+_KEY_FIELDS: dict[type, tuple[str, ...]] = {}
+# model class to the CSV columns of its rename fields, i.e. `_new_fqdn`
+_RENAME_COLUMNS: dict[type, frozenset[str]] = {}
+
+
+def _rename_columns(model: type[BaseModel]) -> frozenset[str]:
+    columns = _RENAME_COLUMNS.get(model)
+    if columns is None:
+        columns = frozenset(
+            field.serialization_alias or field.alias or name
+            for name, field in model.model_fields.items()
+            if name.startswith("new_")
+        )
+        _RENAME_COLUMNS[model] = columns
+    return columns
+
+
+def natural_key_fields(model: type[BaseModel]) -> tuple[str, ...]:
+    """
+    Return the fields that identify an object of a model class.
+
+    Types in `NATURAL_KEYS` use the fields listed there. Other models are identified
+    by their name, fqdn, address or range fields, scoped by their (network) view, i.e.
+    fqdn+view for zones, address+netmask+network_view for networks and
+    ip_address+network_view for fixed addresses.
+    """
+    fields = _KEY_FIELDS.get(model)
+    if fields is None:
+        names = model.model_fields
+        fields = NATURAL_KEYS.get(header_type(model), _IDENTITY_FIELDS + _SCOPE_FIELDS)
+        fields = tuple(name for name in fields if name in names)
+        _KEY_FIELDS[model] = fields
+    return fields
+
+
+def _key_value(name: str, value):
+    if value is None:
+        return _DEFAULT_SCOPE if name in _SCOPE_FIELDS else None
+    if isinstance(value, str):
+        return value.lower() if name in ("fqdn", "dname") else value
+    if isinstance(value, list):
+        return tuple(str(v) for v in value)
+    return str(value)
+
+
+def natural_key(item: BaseModel) -> tuple:
+    """Return the natural key of a model instance, starting with its object type."""
+    model = type(item)
+    values = item.__dict__
+    return (header_type(model),) + tuple(
+        _key_value(name, values[name]) for name in natural_key_fields(model)
+    )
+
+
+def canonical_row(item: BaseModel) -> dict:
+    """
+    Return the canonical CSV row of a model instance as a dict of JSON values.
+
+    The import-action and the rename columns (`_new_*`) are left out, and an empty
+    (network) view counts as the default view, so the row only changes when the object
+    itself does.
+    """
+    row = to_dict(item)
+    row.pop("import-action", None)
+    renames = _rename_columns(type(item))
+    for name in _SCOPE_FIELDS:
+        if name in type(item).model_fields:
+            row.setdefault(name, _DEFAULT_SCOPE)
+    return {
+        column: json.loads(json.dumps(value, default=str))
+        if not isinstance(value, (str, int, float, bool))
+        else value
+        for column, value in row.items()
+        if column not in renames and not column.startswith("_new_")
+    }
+
+
+def row_digest(item: BaseModel) -> bytes:
+    """Return a hash of the canonical CSV row of a model instance."""
+    data = json.dumps(
+        canonical_row(item), sort_keys=True, default=str, separators=(",", ":")
+    )
+    return blake2b(data.encode(), digest_size=16).digest()
+
+
+class CsvDiff:
+    """
+    The difference between a desired and the exported (current) state.
+
+    Attributes:
+        inserts: desired objects missing from the current state
+        changes: desired objects that differ from the current state
+        deletes: current objects missing from the desired state
+        unchanged: the number of objects that are the same in both states
+        modify_action: the import-action used for the changes
+    """
+
+    def __init__(self, modify_action: str = "M") -> None:
+        self.inserts: list[BaseModel] = []
+        self.changes: list[BaseModel] = []
+        self.deletes: list[BaseModel] = []
+        self.unchanged = 0
+        self.modify_action = ImportActionEnum(modify_action)
+
+    def __bool__(self) -> bool:
+        return bool(self.inserts or self.changes or self.deletes)
+
+    def summary(self) -> dict[str, int]:
+        """Return the number of objects per action."""
+        return {
+            "insert": len(self.inserts),
+            "modify": len(self.changes),
+            "delete": len(self.deletes),
+            "unchanged": self.unchanged,
+        }
+
+    def write(
+        self, *, output_dir: str | None = None, file_prefix: str | None = None
+    ) -> list[str]:
+        """
+        Write one CSV file per action and object type, i.e. `insert-hostrecord.csv`.
+
+        Inserts are written with import-action `I`, changes with the modify action and
+        deletes with `D`. Nothing is written for actions without objects.
+
+        Args:
+            output_dir: output to a specific directory
+            file_prefix: optional file name prefix
+
+        Returns:
+            the names of the files written
+        """
+        files = []
+        for action, import_action, items in (
+            ("insert", ImportActionEnum.INSERT, self.inserts),
+            ("modify", self.modify_action, self.changes),
+            ("delete", ImportActionEnum.DELETE, self.deletes),
+        ):
+            by_type: dict[type, list] = {}
+            for item in items:
+                by_type.setdefault(type(item), []).append(item)
+            for model, models in by_type.items():
+                filename = f"{action}-{header_type(model)}"
+                output_to_file(
+                    filename=filename,
+                    data=models,
+                    import_action=import_action.value,
+                    output_dir=output_dir,
+                    file_prefix=file_prefix,
+                )
+                name = f"{filename}.csv"
+                if file_prefix:
+                    name = f"{file_prefix}-{name}"
+                files.append(os.path.join(output_dir, name) if output_dir else name)
+        return files
+
+
+def _merge_unchanged(desired: BaseModel, current: BaseModel) -> bool:
+    wanted = canonical_row(desired)
+    present = canonical_row(current)
+    return all(present.get(column) == value for column, value in wanted.items())
+
+
+def diff_models(
+    desired: Iterable[BaseModel],
+    current: Iterable[BaseModel],
+    *,
+    modify_action: str = "M",
+    delete_types: Iterable[str] | None = None,
+) -> CsvDiff:
+    """
+    Compare a desired state with the current state of the Grid.
+
+    Both states are indexed by the natural key of every object (see `natural_key`) and
+    compared by the digest of their canonical CSV rows, so only new, changed and
+    removed objects end up in the result. Only the desired state is held in memory,
+    with the current state streamed past it.
+
+    With the merge action an object whose digests differ only counts as changed if one
+    of its desired columns differs, because columns missing from a merge row are left
+    as they are, i.e. the defaults a Grid export adds do not cause changes.
+
+    Only current objects of the object types in the desired state are deleted, so a
+    desired list of host records compared with a global export does not delete the
+    networks, zones and views of the Grid.
+
+    Args:
+        desired: the models of the desired state
+        current: the models of the current state, i.e. read from a CSV export
+        modify_action: import-action for changed objects, `M` (merge) keeps fields
+            missing from the desired row, `O` (override) clears them
+        delete_types: the object types to delete missing objects of, i.e.
+            `["arecord"]`, defaults to the object types of the desired state
+
+    Returns:
+        the inserts, changes and deletes
+    """
+    result = CsvDiff(modify_action)
+    wanted: dict[tuple, tuple[bytes, BaseModel]] = {}
+    desired_models = set()
+    for item in desired:
+        key = natural_key(item)
+        if key in wanted:
+            LOG.warning("duplicate desired object %s, keeping the last one", key)
+        wanted[key] = (row_digest(item), item)
+        desired_models.add(type(item))
+    if delete_types is None:
+        deletable = {header_type(model) for model in desired_models}
+    else:
+        deletable = {
+            obj_type.lower().removeprefix("header-") for obj_type in delete_types
+        }
+    # model class to whether missing objects of it are deleted
+    deletes: dict[type, bool] = {}
+
+    merge = result.modify_action in (
+        ImportActionEnum.MERGE,
+        ImportActionEnum.INSERT_MERGE,
+    )
+    seen = set()
+    for item in current:
+        key = natural_key(item)
+        if key in seen:
+            LOG.warning("duplicate current object %s", key)
+            continue
+        seen.add(key)
+        entry = wanted.get(key)
+        if entry is None:
+            model = type(item)
+            if model not in deletes:
+                deletes[model] = header_type(model) in deletable
+            if deletes[model]:
+                result.deletes.append(item)
+        elif entry[0] == row_digest(item) or (
+            merge and _merge_unchanged(entry[1], item)
+        ):
+            result.unchanged += 1
+        else:
+            result.changes.append(entry[1])
+
+    result.inserts.extend(
+        item for key, (_, item) in wanted.items() if key not in seen
+    )
+    LOG.info("CSV diff: %s", result.summary())
+    return result
+
+
+def diff_csv_files(
+    desired_file: str,
+    current_file: str,
+    *,
+    modify_action: str = "M",
+    delete_types: Iterable[str] | None = None,
+) -> CsvDiff:
+    """
+    Compare two NIOS CSV files, i.e. a generated import file and a Grid CSV export.
+
+    Args:
+        desired_file: CSV file of the desired state
+        current_file: CSV file of the current state
+        modify_action: import-action for changed objects
+        delete_types: the object types to delete missing objects of, defaults to
+            the object types of the desired file
+
+    Returns:
+        the inserts, changes and deletes
+    """
+    return diff_models(
+        read_csv(desired_file),
+        read_csv(current_file),
+        modify_action=modify_action,
+        delete_types=delete_types,
+    )
@@ -0,0 +1,131 @@
+import sys
+import typing
+from collections.abc import Iterable, Iterator, Mapping
+from logging import getLogger
+
+from pydantic import BaseModel
+
+LOG = getLogger(__name__)
+
+
+class ExtraColumns:
+    """
+    Sparse store of the extra columns (`EA-`, `OPTION-`, `ADMGRP-`, ...) of a dataset.
+
+    Instead of one extras dict per model instance, every column is stored once as
+    {row id: value}, so a row only costs an entry in the columns it has a value for,
+    and the columns of a dataset are known without scanning its rows. Column names and
+    string values are interned. One store can be shared by the `ModelTable`s of a
+    dataset; every table row gets a row id with `new_row`.
+
+    Args:
+        intern: intern string values
+
+    Example:
+        extras = ExtraColumns()
+        hosts = ModelTable(HostRecord, extras=extras)
+        zones = ModelTable(AuthZone, extras=extras)
+        ...
+        print(extras.header(prefix="EA-"))
+    """
+
+    __slots__ = ("intern", "_columns", "_rows")
+
+    def __init__(self, *, intern: bool = True) -> None:
+        self.intern = intern
+        self._columns: dict[str, dict[int, typing.Any]] = {}
+        self._rows = 0
+
+    def __len__(self) -> int:
+        return len(self._columns)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._columns)
+
+    def __contains__(self, column: str) -> bool:
+        return column in self._columns
+
+    @property
+    def rows(self) -> int:
+        """The number of row ids handed out by `new_row`."""
+        return self._rows
+
+    def new_row(self) -> int:
+        """Return the id of a new row."""
+        row = self._rows
+        self._rows += 1
+        return row
+
+    def set(self, row: int, column: str, value: typing.Any) -> None:
+        """Set the value of a column for a row, None removes it."""
+        values = self._columns.get(column)
+        if value is None:
+            if values is not None:
+                values.pop(row, None)
+            return
+        if values is None:
+            values = self._columns[sys.intern(column)] = {}
+        if self.intern and type(value) is str:
+            value = sys.intern(value)
+        values[row] = value
+
+    def update(self, row: int, values: Mapping) -> None:
+        """Set the values of several columns for a row."""
+        for column, value in values.items():
+            self.set(row, column, value)
+
+    def get(self, row: int, column: str, default: typing.Any = None) -> typing.Any:
+        """Return the value of a column for a row."""
+        values = self._columns.get(column)
+        if values is None:
+            return default
+        return values.get(row, default)
+
+    def row(self, row: int) -> dict:
+        """Return the values of a row by column, in column order."""
+        return {
+            column: values[row]
+            for column, values in self._columns.items()
+            if row in values
+        }
+
+    def column(self, column: str) -> Mapping[int, typing.Any]:
+        """Return the values of a column by row id."""
+        return self._columns.get(column, {})
+
+    def count(self, column: str) -> int:
+        """Return the number of rows with a value for a column."""
+        return len(self._columns.get(column, ()))
+
+    def header(self, prefix: str | None = None) -> list:
+        """
+        Return the columns with at least one value, in the order they were added.
+
+        Args:
+            prefix: only columns starting with this prefix, i.e. `EA-`
+        """
+        return [
+            column
+            for column, values in self._columns.items()
+            if values and (prefix is None or column.startswith(prefix))
+        ]
+
+    def add_model(self, item: BaseModel) -> int:
+        """
+        Store the extras of a model instance as a new row.
+
+        Args:
+            item: the model instance
+
+        Returns:
+            the row id
+        """
+        row = self.new_row()
+        extra = item.__pydantic_extra__
+        if extra:
+            self.update(row, extra)
+        return row
+
+    def add_models(self, items: Iterable[BaseModel]) -> list[int]:
+        """Store the extras of model instances, returning their row ids."""
+        return [self.add_model(item) for item in items]
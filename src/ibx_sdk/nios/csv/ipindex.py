@@ -0,0 +1,365 @@
+import ipaddress
+from bisect import bisect_right
+from collections.abc import Iterable
+from logging import getLogger
+from typing import NamedTuple
+
+from pydantic import BaseModel
+
+from .dhcp import (
+    IPv4DhcpRange,
+    IPv4FixedAddress,
+    IPv4Network,
+    IPv4NetworkContainer,
+    IPv6DhcpRange,
+    IPv6FixedAddress,
+    IPv6Network,
+    IPv6NetworkContainer,
+)
+
+LOG = getLogger(__name__)
+
+NETWORK = "network"
+CONTAINER = "container"
+RANGE = "range"
+FIXED_ADDRESS = "fixedaddress"
+
+# model class to (kind, IP version)
+_KINDS = {
+    IPv4Network: (NETWORK, 4),
+    IPv6Network: (NETWORK, 6),
+    IPv4NetworkContainer: (CONTAINER, 4),
+    IPv6NetworkContainer: (CONTAINER, 6),
+    IPv4DhcpRange: (RANGE, 4),
+    IPv6DhcpRange: (RANGE, 6),
+    IPv4FixedAddress: (FIXED_ADDRESS, 4),
+    IPv6FixedAddress: (FIXED_ADDRESS, 6),
+}
+
+
+class Interval(NamedTuple):
+    """An object of the IP address space as an inclusive range of integers."""
+
+    start: int
+    end: int
+    kind: str
+    version: int
+    index: int
+    item: BaseModel
+
+    def __str__(self) -> str:
+        address = ipaddress.IPv4Address if self.version == 4 else ipaddress.IPv6Address
+        start, end = address(self.start), address(self.end)
+        if self.kind in (NETWORK, CONTAINER):
+            network = next(ipaddress.summarize_address_range(start, end))
+            return f"{self.kind} {network}"
+        if self.kind == RANGE:
+            return f"range {start}-{end}"
+        return f"fixedaddress {start}"
+
+
+class IPViolation(NamedTuple):
+    """
+    A containment or overlap problem found by `IPIndex.validate`.
+
+    Attributes:
+        kind: the type of problem, i.e. `network-overlap` or `range-outside-network`
+        network_view: the network view of the objects
+        interval: the object with the problem
+        other: the object it conflicts with, if any
+        message: a readable description
+    """
+
+    kind: str
+    network_view: str
+    interval: Interval
+    other: Interval | None
+    message: str
+
+
+def to_interval(item: BaseModel, index: int = 0) -> Interval | None:
+    """
+    Convert a network, network container, DHCP range or fixed address to an interval.
+
+    Returns None for objects without addresses, i.e. IPv6 prefix delegations.
+
+    Raises:
+        ValueError: if the object is not an IP address model or its network is invalid
+    """
+    kind, version = _KINDS[type(item)]
+    if kind in (NETWORK, CONTAINER):
+        if version == 4:
+            network = ipaddress.IPv4Network((item.address, str(item.netmask)))
+        else:
+            network = ipaddress.IPv6Network((item.address, item.cidr))
+        start = int(network.network_address)
+        end = int(network.broadcast_address)
+        return Interval(start, end, kind, version, index, item)
+    if kind == RANGE:
+        if item.start_address is None or item.end_address is None:
+            return None
+        return Interval(
+            int(item.start_address), int(item.end_address), kind, version, index, item
+        )
+    if item.ip_address is None:
+        return None
+    address = int(item.ip_address)
+    return Interval(address, address, kind, version, index, item)
+
+
+class IPIndex:
+    """
+    Sorted interval index of the IP address space objects of a NIOS CSV dataset.
+
+    Networks, network containers, DHCP ranges and fixed addresses, IPv4 and IPv6, are
+    indexed per network view (an empty network view is the default view). `validate`
+    sorts every index once and finds containment and overlap problems with sweeps and
+    binary searches, so a dataset of n objects is checked in O(n log n):
+
+    - `invalid-network`: the address has host bits set or the netmask is invalid
+    - `duplicate-network`: two networks or containers with the same address
+    - `network-overlap`: a network inside another network
+    - `container-in-network`: a container inside a network
+    - `range-outside-network`: a DHCP range not inside a single network
+    - `range-overlap`: two DHCP ranges overlap
+    - `range-network-address`: an IPv4 range includes the network or broadcast address
+    - `fixedaddress-outside-network`: a fixed address in no network
+    - `fixedaddress-in-range`: a fixed address inside a DHCP range, only reported with
+      `fixed_in_range=True` since NIOS allows fixed addresses inside ranges
+
+    Example:
+        index = IPIndex(networks + ranges + fixed_addresses)
+        for violation in index.validate():
+            print(violation.message)
+    """
+
+    def __init__(self, items: Iterable[BaseModel] = ()) -> None:
+        # (network view, version) to kind to intervals
+        self._intervals: dict[tuple[str, int], dict[str, list[Interval]]] = {}
+        self._invalid: list[IPViolation] = []
+        self._count = 0
+        self._sorted = True
+        # (network view, version) to the start addresses of its networks
+        self._network_starts: dict[tuple[str, int], list[int]] = {}
+        self.add_all(items)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, item: BaseModel) -> None:
+        """
+        Add a network, network container, DHCP range or fixed address.
+
+        Raises:
+            TypeError: for other models
+        """
+        if type(item) not in _KINDS:
+            raise TypeError(f"{type(item).__name__} is not an IP address space model")
+        index = self._count
+        self._count += 1
+        network_view = item.network_view or "default"
+        try:
+            interval = to_interval(item, index)
+        except ValueError as exc:
+            kind, version = _KINDS[type(item)]
+            self._invalid.append(
+                IPViolation(
+                    "invalid-network",
+                    network_view,
+                    Interval(0, 0, kind, version, index, item),
+                    None,
+                    f"invalid {kind} {item.address}: {exc}",
+                )
+            )
+            return
+        if interval is None:
+            return
+        views = self._intervals.setdefault((network_view, interval.version), {})
+        views.setdefault(interval.kind, []).append(interval)
+        self._sorted = False
+
+    def add_all(self, items: Iterable[BaseModel]) -> None:
+        """Add several objects, skipping models that are not IP address space models."""
+        for item in items:
+            if type(item) in _KINDS:
+                self.add(item)
+
+    def _sort(self) -> None:
+        if self._sorted:
+            return
+        for kinds in self._intervals.values():
+            for intervals in kinds.values():
+                intervals.sort(key=lambda i: (i.start, -i.end, i.index))
+        self._network_starts = {
+            key: [network.start for network in kinds.get(NETWORK, [])]
+            for key, kinds in self._intervals.items()
+        }
+        self._sorted = True
+
+    def network_views(self) -> list[str]:
+        """Return the network views with objects."""
+        return sorted({view for view, _ in self._intervals})
+
+    def find_network(
+        self,
+        address: str | ipaddress.IPv4Address | ipaddress.IPv6Address,
+        network_view: str = "default",
+    ) -> BaseModel | None:
+        """Return the network containing an address, or None."""
+        address = ipaddress.ip_address(address)
+        self._sort()
+        key = (network_view, address.version)
+        networks = self._intervals.get(key, {}).get(NETWORK, [])
+        found = _containing(networks, self._network_starts.get(key, []), int(address))
+        return found.item if found else None
+
+    def validate(self, *, fixed_in_range: bool = False) -> list[IPViolation]:
+        """
+        Return every containment and overlap problem, ordered by network view.
+
+        Args:
+            fixed_in_range: also report fixed addresses inside DHCP ranges
+        """
+        self._sort()
+        violations = list(self._invalid)
+        for (network_view, version), kinds in sorted(self._intervals.items()):
+            violations.extend(
+                _validate_view(network_view, version, kinds, fixed_in_range)
+            )
+        if violations:
+            LOG.warning("found %s IP address space problems", len(violations))
+        return violations
+
+
+def _containing(
+    intervals: list[Interval], starts: list[int], start: int, end: int | None = None
+) -> Interval | None:
+    """Return the interval containing [start, end] from non-overlapping intervals."""
+    position = bisect_right(starts, start) - 1
+    if position < 0:
+        return None
+    found = intervals[position]
+    if found.end >= (start if end is None else end):
+        return found
+    return None
+
+
+def _validate_view(
+    network_view: str,
+    version: int,
+    kinds: dict[str, list[Interval]],
+    fixed_in_range: bool,
+) -> list[IPViolation]:
+    violations = []
+
+    def report(kind: str, interval: Interval, other: Interval | None, text: str):
+        violations.append(
+            IPViolation(kind, network_view, interval, other, f"{network_view}: {text}")
+        )
+
+    networks = kinds.get(NETWORK, [])
+    # CIDR blocks are either nested or disjoint, so a sweep over the blocks sorted by
+    # start address and size finds every block inside a network
+    blocks = sorted(
+        networks + kinds.get(CONTAINER, []),
+        key=lambda i: (i.start, -i.end, i.kind != CONTAINER, i.index),
+    )
+    # the networks and containers enclosing the current block, innermost last
+    stack: list[Interval] = []
+    # the networks that do not overlap an earlier one, for the containment lookups
+    valid_networks = []
+    for block in blocks:
+        while stack and stack[-1].end < block.start:
+            stack.pop()
+        parent = stack[-1] if stack else None
+        if parent is None:
+            stack.append(block)
+        elif parent.start == block.start and parent.end == block.end:
+            report("duplicate-network", block, parent, f"{block} duplicates {parent}")
+            continue
+        elif parent.kind == NETWORK:
+            if block.kind == NETWORK:
+                kind = "network-overlap"
+            else:
+                kind = "container-in-network"
+            report(kind, block, parent, f"{block} is inside {parent}")
+            continue
+        else:
+            stack.append(block)
+        if block.kind == NETWORK:
+            valid_networks.append(block)
+    starts = [network.start for network in valid_networks]
+
+    ranges = kinds.get(RANGE, [])
+    previous = None
+    for interval in ranges:
+        network = _containing(valid_networks, starts, interval.start, interval.end)
+        if network is None:
+            report(
+                "range-outside-network",
+                interval,
+                None,
+                f"{interval} is not inside a single network",
+            )
+        elif version == 4 and network.end - network.start > 1 and (
+            interval.start == network.start or interval.end == network.end
+        ):
+            report(
+                "range-network-address",
+                interval,
+                network,
+                f"{interval} includes the network or broadcast address of {network}",
+            )
+        if previous is not None and interval.start <= previous.end:
+            report(
+                "range-overlap", interval, previous, f"{interval} overlaps {previous}"
+            )
+        if previous is None or interval.end > previous.end:
+            previous = interval
+
+    range_starts = [interval.start for interval in ranges]
+    # the highest end address of the ranges up to every position
+    range_ends = []
+    for interval in ranges:
+        range_ends.append(max(interval.end, range_ends[-1] if range_ends else -1))
+    for interval in kinds.get(FIXED_ADDRESS, []):
+        if _containing(valid_networks, starts, interval.start) is None:
+            report(
+                "fixedaddress-outside-network",
+                interval,
+                None,
+                f"{interval} is not inside a network",
+            )
+        if not fixed_in_range:
+            continue
+        position = bisect_right(range_starts, interval.start) - 1
+        while position >= 0 and range_ends[position] >= interval.start:
+            candidate = ranges[position]
+            if candidate.end >= interval.start:
+                report(
+                    "fixedaddress-in-range",
+                    interval,
+                    candidate,
+                    f"{interval} is inside {candidate}",
+                )
+                break
+            position -= 1
+    return violations
+
+
+def validate_ip_space(
+    items: Iterable[BaseModel], *, fixed_in_range: bool = False
+) -> list[IPViolation]:
+    """
+    Check the networks, containers, DHCP ranges and fixed addresses of a dataset.
+
+    Models of other types are ignored, so a whole dataset can be passed.
+
+    Args:
+        items: the models
+        fixed_in_range: also report fixed addresses inside DHCP ranges
+
+    Returns:
+        every containment and overlap problem, see `IPIndex`
+    """
+    return IPIndex(items).validate(fixed_in_range=fixed_in_range)
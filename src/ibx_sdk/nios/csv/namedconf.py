@@ -0,0 +1,450 @@
+import os
+import re
+from collections.abc import Iterator
+from logging import getLogger
+from typing import NamedTuple
+
+from pydantic import BaseModel
+
+from .dns import AuthZone, DnsView, ForwardZone, StubZone, get_zone_format
+from .other import NamedACL, NamedACLItem
+from .reader import header_type
+from .util import output_to_file
+
+LOG = getLogger(__name__)
+
+_TOKENS = re.compile(
+    r"""
+    (?P<skip>\s+|//[^\n]*|\#[^\n]*|/\*.*?\*/)
+    | "(?P<string>(?:[^"\\]|\\.)*)"
+    | (?P<punct>[{};])
+    | (?P<word>[^\s{};"]+)
+    """,
+    re.S | re.X,
+)
+
+# built-in address match list elements, as NIOS ACL addresses
+_BUILTIN_ACLS = {"any": "Any", "none": "Any"}
+
+# (path, modification time, size) to the parsed statements of a file
+_INCLUDE_CACHE: dict[tuple[str, float, int], list["Statement"]] = {}
+
+
+class Statement(NamedTuple):
+    """
+    A named.conf statement, i.e. `zone "example.com" { type primary; };`.
+
+    Attributes:
+        keyword: the first word, i.e. zone
+        args: the other words and strings before the block or the semicolon
+        block: the statements inside braces, None for a statement without braces
+    """
+
+    keyword: str
+    args: tuple[str, ...]
+    block: list["Statement"] | None
+
+    def get(self, keyword: str) -> "Statement | None":
+        """Return the first statement of the block with a keyword, or None."""
+        for statement in self.block or ():
+            if statement.keyword == keyword:
+                return statement
+        return None
+
+    def value(self, keyword: str) -> str | None:
+        """Return the first argument of a statement of the block, or None."""
+        statement = self.get(keyword)
+        return statement.args[0] if statement and statement.args else None
+
+    def elements(self, keyword: str) -> list[str] | None:
+        """Return the elements of a list statement of the block, or None."""
+        statement = self.get(keyword)
+        if statement is None or statement.block is None:
+            return None
+        return [" ".join((s.keyword, *s.args)) for s in statement.block]
+
+
+def tokenize(text: str) -> Iterator[tuple[str, str]]:
+    """
+    Split named.conf text into (kind, value) tokens.
+
+    Comments (`//`, `#` and `/* */`) are dropped; kinds are string, punct and word.
+    """
+    for match in _TOKENS.finditer(text):
+        kind = match.lastgroup
+        if kind != "skip":
+            yield kind, match.group(kind)
+
+
+def _parse_block(tokens: Iterator[tuple[str, str]], name: str) -> list[Statement]:
+    statements = []
+    words = []
+    block = None
+    for kind, value in tokens:
+        if kind == "punct":
+            if value == "{":
+                block = _parse_block(tokens, name)
+                continue
+            if value == "}":
+                if words:
+                    raise ValueError(f"{name}: missing ; after {' '.join(words)}")
+                return statements
+            if words:
+                statements.append(Statement(words[0], tuple(words[1:]), block))
+            words = []
+            block = None
+        else:
+            words.append(value)
+    if words:
+        raise ValueError(f"{name}: missing ; after {' '.join(words)}")
+    return statements
+
+
+def _resolve(include: str, chroot: str, base_dir: str) -> str:
+    if include.startswith("/"):
+        return os.path.join(chroot, include.lstrip("/")) if chroot else include
+    return os.path.join(base_dir, include)
+
+
+def parse_named_conf(
+    filename: str, *, chroot: str = "", _stack: tuple[str, ...] = ()
+) -> list[Statement]:
+    """
+    Parse a named.conf file into statements, expanding include statements.
+
+    Every file is read and tokenized in one go with a regular expression. The parsed
+    statements of every file are cached by path, modification time and size, so files
+    included many times, i.e. a zones file included in every view, are only parsed once.
+
+    Args:
+        filename: the named.conf file
+        chroot: the chroot directory absolute include paths are relative to
+        _stack: the files being included, to detect include loops
+
+    Returns:
+        the top level statements
+
+    Raises:
+        ValueError: if the file has a syntax error or an include loop
+        FileNotFoundError: if the file does not exist
+    """
+    path = os.path.abspath(filename)
+    if path in _stack:
+        raise ValueError(f"include loop: {' -> '.join((*_stack, path))}")
+    info = os.stat(path)
+    key = (path, info.st_mtime, info.st_size)
+    statements = _INCLUDE_CACHE.get(key)
+    if statements is None:
+        LOG.info("parsing %s", path)
+        with open(path, encoding="utf8") as f:
+            statements = _parse_block(tokenize(f.read()), path)
+        _INCLUDE_CACHE[key] = statements
+    return list(_expand(statements, chroot, os.path.dirname(path), (*_stack, path)))
+
+
+def _expand(
+    statements: list[Statement], chroot: str, base_dir: str, stack: tuple[str, ...]
+) -> Iterator[Statement]:
+    for statement in statements:
+        if statement.keyword == "include" and statement.args:
+            include = _resolve(statement.args[0], chroot, base_dir)
+            if not os.path.exists(include):
+                LOG.error("%s include file does not exist!", include)
+                continue
+            yield from parse_named_conf(include, chroot=chroot, _stack=stack)
+        elif statement.block:
+            block = list(_expand(statement.block, chroot, base_dir, stack))
+            yield statement._replace(block=block)
+        else:
+            yield statement
+
+
+def clear_include_cache() -> None:
+    """Forget the parsed include files."""
+    _INCLUDE_CACHE.clear()
+
+
+def acl_address(element: str) -> str | None:
+    """
+    Convert an address match list element to a NIOS `address/Allow|Deny` value.
+
+    `none` matches no address, so `!none` never applies; None is returned for it
+    instead of an `Any/Allow` that would allow every address.
+    """
+    permission = "Allow"
+    if element.startswith("!"):
+        permission = "Deny"
+        element = element[1:].strip()
+    if element.lower() in _BUILTIN_ACLS:
+        if element.lower() == "none":
+            if permission == "Deny":
+                LOG.warning("skipping !none, not supported by NIOS")
+                return None
+            permission = "Deny"
+        element = _BUILTIN_ACLS[element.lower()]
+    return f"{element}/{permission}"
+
+
+class NamedConfModels:
+    """
+    The NIOS CSV models built from a named.conf file.
+
+    Attributes:
+        views: DnsView models
+        acls: NamedACL models
+        acl_items: NamedACLItem models
+        auth_zones: AuthZone models of primary and secondary zones, the primaries
+            of secondary zones become external primaries
+        forward_zones: ForwardZone models
+        stub_zones: StubZone models
+        zone_files: (zone file, zone name, view) of the primary zones, i.e. for
+            `zones_to_csv`
+        skipped: the number of zones skipped per zone type, i.e. hint zones
+    """
+
+    def __init__(self) -> None:
+        self.views: list[DnsView] = []
+        self.acls: list[NamedACL] = []
+        self.acl_items: list[NamedACLItem] = []
+        self.auth_zones: list[AuthZone] = []
+        self.forward_zones: list[ForwardZone] = []
+        self.stub_zones: list[StubZone] = []
+        self.zone_files: list[tuple[str, str, str | None]] = []
+        self.skipped: dict[str, int] = {}
+
+    def models(self) -> Iterator[BaseModel]:
+        """Yield all models, views and ACLs before the zones that use them."""
+        for items in (
+            self.acls,
+            self.acl_items,
+            self.views,
+            self.auth_zones,
+            self.forward_zones,
+            self.stub_zones,
+        ):
+            yield from items
+
+    def write(
+        self,
+        *,
+        output_dir: str | None = None,
+        file_prefix: str | None = None,
+        import_action: str | None = None,
+    ) -> list[str]:
+        """
+        Write one CSV file per object type, i.e. `authzone.csv`.
+
+        Returns:
+            the names of the files written
+        """
+        files = []
+        for items in (
+            self.acls,
+            self.acl_items,
+            self.views,
+            self.auth_zones,
+            self.forward_zones,
+            self.stub_zones,
+        ):
+            if not items:
+                continue
+            filename = header_type(type(items[0]))
+            output_to_file(
+                filename=filename,
+                data=items,
+                import_action=import_action,
+                output_dir=output_dir,
+                file_prefix=file_prefix,
+            )
+            name = f"{file_prefix}-{filename}.csv" if file_prefix else f"{filename}.csv"
+            files.append(os.path.join(output_dir, name) if output_dir else name)
+        return files
+
+
+def _address_list(statement: Statement, keyword: str) -> list[str] | None:
+    elements = statement.elements(keyword)
+    if elements is None:
+        return None
+    addresses = (acl_address(element) for element in elements)
+    return [address for address in addresses if address is not None]
+
+
+def _servers(statement: Statement, *keywords: str) -> list[str] | None:
+    for keyword in keywords:
+        elements = statement.elements(keyword)
+        if elements is not None:
+            return [element.split()[0] for element in elements]
+    return None
+
+
+def _external_server(address: str) -> str:
+    # FQDN/IP/USE_2X_TSIG/USE_TSIG, BIND only knows the address of a primary
+    return f"{address}/{address}/FALSE/FALSE"
+
+
+def _yes(value: str | None) -> bool | None:
+    if value is None:
+        return None
+    return value.lower() in ("yes", "true", "1")
+
+
+class _Builder:
+    def __init__(self, result: NamedConfModels, base_dir: str, chroot: str) -> None:
+        self.result = result
+        self.base_dir = base_dir
+        self.chroot = chroot
+        self.acl_names: set[str] = set()
+
+    def acl(self, statement: Statement) -> None:
+        name = statement.args[0]
+        self.acl_names.add(name)
+        self.result.acls.append(NamedACL(name=name))
+        for item in statement.block or ():
+            element = " ".join((item.keyword, *item.args))
+            negated = element.startswith("!")
+            plain = element.lstrip("!").strip()
+            if plain.startswith("key "):
+                self.result.acl_items.append(
+                    NamedACLItem(parent=name, address="", tsig_key=plain.split()[1])
+                )
+            elif plain in self.acl_names:
+                self.result.acl_items.append(
+                    NamedACLItem(parent=name, address="", defined_acl=plain)
+                )
+            elif plain.lower() in ("localhost", "localnets"):
+                LOG.warning("acl %s: skipping %s, not supported by NIOS", name, element)
+            else:
+                address = acl_address(("!" if negated else "") + plain)
+                if address is not None:
+                    self.result.acl_items.append(
+                        NamedACLItem(parent=name, address=address)
+                    )
+
+    def view(self, statement: Statement) -> None:
+        name = statement.args[0]
+        self.result.views.append(
+            DnsView(
+                name=name,
+                match_clients=_address_list(statement, "match-clients"),
+                match_destinations=_address_list(statement, "match-destinations"),
+                recursion=_yes(statement.value("recursion")),
+                forwarders=_servers(statement, "forwarders"),
+                forwarders_only=(
+                    statement.value("forward") == "only"
+                    if statement.get("forward")
+                    else None
+                ),
+            )
+        )
+        for item in statement.block or ():
+            if item.keyword == "zone":
+                self.zone(item, name)
+
+    def zone(self, statement: Statement, view: str | None) -> None:
+        fqdn = statement.args[0].rstrip(".")
+        zone_type = (statement.value("type") or "").lower()
+        zone_format = get_zone_format(fqdn)
+        if zone_type in ("master", "primary", "slave", "secondary"):
+            primaries = None
+            if zone_type in ("slave", "secondary"):
+                primaries = [
+                    _external_server(address)
+                    for address in _servers(statement, "primaries", "masters") or []
+                ] or None
+            self.result.auth_zones.append(
+                AuthZone(
+                    fqdn=fqdn,
+                    zone_format=zone_format,
+                    view=view,
+                    external_primaries=primaries,
+                    allow_transfer=_address_list(statement, "allow-transfer"),
+                    allow_query=_address_list(statement, "allow-query"),
+                    allow_update=_address_list(statement, "allow-update"),
+                )
+            )
+            zone_file = statement.value("file")
+            if zone_file and zone_type in ("master", "primary"):
+                path = _resolve(zone_file, self.chroot, self.base_dir)
+                self.result.zone_files.append((path, fqdn, view))
+        elif zone_type == "forward":
+            self.result.forward_zones.append(
+                ForwardZone(
+                    fqdn=fqdn,
+                    zone_format=zone_format,
+                    view=view,
+                    forward_to=_servers(statement, "forwarders"),
+                    forwarders_only=(
+                        statement.value("forward") == "only"
+                        if statement.get("forward")
+                        else None
+                    ),
+                )
+            )
+        elif zone_type == "stub":
+            self.result.stub_zones.append(
+                StubZone(
+                    fqdn=fqdn,
+                    zone_format=zone_format,
+                    view=view,
+                    stub_from=_servers(statement, "primaries", "masters"),
+                )
+            )
+        else:
+            skipped = self.result.skipped
+            skipped[zone_type or "unknown"] = skipped.get(zone_type or "unknown", 0) + 1
+
+
+def build_named_conf_models(
+    filename: str, *, chroot: str = "", directory: str | None = None
+) -> NamedConfModels:
+    """
+    Build NIOS CSV models from a named.conf file in one pass.
+
+    Views become `DnsView`, ACLs `NamedACL` and `NamedACLItem`, primary and secondary
+    zones `AuthZone`, forward zones `ForwardZone` and stub zones `StubZone` models.
+    The primaries of secondary zones become external primaries of the `AuthZone`.
+    Zones outside views belong to the default view. Hint, redirect and other zone
+    types are counted as skipped. Address match lists are converted to NIOS
+    `address/Allow|Deny` values.
+
+    Args:
+        filename: the named.conf file, i.e. the canonical file of `named_checkconf`
+        chroot: the chroot directory absolute include, directory and zone file paths
+            are relative to
+        directory: the directory relative zone file names are relative to, defaults to
+            the `directory` option or the directory of the named.conf file
+
+    Returns:
+        the models and the primary zone files
+
+    Example:
+        result = build_named_conf_models("named.conf")
+        result.write(output_dir="csv")
+        zones_to_csv([(f, zone) for f, zone, _ in result.zone_files], output_dir="csv")
+    """
+    statements = parse_named_conf(filename, chroot=chroot)
+    if directory is None:
+        options = next((s for s in statements if s.keyword == "options"), None)
+        directory = options.value("directory") if options else None
+        if directory and chroot and directory.startswith("/"):
+            directory = os.path.join(chroot, directory.lstrip("/"))
+        directory = directory or os.path.dirname(os.path.abspath(filename))
+
+    result = NamedConfModels()
+    builder = _Builder(result, directory, chroot)
+    for statement in statements:
+        if statement.keyword == "acl" and statement.args:
+            builder.acl(statement)
+        elif statement.keyword == "view" and statement.args:
+            builder.view(statement)
+        elif statement.keyword == "zone" and statement.args:
+            builder.zone(statement, None)
+    LOG.info(
+        "built %s views, %s acls, %s auth, %s forward and %s stub zones",
+        len(result.views),
+        len(result.acls),
+        len(result.auth_zones),
+        len(result.forward_zones),
+        len(result.stub_zones),
+    )
+    return result
@@ -0,0 +1,243 @@
+import csv
+import os
+import shutil
+from collections.abc import Iterable, Mapping
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import islice
+from logging import getLogger
+from typing import NamedTuple
+
+from pydantic import BaseModel
+
+from .bulk import validate_many
+from .util import field_order, output_to_file
+
+LOG = getLogger(__name__)
+
+
+class ParallelCsvResult(NamedTuple):
+    """
+    The result of `output_to_file_parallel`.
+
+    Attributes:
+        files: the CSV files written, one file or one part per shard
+        header: the header shared by all files
+        rows: the number of data rows written
+        errors: the validation errors per failed input row index, as dicts with
+            `loc`, `msg` and `type`
+    """
+
+    files: list[str]
+    header: list[str]
+    rows: int
+    errors: dict[int, list[dict]]
+
+
+class _Shard(NamedTuple):
+    index: int
+    filename: str | None
+    header: list[str]
+    rows: int
+    errors: dict[int, list[dict]]
+
+
+def _write_shard(
+    model: type[BaseModel],
+    index: int,
+    offset: int,
+    rows: list[Mapping],
+    filename: str,
+    import_action: str | None,
+    columns: list[str] | None,
+    extras: list[str] | None,
+) -> _Shard:
+    """Validate the rows of a shard and write them to a CSV part (worker process)."""
+    result = validate_many(model, rows, batch_size=max(len(rows), 1))
+    errors = {
+        offset + row: [
+            {"loc": error["loc"], "msg": error["msg"], "type": error["type"]}
+            for error in row_errors
+        ]
+        for row, row_errors in result.errors.items()
+    }
+    count = output_to_file(
+        filename=filename,
+        data=result.valid,
+        import_action=import_action,
+        columns=columns,
+        extras=extras,
+    )
+    if not count:
+        return _Shard(index, None, [], 0, errors)
+    with open(filename, encoding="utf-8", newline="") as f:
+        header = next(csv.reader(f))
+    return _Shard(index, filename, header, count, errors)
+
+
+def merge_headers(model: type[BaseModel], headers: list[list[str]]) -> list[str]:
+    """
+    Merge the headers of CSV parts of one model class.
+
+    Model columns are ordered like the model fields, followed by the extra columns in
+    the order they first appear, with `import-action` second like `CsvModelWriter`.
+    """
+    order = field_order(model)
+    known = {}
+    extra = {}
+    for header in headers:
+        for column in header:
+            if column == "import-action":
+                continue
+            if column in order:
+                known.setdefault(column, order[column])
+            else:
+                extra.setdefault(column, None)
+    merged = sorted(known, key=known.get)
+    merged.extend(extra)
+    if any("import-action" in header for header in headers):
+        merged.insert(1, "import-action")
+    return merged
+
+
+def _copy_rows(source: str, header: list[str], writer) -> None:
+    """Write the data rows of a CSV part to a csv writer in the order of a header."""
+    with open(source, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        positions = {column: i for i, column in enumerate(next(reader))}
+        mapping = [positions.get(column) for column in header]
+        for row in reader:
+            writer.writerow(["" if i is None else row[i] for i in mapping])
+
+
+def output_to_file_parallel(
+    *,
+    filename: str,
+    model: type[BaseModel],
+    rows: Iterable[Mapping],
+    import_action: str | None = None,
+    output_dir: str | None = None,
+    file_prefix: str | None = None,
+    columns: Iterable[str] | None = None,
+    extras: Iterable[str] | None = None,
+    shard_size: int = 50000,
+    max_workers: int | None = None,
+    concatenate: bool = True,
+    executor: Executor | None = None,
+) -> ParallelCsvResult:
+    """
+    Validate rows into models and write them to CSV using a pool of processes.
+
+    The input rows are split into shards of `shard_size` rows. Every shard is
+    validated with `validate_many` and written with `output_to_file` to a CSV part in
+    a worker process, so validation and serialization scale with the number of cores.
+    At most two shards per worker are in flight, so the input is read as a stream.
+    The headers of the parts are merged, and the parts are either concatenated into a
+    single file or kept as separate import files rewritten to the merged header.
+
+    Rows that fail validation are left out and reported in the result.
+
+    Args:
+        filename: csv filename or object name
+        model: the model class the rows are validated into
+        rows: the field values per row, keyed by field name, alias or CSV column name
+        import_action: optional import-action to be added to the header
+        output_dir: output to a specific directory
+        file_prefix: optional file name prefix
+        columns: optional complete list of columns, used for every part
+        extras: optional extra columns added to the computed header
+        shard_size: number of rows per shard
+        max_workers: number of worker processes, defaults to the number of CPUs
+        concatenate: concatenate the parts into one file, else keep them
+        executor: optional executor to use instead of a new process pool
+
+    Returns:
+        the files written, their header, the row count and the validation errors
+    """
+    base = filename[:-4] if filename.endswith(".csv") else filename
+    if file_prefix:
+        base = "-".join([file_prefix, base])
+    if output_dir:
+        base = os.path.join(output_dir, base)
+    columns = list(columns) if columns is not None else None
+    extras = list(extras) if extras is not None else None
+
+    pool = executor or ProcessPoolExecutor(max_workers=max_workers)
+    workers = max_workers or os.cpu_count() or 1
+    shards = []
+    try:
+        iterator = iter(rows)
+        pending = []
+        index = 0
+        offset = 0
+        while True:
+            batch = list(islice(iterator, shard_size))
+            if batch:
+                pending.append(
+                    pool.submit(
+                        _write_shard,
+                        model,
+                        index,
+                        offset,
+                        batch,
+                        f"{base}_part_{index:04d}.csv",
+                        import_action,
+                        columns,
+                        extras,
+                    )
+                )
+                index += 1
+                offset += len(batch)
+            if pending and (not batch or len(pending) >= 2 * workers):
+                shards.append(pending.pop(0).result())
+            if not batch and not pending:
+                break
+    finally:
+        if executor is None:
+            pool.shutdown()
+
+    errors = {}
+    for shard in shards:
+        errors.update(shard.errors)
+    parts = [shard for shard in shards if shard.filename]
+    total = sum(shard.rows for shard in parts)
+    if errors:
+        LOG.warning("%s %s rows failed validation", len(errors), model.__name__)
+    if not parts:
+        LOG.warning("Skipping %s file, no data to write to file", base)
+        return ParallelCsvResult([], [], 0, errors)
+
+    header = merge_headers(model, [shard.header for shard in parts])
+    if not concatenate:
+        for shard in parts:
+            if shard.header == header:
+                continue
+            LOG.debug("rewriting %s with the merged header", shard.filename)
+            temp = f"{shard.filename}.tmp"
+            with open(temp, "w", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(header)
+                _copy_rows(shard.filename, header, writer)
+            os.replace(temp, shard.filename)
+        return ParallelCsvResult(
+            [shard.filename for shard in parts], header, total, errors
+        )
+
+    output_file_name = f"{base}.csv"
+    LOG.info(
+        "Writing Infoblox NIOS %s data to CSV file %s from %s parts",
+        filename,
+        output_file_name,
+        len(parts),
+    )
+    with open(output_file_name, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for shard in parts:
+            if shard.header == header:
+                with open(shard.filename, encoding="utf-8", newline="") as part:
+                    part.readline()
+                    shutil.copyfileobj(part, f)
+            else:
+                _copy_rows(shard.filename, header, writer)
+            os.remove(shard.filename)
+    return ParallelCsvResult([output_file_name], header, total, errors)
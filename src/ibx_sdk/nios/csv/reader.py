@@ -0,0 +1,199 @@
+import csv
+import types
+import typing
+from collections.abc import Iterable, Iterator
+from logging import getLogger
+from typing import TextIO
+
+from pydantic import BaseModel, ValidationError
+
+from . import dhcp, dns, dns_records, other
+
+LOG = getLogger(__name__)
+
+# NIOS CSV object type (value of the header-<type> column) to model class
+CSV_MODEL_REGISTRY: dict[str, type[BaseModel]] = {}
+
+# (model, header) to a list of (column index, validation key, is list) tuples
+_COLUMN_PLANS: dict[tuple, list] = {}
+
+
+def header_type(model: type[BaseModel]) -> str:
+    """Return the NIOS CSV object type of a model class, i.e. hostrecord."""
+    for field in model.model_fields.values():
+        column = field.serialization_alias or field.alias or ""
+        if column.startswith("header-"):
+            return column[len("header-"):]
+    raise ValueError(f"{model.__name__} has no header- field")
+
+
+def register_model(model: type[BaseModel], object_type: str | None = None) -> None:
+    """
+    Register a model class for a NIOS CSV object type.
+
+    Args:
+        model: the model class
+        object_type: the object type, derived from the model's header- field if omitted
+    """
+    CSV_MODEL_REGISTRY[(object_type or header_type(model)).lower()] = model
+
+
+def get_model(object_type: str) -> type[BaseModel] | None:
+    """Return the model class for an object type or header- value, or None."""
+    object_type = object_type.strip().lower()
+    if object_type.startswith("header-"):
+        object_type = object_type[len("header-"):]
+    return CSV_MODEL_REGISTRY.get(object_type)
+
+
+def _register_modules(*modules: types.ModuleType) -> None:
+    """Register every model class with a header- field defined in the modules."""
+    for module in modules:
+        for model in vars(module).values():
+            if not (
+                isinstance(model, type)
+                and issubclass(model, BaseModel)
+                and model.__module__ == module.__name__
+            ):
+                continue
+            try:
+                register_model(model)
+            except ValueError:
+                continue
+
+
+_register_modules(dhcp, dns, dns_records, other)
+
+
+def _is_list(annotation) -> bool:
+    origin = typing.get_origin(annotation)
+    if origin is list or annotation is list:
+        return True
+    if origin in (typing.Union, types.UnionType):
+        return any(_is_list(arg) for arg in typing.get_args(annotation))
+    return False
+
+
+def column_plan(model: type[BaseModel], header: Iterable[str]) -> list:
+    """
+    Map the columns of a CSV header to the validation keys of a model.
+
+    Columns are matched case-insensitively against the CSV column names of the model
+    fields, ignoring the `*` NIOS appends to required columns. Other columns, i.e.
+    `EA-`, `OPTION-` or `ADMGRP-`, are passed on as extra fields under their own name.
+
+    Args:
+        model: the model class
+        header: the header row
+
+    Returns:
+        list of (column index, validation key, is list) tuples
+    """
+    header = tuple(header)
+    plan = _COLUMN_PLANS.get((model, header))
+    if plan is not None:
+        return plan
+
+    fields = {}
+    for name, field in model.model_fields.items():
+        column = field.serialization_alias or field.alias or name
+        key = field.alias or name
+        fields[column.lower()] = (key, _is_list(field.annotation))
+        fields.setdefault(name.lower(), (key, _is_list(field.annotation)))
+
+    plan = []
+    for index, column in enumerate(header):
+        column = column.strip().rstrip("*")
+        key, is_list = fields.get(column.lower(), (column, False))
+        plan.append((index, key, is_list))
+    _COLUMN_PLANS[(model, header)] = plan
+    return plan
+
+
+def row_to_model(model: type[BaseModel], plan: list, row: list) -> BaseModel:
+    """
+    Validate a CSV data row into a model.
+
+    Empty cells are left out so the field defaults apply, and list fields are split on
+    commas.
+
+    Args:
+        model: the model class
+        plan: the column plan returned by `column_plan`
+        row: the data row
+
+    Returns:
+        the validated model
+    """
+    values = {}
+    for index, key, is_list in plan:
+        if index >= len(row):
+            break
+        cell = row[index]
+        if cell == "":
+            continue
+        values[key] = cell.split(",") if is_list else cell
+    return model.model_validate(values)
+
+
+def read_csv(
+    source: str | TextIO,
+    *,
+    skip_invalid: bool = False,
+    skip_unknown: bool = True,
+) -> Iterator[BaseModel]:
+    """
+    Read a NIOS CSV file and yield validated models lazily.
+
+    Files may mix object types, like a global CSV export: every `header-<type>` row
+    switches the model used for the rows that follow.
+
+    Args:
+        source: file name or open text file
+        skip_invalid: log and skip rows that fail validation instead of raising
+        skip_unknown: skip rows of object types without a registered model instead of
+            raising
+
+    Yields:
+        validated models, in file order
+
+    Raises:
+        ValueError: if a row is invalid or of an unknown object type and is not skipped
+    """
+    if isinstance(source, str):
+        with open(source, encoding="utf-8", newline="") as f:
+            yield from read_csv(
+                f, skip_invalid=skip_invalid, skip_unknown=skip_unknown
+            )
+        return
+
+    name = getattr(source, "name", "<stream>")
+    model = None
+    plan = None
+    object_type = None
+    for line, row in enumerate(csv.reader(source), start=1):
+        if not row or not any(row):
+            continue
+        first = row[0].strip().lower()
+        if first.startswith("header-"):
+            object_type = first[len("header-"):]
+            model = get_model(object_type)
+            plan = column_plan(model, row) if model else None
+            if model is None:
+                message = f"{name}:{line}: no model for object type {object_type}"
+                if not skip_unknown:
+                    raise ValueError(message)
+                LOG.warning("%s, skipping its rows", message)
+            continue
+        if object_type is None:
+            raise ValueError(f"{name}:{line}: data row found before a header row")
+        if model is None:
+            continue
+        try:
+            yield row_to_model(model, plan, row)
+        except ValidationError as exc:
+            if not skip_invalid:
+                raise ValueError(f"{name}:{line}: {exc}") from exc
+            LOG.warning(
+                "%s:%s: skipping invalid %s row: %s", name, line, object_type, exc
+            )
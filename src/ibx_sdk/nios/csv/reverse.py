@@ -0,0 +1,248 @@
+from collections.abc import Iterable, Iterator
+from ipaddress import IPv4Address, IPv6Address
+from logging import getLogger
+from typing import NamedTuple
+
+from pydantic import BaseModel
+
+from .dns import AuthZone, get_zone_format
+from .dns_records import AAAARecord, ARecord, HostRecord, PTRRecord
+
+LOG = getLogger(__name__)
+
+_SUFFIX = {4: ".in-addr.arpa", 6: ".ip6.arpa"}
+# bits per label of a reverse zone name
+_LABEL_BITS = {4: 8, 6: 4}
+_ADDRESS_BITS = {4: 32, 6: 128}
+
+
+def _check_prefix(version: int, prefix: int) -> None:
+    if prefix % _LABEL_BITS[version] or not 0 < prefix < _ADDRESS_BITS[version]:
+        raise ValueError(f"invalid IPv{version} reverse zone prefix length {prefix}")
+
+
+def reverse_zone_name(address: IPv4Address | IPv6Address, prefix: int) -> str:
+    """
+    Return the name of the reverse zone of an address for a prefix length.
+
+    Args:
+        address: the IPv4 or IPv6 address
+        prefix: the prefix length, a multiple of 8 for IPv4 and of 4 for IPv6
+
+    Raises:
+        ValueError: if the prefix length is not on a label boundary
+    """
+    _check_prefix(address.version, prefix)
+    labels = address.reverse_pointer.split(".")
+    count = prefix // _LABEL_BITS[address.version]
+    return ".".join(labels[len(labels) - 2 - count:])
+
+
+def reverse_zone_prefix(zone: str) -> tuple[int, int] | None:
+    """Return the IP version and prefix length of a reverse zone name, or None."""
+    name = zone.lower().rstrip(".")
+    for version, suffix in _SUFFIX.items():
+        if name.endswith(suffix):
+            labels = name[: -len(suffix)]
+            count = len(labels.split(".")) if labels else 0
+            return version, count * _LABEL_BITS[version]
+    return None
+
+
+class PtrSynthesis(NamedTuple):
+    """
+    The result of `synthesize_ptr_records`.
+
+    Attributes:
+        records: the PTR records per (view, reverse zone name), an empty view is
+            the default view
+        missing_zones: the reverse zones that do not exist yet, as AuthZone models
+        skipped: the number of records skipped, i.e. host records not in DNS
+    """
+
+    records: dict[tuple[str, str], list[PTRRecord]]
+    missing_zones: list[AuthZone]
+    skipped: int
+
+    def all_records(self) -> list[PTRRecord]:
+        """Return all PTR records, grouped by zone."""
+        return [record for records in self.records.values() for record in records]
+
+
+class ReverseZoneLookup:
+    """
+    Prefix to reverse zone lookup for the addresses of a dataset.
+
+    The reverse zones are grouped by view, IP version and prefix length, so finding the
+    most specific zone of an address only checks the few prefix lengths in use, and the
+    zone names of every prefix are computed once. Lookups therefore take constant time
+    per address. Addresses outside every known zone get a new zone of the default
+    prefix length, which is recorded as missing.
+
+    Args:
+        zones: existing reverse zones, i.e. `AuthZone` models or zone names
+        ipv4_prefix: prefix length of missing IPv4 reverse zones
+        ipv6_prefix: prefix length of missing IPv6 reverse zones
+    """
+
+    def __init__(
+        self,
+        zones: Iterable[AuthZone | str] = (),
+        *,
+        ipv4_prefix: int = 24,
+        ipv6_prefix: int = 64,
+    ) -> None:
+        self.defaults = {4: ipv4_prefix, 6: ipv6_prefix}
+        for version, prefix in self.defaults.items():
+            _check_prefix(version, prefix)
+        # (view, version) to {prefix length: {network number: zone name}}
+        self._zones: dict[tuple[str, int], dict[int, dict[int, str]]] = {}
+        # (view, version) to the prefix lengths in use, longest first
+        self._prefixes: dict[tuple[str, int], list[int]] = {}
+        # (view, zone name) of the zones created for addresses without one
+        self.missing: dict[tuple[str, str], None] = {}
+        for zone in zones:
+            if isinstance(zone, str):
+                self.add(zone)
+            else:
+                self.add(zone.fqdn, zone.view)
+
+    def add(self, zone: str, view: str | None = None) -> None:
+        """
+        Add an existing reverse zone.
+
+        Forward zones and classless (RFC 2317) reverse zones are ignored. A view of
+        None is the default view.
+        """
+        found = reverse_zone_prefix(zone)
+        if found is None:
+            return
+        version, prefix = found
+        name = zone.lower().rstrip(".")
+        labels = name[: -len(_SUFFIX[version])].split(".")
+        base = 10 if version == 4 else 16
+        number = 0
+        try:
+            for label in reversed(labels):
+                number = (number << _LABEL_BITS[version]) + int(label, base)
+        except ValueError:
+            LOG.debug("ignoring reverse zone %s", zone)
+            return
+        self._register(view or "default", version, prefix, number, name)
+
+    def _register(
+        self, view: str, version: int, prefix: int, number: int, name: str
+    ) -> None:
+        key = (view, version)
+        zones = self._zones.setdefault(key, {})
+        if prefix not in zones:
+            zones[prefix] = {}
+            self._prefixes[key] = sorted(zones, reverse=True)
+        zones[prefix][number] = name
+
+    def zone(self, address: IPv4Address | IPv6Address, view: str | None = None) -> str:
+        """
+        Return the most specific reverse zone of an address.
+
+        A zone of the default prefix length is created and recorded as missing if no
+        known zone contains the address.
+        """
+        version = address.version
+        view = view or "default"
+        key = (view, version)
+        value = int(address)
+        bits = _ADDRESS_BITS[version]
+        zones = self._zones.get(key, {})
+        for prefix in self._prefixes.get(key, ()):
+            name = zones[prefix].get(value >> (bits - prefix))
+            if name is not None:
+                return name
+        prefix = self.defaults[version]
+        name = reverse_zone_name(address, prefix)
+        self._register(view, version, prefix, value >> (bits - prefix), name)
+        self.missing[(view, name)] = None
+        return name
+
+    def missing_zones(self) -> list[AuthZone]:
+        """Return the reverse zones created for addresses without a zone."""
+        return [
+            AuthZone(fqdn=name, zone_format=get_zone_format(name), view=view)
+            for view, name in self.missing
+        ]
+
+
+def _addresses(item: BaseModel) -> Iterator[IPv4Address | IPv6Address]:
+    if isinstance(item, HostRecord):
+        if item.configure_for_dns is False:
+            return
+        for address in (item.addresses, item.ipv6_addresses):
+            if address is not None:
+                yield address
+    elif isinstance(item, (ARecord, AAAARecord)):
+        if item.address is not None:
+            yield item.address
+
+
+def synthesize_ptr_records(
+    records: Iterable[BaseModel],
+    *,
+    zones: Iterable[AuthZone | str] = (),
+    ipv4_prefix: int = 24,
+    ipv6_prefix: int = 64,
+    lookup: ReverseZoneLookup | None = None,
+) -> PtrSynthesis:
+    """
+    Create the PTR records of A, AAAA and host records, grouped by reverse zone.
+
+    Every address is mapped to the most specific existing reverse zone in its view with
+    a `ReverseZoneLookup`, in constant time, so millions of records are processed in
+    linear time. The PTR records are created without validation from the already
+    validated forward records. Addresses outside every existing reverse zone get a zone
+    of the default prefix length, which is returned in `missing_zones`. Host records
+    with `configure_for_dns` disabled and other models are skipped.
+
+    Args:
+        records: the forward records
+        zones: the existing reverse zones, i.e. `AuthZone` models from a CSV export
+        ipv4_prefix: prefix length of missing IPv4 reverse zones, a multiple of 8
+        ipv6_prefix: prefix length of missing IPv6 reverse zones, a multiple of 4
+        lookup: an existing lookup to use instead of `zones` and the prefixes, so the
+            missing zones are tracked across batches
+
+    Returns:
+        the PTR records per zone, the missing reverse zones and the skipped count
+
+    Example:
+        result = synthesize_ptr_records(a_records, zones=reverse_zones)
+        output_to_file(filename="authzones", data=result.missing_zones)
+        output_to_file(filename="ptrrecords", data=result.all_records())
+    """
+    if lookup is None:
+        lookup = ReverseZoneLookup(
+            zones, ipv4_prefix=ipv4_prefix, ipv6_prefix=ipv6_prefix
+        )
+    grouped: dict[tuple[str, str], list[PTRRecord]] = {}
+    skipped = 0
+    # copying a constructed record is much cheaper than model_construct per record
+    template = PTRRecord.model_construct(fqdn="", dname="", view=None)
+    for item in records:
+        found = False
+        view = item.view
+        for address in _addresses(item):
+            found = True
+            zone = lookup.zone(address, view)
+            grouped.setdefault((view or "default", zone), []).append(
+                template.model_copy(
+                    update={
+                        "fqdn": address.reverse_pointer,
+                        "dname": item.fqdn,
+                        "view": view,
+                    }
+                )
+            )
+        if not found:
+            skipped += 1
+    if skipped:
+        LOG.debug("skipped %s records without addresses for PTR records", skipped)
+    return PtrSynthesis(grouped, lookup.missing_zones(), skipped)
+
@@ -0,0 +1,199 @@
+import inspect
+import typing
+from enum import Enum
+from logging import getLogger
+
+from pydantic import BaseModel
+
+LOG = getLogger(__name__)
+
+# model class to its SerializationPlan
+_PLANS: dict[type, "SerializationPlan"] = {}
+
+
+def _mentions_model(annotation) -> bool:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return True
+    return any(_mentions_model(arg) for arg in typing.get_args(annotation))
+
+
+def _plain_serializer(decorator):
+    """Return the function of a plain (self, value) field serializer, else None."""
+    info = decorator.info
+    if info.mode != "plain" or info.when_used not in ("always", "unless-none"):
+        return None
+    try:
+        params = list(inspect.signature(decorator.func).parameters.values())
+    except (TypeError, ValueError):
+        return None
+    positional = (
+        inspect.Parameter.POSITIONAL_ONLY,
+        inspect.Parameter.POSITIONAL_OR_KEYWORD,
+    )
+    if len(params) != 2 or any(p.kind not in positional for p in params):
+        return None
+    return decorator.func
+
+
+class SerializationPlan:
+    """
+    Precomputed CSV serialization of a model class.
+
+    The column names, field serializers and exclusions of the model are resolved once,
+    so turning an instance into a row only reads attributes and calls the field
+    serializers. The output is the same as `model_dump(by_alias=True,
+    exclude_none=True)`. Models with features the plan does not reproduce (model
+    serializers, wrap serializers, serializers taking an info argument, computed fields
+    or nested models) fall back to `model_dump`.
+
+    Args:
+        model: the model class
+    """
+
+    def __init__(self, model: type[BaseModel]) -> None:
+        self.model = model
+        self.fallback = False
+        self.fields = []
+        self._row_plans = {}
+
+        decorators = model.__pydantic_decorators__
+        serializers = {}
+        if decorators.model_serializers or model.model_computed_fields:
+            self.fallback = True
+        for decorator in decorators.field_serializers.values():
+            func = _plain_serializer(decorator)
+            if func is None:
+                self.fallback = True
+            for name in decorator.info.fields:
+                serializers[name] = func
+
+        for name, field in model.model_fields.items():
+            if field.exclude:
+                continue
+            if _mentions_model(field.annotation):
+                self.fallback = True
+            column = field.serialization_alias or field.alias or name
+            self.fields.append((name, column, serializers.get(name)))
+        self.columns = {column: name for name, column, _ in self.fields}
+        if self.fallback:
+            LOG.debug("%s is serialized with model_dump", model.__name__)
+
+    def dump(self, item: BaseModel) -> dict:
+        """Return the same dict as `model_dump(by_alias=True, exclude_none=True)`."""
+        if self.fallback:
+            return item.model_dump(by_alias=True, exclude_none=True)
+        values = item.__dict__
+        row = {}
+        for name, column, serializer in self.fields:
+            value = values[name]
+            if value is None:
+                continue
+            row[column] = value if serializer is None else serializer(item, value)
+        extra = item.__pydantic_extra__
+        if extra:
+            for column, value in extra.items():
+                if value is not None:
+                    row[column] = value
+        return row
+
+    def row(self, item: BaseModel, header: tuple) -> tuple:
+        """
+        Return the values of an instance in the order of a CSV header.
+
+        Missing and None values are returned as empty strings, enum members as their
+        values.
+
+        Raises:
+            ValueError: if the instance has a value for a column missing from the header
+        """
+        if self.fallback:
+            return dict_to_row(self.dump(item), header)
+        plan = self._row_plans.get(header)
+        if plan is None:
+            plan = self._row_plan(header)
+        getters, uncovered, columns = plan
+        values = item.__dict__
+        extra = item.__pydantic_extra__ or {}
+        for name in uncovered:
+            if values[name] is not None:
+                raise ValueError(f"column for field {name} not in the CSV header")
+        if extra and not columns.issuperset(extra):
+            missing = [
+                column
+                for column, value in extra.items()
+                if value is not None and column not in columns
+            ]
+            if missing:
+                raise ValueError(f"columns {missing} not in the CSV header")
+
+        row = []
+        for name, serializer, column in getters:
+            if name is None:
+                value = extra.get(column)
+            else:
+                value = values[name]
+                if value is not None and serializer is not None:
+                    value = serializer(item, value)
+            if value is None:
+                row.append("")
+            elif isinstance(value, Enum):
+                row.append(value.value)
+            else:
+                row.append(value)
+        return tuple(row)
+
+    def _row_plan(self, header: tuple) -> tuple:
+        by_column = {
+            column: (name, serializer) for name, column, serializer in self.fields
+        }
+        getters = []
+        for column in header:
+            name, serializer = by_column.get(column, (None, None))
+            getters.append((name, serializer, column))
+        covered = {name for name, _, _ in getters if name is not None}
+        uncovered = tuple(name for name, _, _ in self.fields if name not in covered)
+        plan = (tuple(getters), uncovered, frozenset(header))
+        self._row_plans[header] = plan
+        return plan
+
+
+def dict_to_row(row: dict, header: tuple) -> tuple:
+    """
+    Order a serialized model dict by a CSV header.
+
+    Raises:
+        ValueError: if the dict has a column missing from the header
+    """
+    columns = frozenset(header)
+    missing = [column for column in row if column not in columns]
+    if missing:
+        raise ValueError(f"columns {missing} not in the CSV header")
+    values = []
+    for column in header:
+        value = row.get(column)
+        if value is None:
+            values.append("")
+        elif isinstance(value, Enum):
+            values.append(value.value)
+        else:
+            values.append(value)
+    return tuple(values)
+
+
+def serialization_plan(model: type[BaseModel]) -> SerializationPlan:
+    """Return the cached serialization plan of a model class."""
+    plan = _PLANS.get(model)
+    if plan is None:
+        plan = SerializationPlan(model)
+        _PLANS[model] = plan
+    return plan
+
+
+def to_dict(item: BaseModel) -> dict:
+    """Serialize a model like `model_dump(by_alias=True, exclude_none=True)`."""
+    return serialization_plan(type(item)).dump(item)
+
+
+def to_row(item: BaseModel, header: tuple) -> tuple:
+    """Serialize a model into a row tuple in the order of a CSV header."""
+    return serialization_plan(type(item)).row(item, header)
@@ -0,0 +1,289 @@
+import sys
+import types
+import typing
+from array import array
+from collections.abc import Iterable, Iterator, Mapping
+from enum import Enum
+from ipaddress import IPv4Address
+from logging import getLogger
+
+from pydantic import BaseModel
+
+from .extras import ExtraColumns
+from .serializer import dict_to_row, serialization_plan
+
+LOG = getLogger(__name__)
+
+# stored in IPv4 address columns for missing values
+IPV4_NONE = -1
+
+
+def _is_ipv4(annotation) -> bool:
+    """True for IPv4Address and IPv4Address | None fields, not for lists."""
+    if annotation is IPv4Address:
+        return True
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        return args == [IPv4Address]
+    return False
+
+
+class ModelTable:
+    """
+    Compact, column-oriented storage for many instances of one model class.
+
+    Instead of one pydantic instance per row, with its own `__dict__`, extras and fields
+    set, every field is stored in a column that is created the first time a row has a
+    value for it. String values are interned, so repeated values like views, network
+    views or comments are stored once, and IPv4 address fields are stored as integers in
+    an `array` with `IPV4_NONE` for missing values. Sparse extra columns (`EA-`,
+    `OPTION-`, `ADMGRP-`, ...) are kept in an `ExtraColumns` store, which can be shared
+    by the tables of a dataset.
+
+    Models are created on demand with `model_construct`, so the values must be the
+    validated values, i.e. taken from validated instances. `output_to_file` writes a
+    table directly, without creating models.
+
+    Args:
+        model: the model class
+        intern: intern string values
+        extras: optional shared store for the extra columns
+
+    Example:
+        table = ModelTable(HostRecord)
+        for host in hosts:
+            table.append(host)
+        output_to_file(filename="hostrecords", data=table)
+    """
+
+    __slots__ = (
+        "model",
+        "intern",
+        "_plan",
+        "_fields",
+        "_ipv4",
+        "_columns",
+        "extras",
+        "_extra_columns",
+        "_row_ids",
+        "_length",
+    )
+
+    def __init__(
+        self,
+        model: type[BaseModel],
+        *,
+        intern: bool = True,
+        extras: ExtraColumns | None = None,
+    ) -> None:
+        self.model = model
+        self.intern = intern
+        self._plan = serialization_plan(model)
+        self._fields = tuple(model.model_fields)
+        self._ipv4 = frozenset(
+            name
+            for name, field in model.model_fields.items()
+            if _is_ipv4(field.annotation)
+        )
+        self._columns: dict[str, list | array] = {}
+        # with a store of its own the row ids are the row indexes
+        self._row_ids = None if extras is None else array("q")
+        self.extras = ExtraColumns(intern=intern) if extras is None else extras
+        # the extra columns used by this table, in the order they were first added
+        self._extra_columns: dict[str, None] = {}
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[BaseModel]:
+        for index in range(self._length):
+            yield self.get(index)
+
+    def __getitem__(self, index: int) -> BaseModel:
+        return self.get(index)
+
+    @classmethod
+    def from_models(
+        cls, model: type[BaseModel], items: Iterable[BaseModel], **kwargs
+    ) -> "ModelTable":
+        """Create a table from model instances."""
+        table = cls(model, **kwargs)
+        table.extend(items)
+        return table
+
+    def _row_id(self, index: int) -> int:
+        return index if self._row_ids is None else self._row_ids[index]
+
+    def _new_column(self, name: str) -> list | array:
+        if name in self._ipv4:
+            column = array("q", [IPV4_NONE]) * self._length
+        else:
+            column = [None] * self._length
+        self._columns[name] = column
+        return column
+
+    def append(self, item: BaseModel) -> None:
+        """Add a model instance as a row."""
+        if type(item) is not self.model:
+            raise TypeError(
+                f"expected {self.model.__name__}, got {type(item).__name__}"
+            )
+        self.append_values(item.__dict__, item.__pydantic_extra__)
+
+    def extend(self, items: Iterable[BaseModel]) -> None:
+        """Add model instances as rows."""
+        for item in items:
+            self.append(item)
+
+    def append_values(
+        self, values: Mapping, extra: Mapping | None = None
+    ) -> None:
+        """
+        Add a row from validated field values keyed by field name.
+
+        Args:
+            values: the field values, missing fields are stored as None
+            extra: optional extra columns, i.e. EA- values
+        """
+        index = self._length
+        columns = self._columns
+        for name in self._fields:
+            value = values.get(name)
+            column = columns.get(name)
+            if value is None:
+                if column is not None:
+                    column.append(IPV4_NONE if name in self._ipv4 else None)
+                continue
+            if column is None:
+                column = self._new_column(name)
+            if name in self._ipv4:
+                column.append(int(value))
+            elif self.intern and type(value) is str:
+                column.append(sys.intern(value))
+            else:
+                column.append(value)
+        row = self.extras.new_row()
+        if self._row_ids is not None:
+            self._row_ids.append(row)
+        if extra:
+            for key, value in extra.items():
+                if value is not None:
+                    if key not in self._extra_columns:
+                        self._extra_columns[sys.intern(key)] = None
+                    self.extras.set(row, key, value)
+        self._length += 1
+
+    def values(self, index: int) -> tuple[dict, dict]:
+        """Return the field values (None values left out) and extras of a row."""
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("ModelTable index out of range")
+        values = {}
+        for name, column in self._columns.items():
+            value = column[index]
+            if name in self._ipv4:
+                if value != IPV4_NONE:
+                    values[name] = IPv4Address(value)
+            elif value is not None:
+                values[name] = value
+        row = self._row_id(index)
+        extra = {}
+        for key in self._extra_columns:
+            value = self.extras.get(row, key)
+            if value is not None:
+                extra[key] = value
+        return values, extra
+
+    def get(self, index: int) -> BaseModel:
+        """Create the model instance of a row."""
+        values, extra = self.values(index)
+        return self.model.model_construct(**values, **extra)
+
+    def header(self) -> list:
+        """
+        Return the CSV columns with at least one value, in model field order followed
+        by the extra columns in the order they were first added.
+        """
+        columns = {name: column for name, column, _ in self._plan.fields}
+        header = [
+            columns[name]
+            for name in self._fields
+            if name in self._columns and name in columns
+        ]
+        header.extend(key for key in self._extra_columns if self.extras.count(key))
+        return header
+
+    def rows(self, header: Iterable[str]) -> Iterator[tuple]:
+        """
+        Yield every row as a tuple in the order of a CSV header without creating models.
+
+        Rows with a value in a field that has a field serializer are serialized through
+        the model, so the output is the same as for the model instances.
+
+        Raises:
+            ValueError: if a row has a value for a column missing from the header
+        """
+        header = tuple(header)
+        present = frozenset(header)
+        by_column = {column: name for name, column, _ in self._plan.fields}
+        missing = [
+            column
+            for name, column, _ in self._plan.fields
+            if name in self._columns and column not in present
+        ]
+        missing.extend(
+            key
+            for key in self._extra_columns
+            if key not in present and self.extras.count(key)
+        )
+        if missing:
+            raise ValueError(f"columns {missing} not in the CSV header")
+
+        serialized = [
+            name
+            for name, _, serializer in self._plan.fields
+            if name in self._columns and serializer is not None
+        ]
+        if self._plan.fallback:
+            serialized = list(self._columns)
+        getters = []
+        for column in header:
+            name = by_column.get(column)
+            if name is not None and name in self._columns:
+                getters.append((self._columns[name], name in self._ipv4, None))
+            elif column in self._extra_columns:
+                getters.append((None, False, self.extras.column(column)))
+            else:
+                getters.append((None, False, None))
+
+        missing_values = {
+            name: IPV4_NONE if name in self._ipv4 else None for name in serialized
+        }
+        for index in range(self._length):
+            if any(
+                self._columns[name][index] != empty
+                for name, empty in missing_values.items()
+            ):
+                yield dict_to_row(self._plan.dump(self.get(index)), header)
+                continue
+            row = []
+            row_id = self._row_id(index)
+            for column, is_ipv4, sparse in getters:
+                if column is not None:
+                    value = column[index]
+                    if is_ipv4:
+                        value = None if value == IPV4_NONE else IPv4Address(value)
+                    if value is None:
+                        row.append("")
+                    elif isinstance(value, Enum):
+                        row.append(value.value)
+                    else:
+                        row.append(value)
+                elif sparse is not None:
+                    value = sparse.get(row_id)
+                    row.append("" if value is None else value)
+                else:
+                    row.append("")
+            yield tuple(row)
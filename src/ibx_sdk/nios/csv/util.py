@@ -1,11 +1,22 @@
 import csv
 import os
+from collections.abc import Iterable, Sequence
+from itertools import chain
 from logging import getLogger
+from typing import TextIO
+
+from pydantic import BaseModel
 
 from ibx_sdk.nios.csv.enums import ImportActionEnum
+from ibx_sdk.nios.csv.extras import ExtraColumns
+from ibx_sdk.nios.csv.serializer import dict_to_row, serialization_plan
+from ibx_sdk.nios.csv.table import ModelTable
 
 LOG = getLogger(__name__)
 
+# column position of every field per model class, keyed by the serialized column name
+_FIELD_ORDER: dict[type, dict[str, int]] = {}
+
 
 def extract_columns(item) -> list:
     """Extract column names from a single item."""
@@ -16,37 +27,228 @@ def extract_columns(item) -> list:
 
 def get_header(*, data: list) -> list:
     """Generate a unique header from the given data."""
-    header_columns = []
+    header_columns = {}
     for item in data:
-        cols = extract_columns(item)
-        for col in cols:
-            if col not in header_columns:
-                header_columns.append(col)
+        for col in extract_columns(item):
+            header_columns.setdefault(col, None)
 
     LOG.debug(header_columns)
-    return header_columns
+    return list(header_columns)
+
+
+def field_order(model: type[BaseModel]) -> dict[str, int]:
+    """Return the column position of every field of a model class by column name."""
+    order = _FIELD_ORDER.get(model)
+    if order is None:
+        order = {
+            field.serialization_alias or field.alias or name: position
+            for position, (name, field) in enumerate(model.model_fields.items())
+        }
+        _FIELD_ORDER[model] = order
+    return order
+
+
+class CsvModelWriter:
+    """
+    Stream NIOS CSV models to a file, serializing every row once.
+
+    The header is computed from the first `lookahead` rows: the columns found in
+    those rows are ordered like the fields of the model class, followed by extra
+    columns (`EA-`, `OPTION-`, `ADMGRP-`, ...) in the order they were first seen and
+    any declared `extras`. Only the look-ahead rows are buffered, so any number of
+    rows is written in constant memory. Alternatively declare the complete header
+    with `columns` and nothing is buffered.
+
+    The columns of an `ExtraColumns` store are only added when the look-ahead ends
+    before the last row, so rows after it may use any column of the dataset. When
+    all rows fit the look-ahead, or for a `ModelTable`, the header has the columns
+    used by the rows written only.
+
+    Args:
+        fh: text file opened for writing with `newline=""`
+        columns: optional complete list of columns, skips the look-ahead
+        extras: optional extra columns added to the computed header, or an
+            `ExtraColumns` store of the dataset, see above
+        lookahead: number of rows used to compute the header, None for all rows
+        import_action: optional import-action added to every row
+
+    Raises:
+        ValueError: if a row after the look-ahead has a column missing from the header
+    """
+
+    def __init__(
+        self,
+        fh: TextIO,
+        *,
+        columns: Iterable[str] | None = None,
+        extras: Iterable[str] | ExtraColumns | None = None,
+        lookahead: int | None = 1000,
+        import_action: str | None = None,
+    ) -> None:
+        self.fh = fh
+        self.store = None
+        if isinstance(extras, ExtraColumns):
+            self.store = extras
+            extras = None
+        self.extras = list(extras or [])
+        self.lookahead = lookahead
+        self.import_action = (
+            ImportActionEnum(import_action) if import_action else None
+        )
+        self.rows = 0
+        self.header = None
+        self._writer = None
+        self._buffer = []
+        if columns is not None:
+            self._start(list(columns))
+
+    def __enter__(self) -> "CsvModelWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+
+    def write(self, item: BaseModel) -> None:
+        """Serialize and write a single model."""
+        plan = serialization_plan(type(item))
+        if self._writer is not None:
+            try:
+                row = plan.row(item, self.header)
+            except ValueError as exc:
+                raise ValueError(
+                    f"{exc}; increase the look-ahead or declare them as extras"
+                ) from exc
+            if self.import_action is not None:
+                row = (row[0], self.import_action.value, *row[2:])
+            self._writer.writerow(row)
+            self.rows += 1
+            return
+
+        row = plan.dump(item)
+        if self.import_action is not None:
+            row["import-action"] = self.import_action
+        self._buffer.append((type(item), row))
+        if self.lookahead is not None and len(self._buffer) >= self.lookahead:
+            self._flush_buffer(complete=False)
+
+    def write_all(self, items: Iterable[BaseModel]) -> int:
+        """Write all models of an iterable and return the number of rows so far."""
+        for item in items:
+            self.write(item)
+        return self.rows + len(self._buffer)
+
+    def write_table(self, table: ModelTable) -> int:
+        """
+        Write all rows of a ModelTable without creating models.
+
+        The header is taken from the table unless it was declared with `columns`.
+        Returns the number of rows written so far.
+        """
+        if self._buffer:
+            self._flush_buffer(complete=False)
+        if self._writer is None:
+            header = table.header()
+            header.extend(col for col in self.extras if col not in header)
+            self._start(header)
+        try:
+            for row in table.rows(self.header):
+                if self.import_action is not None:
+                    row = (row[0], self.import_action.value, *row[2:])
+                self._writer.writerow(row)
+                self.rows += 1
+        except ValueError as exc:
+            raise ValueError(f"{exc}; declare them as columns") from exc
+        return self.rows
+
+    def close(self) -> None:
+        """Write any buffered rows. The file handle is left open."""
+        if self._buffer or self._writer is None:
+            self._flush_buffer()
+
+    def _flush_buffer(self, complete: bool = True) -> None:
+        if self._writer is None:
+            extras = list(self.extras)
+            if self.store is not None and not complete:
+                # rows after the look-ahead may use any column of the dataset
+                extras.extend(col for col in self.store.header() if col not in extras)
+            self._start(self._compute_header(extras))
+        for _, row in self._buffer:
+            self._write_row(row)
+        self._buffer = []
+
+    def _compute_header(self, extras: list) -> list:
+        known = {}
+        extra = {}
+        models = []
+        for model, row in self._buffer:
+            if model not in models:
+                models.append(model)
+            order = field_order(model)
+            for col in row:
+                if col in order:
+                    known.setdefault(col, (models.index(model), order[col]))
+                else:
+                    extra.setdefault(col, None)
+        header = sorted(known, key=known.get)
+        header.extend(col for col in extra if col not in known)
+        header.extend(col for col in extras if col not in known and col not in extra)
+        return header
+
+    def _start(self, header: list) -> None:
+        if self.import_action is not None:
+            if "import-action" in header:
+                header.remove("import-action")
+            LOG.debug(
+                "Adding import-action to header using %s", self.import_action
+            )
+            header.insert(1, "import-action")
+        LOG.debug(header)
+        self.header = tuple(header)
+        self._writer = csv.writer(self.fh)
+        self._writer.writerow(self.header)
+
+    def _write_row(self, row: dict) -> None:
+        try:
+            self._writer.writerow(dict_to_row(row, self.header))
+        except ValueError as exc:
+            raise ValueError(
+                f"{exc}; increase the look-ahead or declare them as extras"
+            ) from exc
+        self.rows += 1
 
 
 def output_to_file(
     *,
     filename: str,
-    data: list,
+    data: Iterable,
     import_action: str | None = None,
     output_dir: str | None = None,
     file_prefix: str | None = None,
-) -> None:
+    columns: Iterable[str] | None = None,
+    extras: Iterable[str] | ExtraColumns | None = None,
+    lookahead: int | None = 1000,
+) -> int:
     """
     Generate a CSV file from the given data.
 
+    The data is streamed to the file with `CsvModelWriter`, serializing every row once.
+    For lists and other sequences the header is computed from all rows; for other
+    iterables, i.e. generators, from the first `lookahead` rows.
+
     Args:
         filename: csv filename or object name
-        data: list of objects
+        data: list, iterable or ModelTable of objects
         import_action: optional import-action to be added to the header
         output_dir: output to a specific directory
         file_prefix: optional file name prefix
+        columns: optional complete list of columns, skips the look-ahead
+        extras: optional extra columns added to the computed header, or an
+            `ExtraColumns` store of the dataset, see `CsvModelWriter`
+        lookahead: number of rows of an iterable used to compute the header
 
     Returns:
-        None
+        number of rows written
     """
     if filename.endswith(".csv"):
         output_file_name = filename
@@ -65,26 +267,38 @@ def output_to_file(
         output_file_name,
     )
 
+    if isinstance(data, ModelTable):
+        if not len(data):
+            LOG.warning(
+                "Skipping %s file, no data to write to file", output_file_name
+            )
+            return 0
+        with open(output_file_name, "w", encoding="utf-8", newline="") as f:
+            with CsvModelWriter(
+                f, columns=columns, extras=extras, import_action=import_action
+            ) as writer:
+                writer.write_table(data)
+        return writer.rows
+
+    if isinstance(data, Sequence):
+        lookahead = None
+    items = iter(data)
+    first = next(items, None)
+
     # if there's no data do not write to file
-    if len(data) == 0:
+    if first is None:
         LOG.warning(
             "Skipping %s file, no data to write to file", output_file_name
         )
-        return
-
-    header = get_header(data=data)
-    if import_action:
-        LOG.debug("Adding import-action to header using %s", import_action)
-        header.insert(1, "import-action")
-
-    with open(output_file_name, "w") as f:
-        mywriter = csv.DictWriter(f, fieldnames=header, extrasaction="ignore")
-        mywriter.writeheader()
-        for row in data:
-            if import_action is not None:
-                row.import_action = ImportActionEnum(import_action)
-            mywriter.writerow(
-                row.model_dump(
-                    by_alias=True, exclude_defaults=False, exclude_none=True
-                )
-            )
+        return 0
+
+    with open(output_file_name, "w", encoding="utf-8", newline="") as f:
+        with CsvModelWriter(
+            f,
+            columns=columns,
+            extras=extras,
+            lookahead=lookahead,
+            import_action=import_action,
+        ) as writer:
+            writer.write_all(chain([first], items))
+    return writer.rows
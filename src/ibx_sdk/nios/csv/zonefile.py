@@ -0,0 +1,499 @@
+import os
+import shutil
+import tempfile
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from ipaddress import IPv4Address, IPv6Address
+from logging import getLogger
+from typing import NamedTuple, TextIO
+
+import dns.exception
+import dns.name
+import dns.rdata
+import dns.rdataclass
+import dns.ttl
+from pydantic import BaseModel
+
+from .dns_records import (
+    AAAARecord,
+    ARecord,
+    CAARecord,
+    CNAMERecord,
+    DNAMERecord,
+    MXRecord,
+    NAPTRRecord,
+    PTRRecord,
+    SRVRecord,
+    TLSARecord,
+    TXTRecord,
+)
+from .reader import header_type
+from .serializer import serialization_plan
+from .util import CsvModelWriter
+
+LOG = getLogger(__name__)
+
+_CLASSES = {"IN", "CH", "HS", "CS"}
+
+
+class ZoneEntry(NamedTuple):
+    """A resource record of a zone file, with the origin its rdata is relative to."""
+
+    name: str
+    ttl: int | None
+    rdtype: str
+    rdata: str
+    origin: str = ""
+
+
+def _strip_comment(line: str) -> str:
+    if ";" not in line:
+        return line
+    quoted = False
+    escaped = False
+    for position, char in enumerate(line):
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == '"':
+            quoted = not quoted
+        elif char == ";" and not quoted:
+            return line[:position]
+    return line
+
+
+def _strip_parens(line: str) -> tuple[int, str]:
+    """Return the parenthesis depth change and the line without unquoted parentheses."""
+    if "(" not in line and ")" not in line:
+        return 0, line
+    depth = 0
+    quoted = False
+    escaped = False
+    chars = list(line)
+    for position, char in enumerate(chars):
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == '"':
+            quoted = not quoted
+        elif char in "()" and not quoted:
+            depth += 1 if char == "(" else -1
+            chars[position] = " "
+    return depth, "".join(chars)
+
+
+def _absolute(name: str, origin: str) -> str:
+    if name == "@":
+        return origin
+    if name.endswith("."):
+        return name[:-1]
+    return f"{name}.{origin}" if origin else name
+
+
+def iter_zone_entries(source: str | TextIO, zone_name: str) -> Iterator[ZoneEntry]:
+    """
+    Read the resource records of a zone file one at a time.
+
+    The canonical files written by `named_compilezone` (one record per line, fully
+    qualified names) are read with a single split per line. Master file features like
+    `$ORIGIN`, relative and omitted owner names, comments and records spanning lines in
+    parentheses are supported as well; `$INCLUDE` and `$GENERATE` are not. Records
+    without a TTL have a ttl of None, so they keep the default TTL of the zone.
+
+    Args:
+        source: zone file name or open text file
+        zone_name: the zone name, the initial origin
+
+    Yields:
+        the records, with absolute owner names without the final dot
+
+    Raises:
+        ValueError: for lines that are not records
+    """
+    if isinstance(source, str):
+        with open(source, encoding="utf-8") as f:
+            yield from iter_zone_entries(f, zone_name)
+        return
+
+    origin = zone_name.rstrip(".")
+    owner = origin
+    pending = ""
+    depth = 0
+    for line in source:
+        change, line = _strip_parens(_strip_comment(line.rstrip("\n")))
+        if pending:
+            line = f"{pending} {line.strip()}"
+            pending = ""
+        depth += change
+        if depth > 0:
+            pending = line
+            continue
+        depth = 0
+        if not line.strip():
+            continue
+        if line.startswith("$"):
+            directive, _, value = line.partition(" ")
+            directive = directive.upper()
+            if directive == "$ORIGIN":
+                origin = _absolute(value.strip(), origin)
+            elif directive != "$TTL":
+                LOG.warning("%s: ignoring %s", zone_name, directive)
+            continue
+
+        blank_owner = line[0].isspace()
+        tokens = line.split()
+        consumed = 0
+        if not blank_owner:
+            owner = _absolute(tokens[0], origin)
+            consumed = 1
+        ttl = None
+        for _ in range(2):
+            token = tokens[consumed] if consumed < len(tokens) else ""
+            if token.upper() in _CLASSES:
+                consumed += 1
+            elif token[:1].isdigit():
+                ttl = dns.ttl.from_text(token)
+                consumed += 1
+        if consumed >= len(tokens):
+            raise ValueError(f"{zone_name}: invalid record {line.strip()!r}")
+        rdtype = tokens[consumed].upper()
+        parts = line.split(None, consumed + 1)
+        rdata = parts[consumed + 1].strip() if len(parts) > consumed + 1 else ""
+        yield ZoneEntry(owner, ttl, rdtype, rdata, origin)
+
+
+def _name(name: dns.name.Name) -> str:
+    return name.to_text(omit_final_dot=True)
+
+
+def _text(value: bytes) -> str:
+    return value.decode("utf-8", errors="backslashreplace")
+
+
+def _txt(rdata) -> dict:
+    if len(rdata.strings) == 1:
+        return {"text": _text(rdata.strings[0])}
+    return {"text": rdata.to_text()}
+
+
+# record type to (model, fields set from the rdata, function returning their values)
+RECORD_CONVERTERS = {
+    "A": (ARecord, ("address",), lambda r: {"address": IPv4Address(r.address)}),
+    "AAAA": (AAAARecord, ("address",), lambda r: {"address": IPv6Address(r.address)}),
+    "CNAME": (
+        CNAMERecord,
+        ("canonical_name",),
+        lambda r: {"canonical_name": _name(r.target)},
+    ),
+    "DNAME": (DNAMERecord, ("target",), lambda r: {"target": _name(r.target)}),
+    "PTR": (PTRRecord, ("dname",), lambda r: {"dname": _name(r.target)}),
+    "MX": (
+        MXRecord,
+        ("mx", "priority"),
+        lambda r: {"mx": _name(r.exchange), "priority": r.preference},
+    ),
+    "SRV": (
+        SRVRecord,
+        ("priority", "weight", "port", "target"),
+        lambda r: {
+            "priority": r.priority,
+            "weight": r.weight,
+            "port": r.port,
+            "target": _name(r.target),
+        },
+    ),
+    "TXT": (TXTRecord, ("text",), _txt),
+    "CAA": (
+        CAARecord,
+        ("flag", "type", "ca"),
+        lambda r: {"flag": r.flags, "type": _text(r.tag), "ca": _text(r.value)},
+    ),
+    "NAPTR": (
+        NAPTRRecord,
+        ("order", "preference", "flags", "services", "regexp", "replacement"),
+        lambda r: {
+            "order": r.order,
+            "preference": r.preference,
+            "flags": _text(r.flags),
+            "services": _text(r.service),
+            "regexp": _text(r.regexp),
+            "replacement": _name(r.replacement),
+        },
+    ),
+    "TLSA": (
+        TLSARecord,
+        ("certificate_usage", "selector", "matching_type", "certificate_data"),
+        lambda r: {
+            "certificate_usage": r.usage,
+            "selector": r.selector,
+            "matching_type": r.mtype,
+            "certificate_data": r.cert.hex(),
+        },
+    ),
+}
+
+# model class to a constructed instance copied for every record
+_TEMPLATES: dict[type, BaseModel] = {}
+
+
+# model class to its record type
+_RECORD_TYPES = {model: rdtype for rdtype, (model, _, _) in RECORD_CONVERTERS.items()}
+
+
+def record_columns(rdtype: str) -> list[str]:
+    """Return the CSV columns written for a record type."""
+    model, fields, _ = RECORD_CONVERTERS[rdtype]
+    names = ("fqdn", "view", *fields, "ttl")
+    if model is TLSARecord:
+        names = ("named", *names)
+    columns = {name: column for name, column, _ in serialization_plan(model).fields}
+    header = [f"header-{header_type(model)}"]
+    header.extend(columns[name] for name in names)
+    return header
+
+
+class ZoneConversion(NamedTuple):
+    """
+    The result of converting zone files to CSV.
+
+    Attributes:
+        files: the CSV file per NIOS object type
+        counts: the number of records written per NIOS object type
+        skipped: the number of records skipped per record type, i.e. SOA and NS records
+            or types without a model
+        errors: the records that could not be parsed
+    """
+
+    files: dict[str, str]
+    counts: dict[str, int]
+    skipped: dict[str, int]
+    errors: list[str]
+
+
+def iter_zone_models(
+    source: str | TextIO,
+    zone_name: str,
+    *,
+    view: str | None = None,
+    default_ttl: int | None = None,
+    skipped: dict[str, int] | None = None,
+    errors: list[str] | None = None,
+) -> Iterator[BaseModel]:
+    """
+    Convert the records of a zone file to NIOS CSV record models one at a time.
+
+    The rdata is parsed with dnspython and the models are created without
+    validation. SOA and NS records are skipped, because NIOS manages them for
+    its zones and delegations are imported as zones, as are record types
+    without a model.
+
+    Args:
+        source: zone file name or open text file
+        zone_name: the zone name
+        view: the DNS view of the records
+        default_ttl: TTL of the zone, record TTLs equal to it are left out
+        skipped: optional dict counting the skipped records per record type
+        errors: optional list collecting the records that could not be parsed
+
+    Yields:
+        the record models
+    """
+    # the origin of the rdata changes with every $ORIGIN directive
+    origin_text = None
+    origin = None
+    for entry in iter_zone_entries(source, zone_name):
+        converter = RECORD_CONVERTERS.get(entry.rdtype)
+        if converter is None:
+            if skipped is not None:
+                skipped[entry.rdtype] = skipped.get(entry.rdtype, 0) + 1
+            continue
+        model, _, convert = converter
+        if entry.origin != origin_text:
+            origin_text = entry.origin
+            origin = dns.name.from_text(f"{origin_text}.".lstrip("."))
+        try:
+            rdata = dns.rdata.from_text(
+                dns.rdataclass.IN,
+                entry.rdtype,
+                entry.rdata,
+                origin=origin,
+                relativize=False,
+            )
+        except (dns.exception.DNSException, ValueError) as exc:
+            message = f"{entry.name} {entry.rdtype} {entry.rdata}: {exc}"
+            LOG.warning("%s: %s", zone_name, message)
+            if errors is not None:
+                errors.append(message)
+            continue
+        values = convert(rdata)
+        values["fqdn"] = entry.name
+        values["view"] = view
+        values["ttl"] = entry.ttl if entry.ttl != default_ttl else None
+        if model is TLSARecord:
+            values["named"] = entry.name
+        template = _TEMPLATES.get(model)
+        if template is None:
+            template = _TEMPLATES[model] = model.model_construct()
+        yield template.model_copy(update=values)
+
+
+def zone_to_csv(
+    zone_file: str,
+    zone_name: str,
+    *,
+    view: str | None = None,
+    default_ttl: int | None = None,
+    import_action: str | None = None,
+    output_dir: str = ".",
+    file_prefix: str | None = None,
+) -> ZoneConversion:
+    """
+    Convert a zone file to one NIOS CSV file per record type.
+
+    The records are streamed from the zone file to the CSV files: every object type
+    has a fixed header, so nothing is buffered and zones of any size are converted in
+    constant memory. Run `named_compilezone` first to canonicalize zone files that use
+    `$INCLUDE` or `$GENERATE`.
+
+    Args:
+        zone_file: the zone file
+        zone_name: the zone name
+        view: the DNS view of the records
+        default_ttl: TTL of the zone, record TTLs equal to it are left out
+        import_action: optional import-action to be added to the header
+        output_dir: the directory of the CSV files
+        file_prefix: optional file name prefix, i.e. the zone name
+
+    Returns:
+        the CSV files, the record counts, the skipped records and the errors
+    """
+    files = {}
+    counts = {}
+    skipped = {}
+    errors = []
+    handles = {}
+    writers = {}
+    try:
+        for item in iter_zone_models(
+            zone_file,
+            zone_name,
+            view=view,
+            default_ttl=default_ttl,
+            skipped=skipped,
+            errors=errors,
+        ):
+            model = type(item)
+            writer = writers.get(model)
+            if writer is None:
+                object_type = header_type(model)
+                filename = f"{object_type}.csv"
+                if file_prefix:
+                    filename = f"{file_prefix}-{filename}"
+                filename = os.path.join(output_dir, filename)
+                handle = open(filename, "w", encoding="utf-8", newline="")
+                handles[model] = handle
+                writer = writers[model] = CsvModelWriter(
+                    handle,
+                    columns=record_columns(_RECORD_TYPES[model]),
+                    import_action=import_action,
+                )
+                files[object_type] = filename
+            writer.write(item)
+    finally:
+        for handle in handles.values():
+            handle.close()
+    for model, writer in writers.items():
+        counts[header_type(model)] = writer.rows
+    LOG.info("converted zone %s: %s", zone_name, counts)
+    return ZoneConversion(files, counts, skipped, errors)
+
+
+def _zone_part(args: tuple) -> ZoneConversion:
+    index, zone_file, zone_name, view, default_ttl, import_action, output_dir = args
+    return zone_to_csv(
+        zone_file,
+        zone_name,
+        view=view,
+        default_ttl=default_ttl,
+        import_action=import_action,
+        output_dir=output_dir,
+        file_prefix=f"{index:06d}",
+    )
+
+
+def zones_to_csv(
+    zones: Iterable[tuple[str, str]],
+    *,
+    view: str | None = None,
+    default_ttl: int | None = None,
+    import_action: str | None = None,
+    output_dir: str = ".",
+    file_prefix: str | None = None,
+    max_workers: int | None = None,
+    executor: Executor | None = None,
+) -> ZoneConversion:
+    """
+    Convert many zone files to one NIOS CSV file per record type, in parallel.
+
+    Every zone is converted by `zone_to_csv` in a worker process into temporary
+    files, which are then concatenated per record type. The headers are fixed per
+    record type, so the parts are appended without re-parsing.
+
+    Args:
+        zones: (zone file, zone name) pairs
+        view: the DNS view of the records
+        default_ttl: TTL of the zones, record TTLs equal to it are left out
+        import_action: optional import-action to be added to the header
+        output_dir: the directory of the CSV files
+        file_prefix: optional file name prefix
+        max_workers: number of worker processes, defaults to the number of CPUs
+        executor: optional executor to use instead of a new process pool
+
+    Returns:
+        the CSV files, the record counts, the skipped records and the errors
+    """
+    files = {}
+    counts = {}
+    skipped = {}
+    errors = []
+    outputs = {}
+    pool = executor or ProcessPoolExecutor(max_workers=max_workers)
+    with tempfile.TemporaryDirectory(dir=output_dir) as tmp:
+        try:
+            jobs = (
+                (index, zone_file, zone_name, view, default_ttl, import_action, tmp)
+                for index, (zone_file, zone_name) in enumerate(zones)
+            )
+            for result in pool.map(_zone_part, jobs):
+                for name, count in result.skipped.items():
+                    skipped[name] = skipped.get(name, 0) + count
+                errors.extend(result.errors)
+                for object_type, part in result.files.items():
+                    counts[object_type] = (
+                        counts.get(object_type, 0) + result.counts[object_type]
+                    )
+                    output = outputs.get(object_type)
+                    if output is None:
+                        filename = f"{object_type}.csv"
+                        if file_prefix:
+                            filename = f"{file_prefix}-{filename}"
+                        files[object_type] = os.path.join(output_dir, filename)
+                        output = outputs[object_type] = open(
+                            files[object_type], "w", encoding="utf-8", newline=""
+                        )
+                        with open(part, encoding="utf-8", newline="") as f:
+                            shutil.copyfileobj(f, output)
+                    else:
+                        with open(part, encoding="utf-8", newline="") as f:
+                            f.readline()
+                            shutil.copyfileobj(f, output)
+                    os.remove(part)
+        finally:
+            for output in outputs.values():
+                output.close()
+            if executor is None:
+                pool.shutdown()
+    LOG.info("converted zones: %s", counts)
+    return ZoneConversion(files, counts, skipped, errors)
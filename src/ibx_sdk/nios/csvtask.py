@@ -0,0 +1,750 @@
+"""
+Copyright 2023 Infoblox
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import csv
+import logging
+import os
+import re
+from typing import Iterable, Optional
+
+from pydantic import BaseModel, Field
+
+CSV_TASK_DONE_STATES = ("COMPLETED", "FAILED", "STOPPED")
+
+# NIOS CSV object types (the value of the `header-<type>` column) grouped into
+# dependency layers. Objects of one layer only reference objects of earlier layers,
+# so all objects of a layer can be imported at the same time once the previous
+# layer has finished. Unknown object types are imported after all known layers.
+CSV_IMPORT_ORDER = (
+    (
+        "griddhcp",
+        "memberdhcp",
+        "memberdns",
+        "networkview",
+        "namedacl",
+        "nsgroup",
+        "delegationnsgroup",
+        "forwardingmembernsgroup",
+        "forwardstubservernsgroup",
+        "stubmembernsgroup",
+        "optionspace",
+        "ipv6optionspace",
+        "dhcpfingerprint",
+        "dhcpmacfilter",
+        "dhcpfailoverassociation",
+    ),
+    (
+        "namedaclitem",
+        "optiondefinition",
+        "ipv6optiondefinition",
+        "macfilteraddress",
+        "optionfilter",
+        "relayagentfilter",
+        "dhcpfingerprintfilter",
+        "view",
+        "networkcontainer",
+        "ipv6networkcontainer",
+    ),
+    (
+        "optionfiltermatchrule",
+        "network",
+        "ipv6network",
+        "authzone",
+        "forwardzone",
+        "stubzone",
+    ),
+    (
+        "sharednetwork",
+        "ipv6sharednetwork",
+        "dhcprange",
+        "ipv6dhcprange",
+        "fixedaddress",
+        "ipv6fixedaddress",
+        "delegatedzone",
+    ),
+    (
+        "arecord",
+        "aaaarecord",
+        "aliasrecord",
+        "caarecord",
+        "cnamerecord",
+        "dnamerecord",
+        "mxrecord",
+        "naptrrecord",
+        "nsrecord",
+        "ptrrecord",
+        "srvrecord",
+        "tlsarecord",
+        "txtrecord",
+        "hostrecord",
+    ),
+    (
+        "hostaddress",
+        "ipv6hostaddress",
+    ),
+)
+
+_CSV_IMPORT_LAYERS = {
+    obj_type: layer
+    for layer, obj_types in enumerate(CSV_IMPORT_ORDER)
+    for obj_type in obj_types
+}
+
+
+_ERROR_HEADER_COLUMNS = ("error", "errors", "error message", "reason")
+_ERROR_CLASS_PATTERNS = (
+    (re.compile(r"'[^']*'|\"[^\"]*\""), "<value>"),
+    (re.compile(r"\b[0-9a-fA-F]{0,4}(?::[0-9a-fA-F]{0,4}){2,7}(?:/\d+)?"), "<ip>"),
+    (re.compile(r"\b\d{1,3}(?:\.\d{1,3}){3}(?:/\d+)?\b"), "<ip>"),
+    (re.compile(r"\b\d+\b"), "<n>"),
+    (re.compile(r"\s+"), " "),
+)
+
+
+def classify_csv_error(message: str) -> str:
+    """
+    Normalize a csv-errors message into an error class.
+
+    Quoted values, IP addresses and numbers are replaced by placeholders, so that messages
+    like `Duplicate object '10.0.0.0/24' ...` and `Duplicate object '10.0.1.0/24' ...`
+    share one class.
+
+    Args:
+        message (str): The error message as reported by the Grid.
+
+    Returns:
+        str: The error class.
+    """
+    for pattern, replacement in _ERROR_CLASS_PATTERNS:
+        message = pattern.sub(replacement, message)
+    return message.strip() or "unknown"
+
+
+class CsvImportError(BaseModel):
+    """
+    A single failed row of a CSV import.
+
+    Attributes:
+        line (int): The line number in the csv-errors file.
+        row (int | None): The row number in the import file, when reported by the Grid.
+        object_type (str): The NIOS CSV object type of the row, i.e. network.
+        message (str): The error message reported by the Grid.
+        error_class (str): The normalized error message, see `classify_csv_error`.
+        header (list[str]): The header row of the object type.
+        data (list[str]): The original data row.
+    """
+
+    line: int
+    row: Optional[int] = None
+    object_type: str
+    message: str = ""
+    error_class: str = "unknown"
+    header: list[str] = Field(default_factory=list)
+    data: list[str] = Field(default_factory=list)
+
+
+class CsvImportErrors(BaseModel):
+    """
+    The parsed content of one or more csv-errors files.
+
+    Attributes:
+        errors (list[CsvImportError]): The failed rows in file order.
+        by_class (dict[str, list[int]]): Indexes into `errors` per error class.
+        by_row (dict[int, int]): Index into `errors` per import file row number.
+    """
+
+    errors: list[CsvImportError] = Field(default_factory=list)
+    by_class: dict[str, list[int]] = Field(default_factory=dict)
+    by_row: dict[int, int] = Field(default_factory=dict)
+
+    def add(self, error: CsvImportError) -> None:
+        """
+        Append an error and index it.
+
+        Args:
+            error (CsvImportError): The error to add.
+        """
+        index = len(self.errors)
+        self.errors.append(error)
+        self.by_class.setdefault(error.error_class, []).append(index)
+        if error.row is not None:
+            self.by_row[error.row] = index
+
+    def extend(self, errors: Iterable[CsvImportError]) -> None:
+        """
+        Append and index several errors.
+
+        Args:
+            errors (Iterable[CsvImportError]): The errors to add.
+        """
+        for error in errors:
+            self.add(error)
+
+    def classes(self) -> dict[str, int]:
+        """
+        Count the errors per error class.
+
+        Returns:
+            dict[str, int]: The number of errors per class, most frequent first.
+        """
+        counts = {cls: len(indexes) for cls, indexes in self.by_class.items()}
+        return dict(sorted(counts.items(), key=lambda item: -item[1]))
+
+    def for_class(self, error_class: str) -> list[CsvImportError]:
+        """
+        Return the errors of one error class.
+
+        Args:
+            error_class (str): The error class.
+
+        Returns:
+            list[CsvImportError]: The matching errors in file order.
+        """
+        return [self.errors[i] for i in self.by_class.get(error_class, [])]
+
+    def for_row(self, row: int) -> Optional[CsvImportError]:
+        """
+        Return the error reported for a row of the import file.
+
+        Args:
+            row (int): The row number in the import file.
+
+        Returns:
+            CsvImportError | None: The error, or None if the row did not fail.
+        """
+        index = self.by_row.get(row)
+        return None if index is None else self.errors[index]
+
+    def write_retry_csv(
+        self, filename: str, error_classes: Optional[Iterable[str]] = None
+    ) -> int:
+        """
+        Write the failed rows into a new CSV import file.
+
+        Rows are grouped by object type, each group preceded by its header row, so the file
+        can be fixed and imported again without the rows that already succeeded.
+
+        Args:
+            filename (str): The retry CSV file to write.
+            error_classes (Iterable[str], optional): Only include rows of these error
+                classes. Default is all rows.
+
+        Returns:
+            int: The number of data rows written.
+        """
+        if error_classes is None:
+            selected = self.errors
+        else:
+            indexes = sorted(
+                i for cls in error_classes for i in self.by_class.get(cls, [])
+            )
+            selected = [self.errors[i] for i in indexes]
+
+        groups = {}
+        for error in selected:
+            groups.setdefault(tuple(error.header), []).append(error.data)
+        count = 0
+        with open(filename, "w", encoding="utf8", newline="") as fh_out:
+            writer = csv.writer(fh_out)
+            for header, rows in groups.items():
+                writer.writerow(header)
+                writer.writerows(rows)
+                count += len(rows)
+        logging.info("wrote %s rows to retry file %s", count, filename)
+        return count
+
+
+def parse_csv_errors_file(filename: str) -> CsvImportErrors:
+    """
+    Parse a downloaded csv-errors file into indexed, structured errors.
+
+    The file is read row by row. Rows starting with `header-` set the header of the rows
+    that follow. A numeric cell in front of the object type is taken as the row number in
+    the import file, and cells beyond the header width, or a trailing column named like
+    `error`, hold the error message.
+
+    Args:
+        filename (str): The path to the csv-errors file.
+
+    Returns:
+        CsvImportErrors: The parsed errors.
+    """
+    logging.debug("parsing csv-errors file %s", filename)
+    result = CsvImportErrors()
+    header = []
+    width = 0
+    with open(filename, "r", encoding="utf8", newline="") as handle:
+        for line, row in enumerate(csv.reader(handle), start=1):
+            if not row or not any(cell.strip() for cell in row):
+                continue
+            first = row[0].strip().lower()
+            if first.startswith("header-"):
+                width = len(row)
+                if width > 1 and row[-1].strip().lower() in _ERROR_HEADER_COLUMNS:
+                    width -= 1
+                header = row[:width]
+                continue
+
+            row_number = None
+            if first.isdigit() and len(row) > 1:
+                row_number = int(first)
+                row = row[1:]
+            object_type = row[0].strip().lower()
+            if header:
+                data, extra = row[:width], row[width:]
+            else:
+                data, extra = row, []
+            message = ",".join(cell for cell in extra if cell).strip()
+            result.add(
+                CsvImportError(
+                    line=line,
+                    row=row_number,
+                    object_type=object_type,
+                    message=message,
+                    error_class=classify_csv_error(message),
+                    header=header,
+                    data=data,
+                )
+            )
+    return result
+
+
+class CsvTaskProgress(BaseModel):
+    """
+    A progress event for a NIOS CSV Job Manager import task.
+
+    Attributes:
+        ref (str): The `_ref` of the csvimporttask object.
+        status (str): The task status reported by the Grid, i.e. RUNNING or COMPLETED.
+        lines_processed (int): Number of CSV lines processed so far.
+        lines_failed (int): Number of CSV lines that failed to import.
+        lines_warning (int): Number of CSV lines imported with warnings.
+        lines_total (int | None): Number of CSV lines in the import, when known.
+        elapsed (float): Seconds since the caller started waiting on the task.
+        rate (float | None): Smoothed processing rate in lines per second.
+        eta (float | None): Estimated seconds until the task completes.
+        done (bool): True once the task has reached a final state.
+        errors_file (str | None): The downloaded csv-errors file, if any.
+        error_log (CsvImportErrors | None): The structured csv-errors, if any.
+        task (dict): The raw csvimporttask object returned by WAPI.
+    """
+
+    ref: str
+    status: str
+    lines_processed: int = 0
+    lines_failed: int = 0
+    lines_warning: int = 0
+    lines_total: Optional[int] = None
+    elapsed: float = 0.0
+    rate: Optional[float] = None
+    eta: Optional[float] = None
+    done: bool = False
+    errors_file: Optional[str] = None
+    error_log: Optional[CsvImportErrors] = None
+    task: dict = Field(default_factory=dict)
+
+
+class CsvTaskBackoff:
+    """
+    Adaptive polling interval for a CSV import task.
+
+    The interval is derived from the observed `lines_processed` rate. While the task makes
+    progress and the total number of lines is known, the next poll is scheduled at a fraction
+    of the estimated time remaining. The first poll waits `min_interval`; while the task is
+    idle (pending, or no new lines since the last poll) the interval grows geometrically. The
+    interval is always clamped to [min_interval, max_interval].
+
+    Args:
+        min_interval (float): The shortest delay between two polls in seconds.
+        max_interval (float): The longest delay between two polls in seconds.
+        factor (float): Growth factor applied to the delay while no progress is observed.
+        smoothing (float): Weight of the newest rate sample in the moving average (0-1].
+    """
+
+    def __init__(
+        self,
+        min_interval: float = 1.0,
+        max_interval: float = 60.0,
+        factor: float = 2.0,
+        smoothing: float = 0.5,
+    ) -> None:
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError("invalid polling interval bounds")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.factor = factor
+        self.smoothing = smoothing
+        self.delay = min_interval
+        self.rate = None
+        self._last_lines = None
+        self._last_time = None
+
+    def update(
+        self, lines_processed: int, now: float, lines_total: Optional[int] = None
+    ) -> float:
+        """
+        Record a poll result and return the delay until the next poll.
+
+        Args:
+            lines_processed (int): The lines_processed value of the latest poll.
+            now (float): A monotonic timestamp of the latest poll.
+            lines_total (int, optional): Total number of lines in the import.
+
+        Returns:
+            float: Seconds to wait before polling again.
+        """
+        first = self._last_time is None
+        progressed = False
+        if not first and now > self._last_time:
+            sample = (lines_processed - self._last_lines) / (now - self._last_time)
+            if sample > 0:
+                progressed = True
+                if self.rate is None:
+                    self.rate = sample
+                else:
+                    self.rate = (
+                        self.smoothing * sample
+                        + (1 - self.smoothing) * self.rate
+                    )
+        self._last_lines = lines_processed
+        self._last_time = now
+
+        if first:
+            # nothing to compare with yet
+            self.delay = self.min_interval
+        elif progressed:
+            eta = self.eta(lines_processed, lines_total)
+            if eta is not None:
+                # poll a few times before the expected completion
+                self.delay = eta / 4
+        else:
+            self.delay = self.delay * self.factor
+        self.delay = min(max(self.delay, self.min_interval), self.max_interval)
+        return self.delay
+
+    def eta(
+        self, lines_processed: int, lines_total: Optional[int] = None
+    ) -> Optional[float]:
+        """
+        Estimate the seconds remaining for the task.
+
+        Args:
+            lines_processed (int): Lines processed so far.
+            lines_total (int, optional): Total number of lines in the import.
+
+        Returns:
+            float | None: The estimate, or None if the rate or total is unknown.
+        """
+        if not self.rate or not lines_total:
+            return None
+        return max(lines_total - lines_processed, 0) / self.rate
+
+
+def csv_task_progress(
+    task: dict,
+    backoff: CsvTaskBackoff,
+    elapsed: float,
+    lines_total: Optional[int] = None,
+) -> CsvTaskProgress:
+    """
+    Build a progress event from a csvimporttask object.
+
+    Args:
+        task (dict): The csvimporttask object returned by `csvtask_status`.
+        backoff (CsvTaskBackoff): The backoff tracking the task's processing rate.
+        elapsed (float): Seconds since waiting on the task started.
+        lines_total (int, optional): Total number of lines in the import.
+
+    Returns:
+        CsvTaskProgress: The progress event.
+    """
+    status = str(task.get("status", "")).upper()
+    lines_processed = int(task.get("lines_processed") or 0)
+    done = status in CSV_TASK_DONE_STATES
+    return CsvTaskProgress(
+        ref=task.get("_ref", ""),
+        status=status,
+        lines_processed=lines_processed,
+        lines_failed=int(task.get("lines_failed") or 0),
+        lines_warning=int(task.get("lines_warning") or 0),
+        lines_total=lines_total,
+        elapsed=elapsed,
+        rate=backoff.rate,
+        eta=0.0 if done else backoff.eta(lines_processed, lines_total),
+        done=done,
+        task=task,
+    )
+
+
+def count_csv_data_lines(filename: str) -> int:
+    """
+    Count the data rows of a NIOS CSV import file, excluding header rows.
+
+    Args:
+        filename (str): The path to the CSV import file.
+
+    Returns:
+        int: The number of non-empty rows not starting with `header-`.
+    """
+    count = 0
+    with open(filename, "r", encoding="utf8", newline="") as handle:
+        for row in csv.reader(handle):
+            if row and not row[0].strip().lower().startswith("header-"):
+                count += 1
+    return count
+
+
+class CsvImportChunk(BaseModel):
+    """
+    A chunk of a CSV import file holding rows of a single object type.
+
+    Attributes:
+        object_type (str): The NIOS CSV object type, i.e. network or hostrecord.
+        filename (str): The path of the chunk file.
+        layer (int): The dependency layer of the object type.
+        lines (int): The number of data rows in the chunk.
+        rows (list[int]): The row number in the import file of every data row.
+    """
+
+    object_type: str
+    filename: str
+    layer: int
+    lines: int = 0
+    rows: list[int] = Field(default_factory=list)
+
+    def source_row(self, row: int) -> Optional[int]:
+        """
+        Map a row number of the chunk file to the row number in the import file.
+
+        Args:
+            row (int): The row number in the chunk file, the header row being row 1.
+
+        Returns:
+            int | None: The row number in the import file, or None if out of range.
+        """
+        if 2 <= row < len(self.rows) + 2:
+            return self.rows[row - 2]
+        return None
+
+
+class CsvImportReport(BaseModel):
+    """
+    The merged result of a CSV import submitted as several chunks.
+
+    Attributes:
+        filename (str): The original CSV import file.
+        status (str): COMPLETED if every chunk completed, otherwise the first other status.
+        lines_processed (int): Sum of processed lines over all chunks.
+        lines_failed (int): Sum of failed lines over all chunks.
+        lines_warning (int): Sum of lines with warnings over all chunks.
+        tasks (list[dict]): One summary per submitted chunk, in submission order.
+        skipped (list[str]): Chunk files not submitted because an earlier layer failed.
+        errors_file (str | None): The merged csv-errors file, if any chunk had errors.
+        error_log (CsvImportErrors | None): The merged structured csv-errors, if any.
+    """
+
+    filename: str
+    status: str = "COMPLETED"
+    lines_processed: int = 0
+    lines_failed: int = 0
+    lines_warning: int = 0
+    tasks: list[dict] = Field(default_factory=list)
+    skipped: list[str] = Field(default_factory=list)
+    errors_file: Optional[str] = None
+    error_log: Optional[CsvImportErrors] = None
+
+
+def csv_import_layer(object_type: str) -> int:
+    """
+    Return the dependency layer of a NIOS CSV object type.
+
+    Args:
+        object_type (str): The object type with or without the `header-` prefix.
+
+    Returns:
+        int: The index into `CSV_IMPORT_ORDER`, or `len(CSV_IMPORT_ORDER)` for unknown types.
+    """
+    object_type = object_type.strip().lower()
+    if object_type.startswith("header-"):
+        object_type = object_type[len("header-"):]
+    return _CSV_IMPORT_LAYERS.get(object_type, len(CSV_IMPORT_ORDER))
+
+
+def split_csv_import_file(
+    filename: str, max_rows: int, output_path: str = "."
+) -> list[CsvImportChunk]:
+    """
+    Split a NIOS CSV import file into chunks of at most `max_rows` data rows.
+
+    The file is read in a single pass. Every chunk holds rows of a single object type and
+    starts with the header row of that object type, so it can be imported on its own. Files
+    mixing several object types, like a global CSV export, are supported.
+
+    Args:
+        filename (str): The CSV import file to split.
+        max_rows (int): The maximum number of data rows per chunk.
+        output_path (str): The directory where chunk files are written. Defaults to the
+            current directory.
+
+    Returns:
+        list[CsvImportChunk]: The chunks in the order they were written.
+
+    Raises:
+        ValueError: If `max_rows` is not positive or a data row precedes any header row.
+    """
+    if max_rows < 1:
+        raise ValueError("max_rows must be a positive integer")
+    os.makedirs(output_path, exist_ok=True)
+    base = os.path.splitext(os.path.basename(filename))[0].replace("-", "_")
+
+    chunks = []
+    counters = {}
+    header = None
+    object_type = None
+    chunk = None
+    fh_out = None
+    writer = None
+    try:
+        with open(filename, "r", encoding="utf8", newline="") as handle:
+            for lineno, row in enumerate(csv.reader(handle), start=1):
+                if not row or not any(cell.strip() for cell in row):
+                    continue
+                first = row[0].strip().lower()
+                if first.startswith("header-"):
+                    header = row
+                    object_type = first[len("header-"):]
+                    chunk = None
+                    continue
+                if header is None:
+                    raise ValueError(
+                        f"{filename}:{lineno}: data row found before a header row"
+                    )
+                if chunk is None or chunk.lines >= max_rows:
+                    if fh_out:
+                        fh_out.close()
+                    counters[object_type] = counters.get(object_type, 0) + 1
+                    chunk = CsvImportChunk(
+                        object_type=object_type,
+                        filename=os.path.join(
+                            output_path,
+                            f"{base}_{object_type}_{counters[object_type]:04d}.csv",
+                        ),
+                        layer=csv_import_layer(object_type),
+                    )
+                    chunks.append(chunk)
+                    fh_out = open(chunk.filename, "w", encoding="utf8", newline="")
+                    writer = csv.writer(fh_out)
+                    writer.writerow(header)
+                writer.writerow(row)
+                chunk.lines += 1
+                chunk.rows.append(lineno)
+    finally:
+        if fh_out:
+            fh_out.close()
+
+    logging.info("split %s into %s chunk(s)", filename, len(chunks))
+    return chunks
+
+
+def plan_csv_import(chunks: list[CsvImportChunk]) -> list[list[CsvImportChunk]]:
+    """
+    Group chunks into dependency layers.
+
+    Args:
+        chunks (list[CsvImportChunk]): The chunks returned by `split_csv_import_file`.
+
+    Returns:
+        list[list[CsvImportChunk]]: Non-empty layers in import order. Chunks of one layer
+            can be imported concurrently.
+    """
+    layers = {}
+    for chunk in chunks:
+        layers.setdefault(chunk.layer, []).append(chunk)
+    return [layers[layer] for layer in sorted(layers)]
+
+
+def merge_csv_import_results(
+    filename: str,
+    results: list[tuple[CsvImportChunk, CsvTaskProgress]],
+    skipped: Optional[list[CsvImportChunk]] = None,
+) -> CsvImportReport:
+    """
+    Merge the final progress events of chunked CSV imports into one report.
+
+    The csv-errors files of all chunks are concatenated into
+    `csv-errors-<import file name>.csv` in the current directory, like `get_csv_errors_file`.
+    The row numbers of the merged `error_log` refer to the original import file.
+
+    Args:
+        filename (str): The original CSV import file.
+        results (list[tuple[CsvImportChunk, CsvTaskProgress]]): The chunk and final progress
+            event of each submitted chunk.
+        skipped (list[CsvImportChunk], optional): Chunks which were not submitted.
+
+    Returns:
+        CsvImportReport: The merged report.
+    """
+    report = CsvImportReport(
+        filename=filename,
+        skipped=[chunk.filename for chunk in skipped or []],
+    )
+    errors_files = []
+    error_log = CsvImportErrors()
+    for chunk, progress in results:
+        report.lines_processed += progress.lines_processed
+        report.lines_failed += progress.lines_failed
+        report.lines_warning += progress.lines_warning
+        if progress.status != "COMPLETED" and report.status == "COMPLETED":
+            report.status = progress.status
+        report.tasks.append(
+            {
+                "object_type": chunk.object_type,
+                "filename": chunk.filename,
+                "layer": chunk.layer,
+                "import_id": progress.task.get("import_id"),
+                "status": progress.status,
+                "lines_processed": progress.lines_processed,
+                "lines_failed": progress.lines_failed,
+                "lines_warning": progress.lines_warning,
+                "errors_file": progress.errors_file,
+            }
+        )
+        if progress.errors_file:
+            errors_files.append(progress.errors_file)
+        if progress.error_log:
+            for error in progress.error_log.errors:
+                if error.row is not None:
+                    # row numbers are relative to the chunk file
+                    error = error.model_copy(
+                        update={"row": chunk.source_row(error.row)}
+                    )
+                error_log.add(error)
+    if report.skipped and report.status == "COMPLETED":
+        report.status = "STOPPED"
+
+    if errors_files:
+        name = os.path.basename(filename)
+        report.errors_file = f"csv-errors-{name}.csv"
+        with open(report.errors_file, "w", encoding="utf8", newline="") as fh_out:
+            for errors_file in errors_files:
+                with open(errors_file, "r", encoding="utf8", newline="") as fh_in:
+                    content = fh_in.read()
+                fh_out.write(content)
+                if content and not content.endswith("\n"):
+                    fh_out.write("\n")
+    if error_log.errors:
+        report.error_log = error_log
+    return report
@@ -18,11 +18,27 @@ import logging
 import os
 import pprint
 import re
-from typing import Literal, Optional
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Iterator, Literal, Optional
 
 import httpx
 
+from ibx_sdk.nios.csvtask import (
+    CsvImportChunk,
+    CsvImportReport,
+    CsvTaskBackoff,
+    CsvTaskProgress,
+    csv_task_progress,
+    merge_csv_import_results,
+    parse_csv_errors_file,
+    plan_csv_import,
+    split_csv_import_file,
+)
 from ibx_sdk.nios.exceptions import WapiRequestException
+from ibx_sdk.nios.pipeline import PipelineResult, PipelineStage, StreamPipeline
 from ibx_sdk.util import util
 
 CsvOperation = Literal[
@@ -382,7 +398,202 @@ class NiosFileopMixin:
 
         return res.json()
 
-    def get_csv_errors_file(self, filename: str, job_id: str) -> None:
+    def wait_for_csvtask(
+        self,
+        csvtask: dict,
+        lines_total: Optional[int] = None,
+        min_interval: float = 1.0,
+        max_interval: float = 60.0,
+        timeout: Optional[float] = None,
+        fetch_errors: bool = True,
+    ) -> Iterator[CsvTaskProgress]:
+        """
+        Wait for a CSV import task to finish, yielding progress events along the way.
+
+        The task is polled with an adaptive backoff: the interval is tuned from the task's
+        `lines_processed` rate and grows while the task is idle, so short imports finish quickly
+        without hammering the Grid Master during long ones. When the task finishes with failed
+        lines, the csv-errors file is fetched and parsed into the final event as indexed,
+        structured errors (`error_log`).
+
+        Args:
+            csvtask (dict): The task returned by `csv_import`.
+            lines_total (int, optional): Number of data lines in the import, used for the ETA.
+                Use `csvtask.count_csv_data_lines` on the import file to obtain it.
+            min_interval (float): Shortest delay between polls in seconds. Default is 1.0.
+            max_interval (float): Longest delay between polls in seconds. Default is 60.0.
+            timeout (float, optional): Give up after this many seconds. Default is None.
+            fetch_errors (bool): Download and parse the csv-errors file when lines failed.
+                Default is True.
+
+        Yields:
+            CsvTaskProgress: One event per poll, the last one with `done` set to True.
+
+        Raises:
+            WapiRequestException: If a request fails or the timeout expires.
+
+        Example usage:
+
+        ```python
+        csvtask = wapi.csv_import(task_operation="INSERT", csv_import_file="networks.csv")
+        for progress in wapi.wait_for_csvtask(csvtask):
+            print(progress.status, progress.lines_processed, progress.eta)
+        ```
+        """
+        backoff = CsvTaskBackoff(
+            min_interval=min_interval, max_interval=max_interval
+        )
+        started = time.monotonic()
+        while True:
+            task = self.csvtask_status(csvtask)
+            now = time.monotonic()
+            delay = backoff.update(
+                int(task.get("lines_processed") or 0), now, lines_total
+            )
+            progress = csv_task_progress(
+                task, backoff, now - started, lines_total
+            )
+            logging.info(
+                "csv import task %s: %s lines processed, %s failed",
+                progress.status,
+                progress.lines_processed,
+                progress.lines_failed,
+            )
+            if progress.done:
+                if fetch_errors and progress.lines_failed:
+                    import_task = csvtask.get("csv_import_task", {})
+                    progress.errors_file = self.get_csv_errors_file(
+                        filename=task.get("file_name")
+                        or import_task.get("file_name"),
+                        job_id=task.get("import_id")
+                        or import_task.get("import_id"),
+                    )
+                    progress.error_log = parse_csv_errors_file(
+                        progress.errors_file
+                    )
+                yield progress
+                return
+            yield progress
+            if timeout is not None:
+                remaining = timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    raise WapiRequestException(
+                        f"csv import task {progress.ref} did not complete "
+                        f"within {timeout} seconds"
+                    )
+                delay = min(delay, remaining)
+            time.sleep(delay)
+
+    def csv_import_parallel(
+        self,
+        task_operation: CsvOperation,
+        csv_import_file: str,
+        max_rows: int = 10000,
+        max_workers: int = 4,
+        exit_on_error: bool = False,
+        output_path: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> CsvImportReport:
+        """
+        Perform a large CSV import as several smaller CSV import tasks.
+
+        The import file is split into chunks of at most `max_rows` data rows per object
+        type. The chunks are grouped into dependency layers (network views before networks,
+        zones before records, host records before host addresses, and so on) and the layers
+        are imported one after the other. The chunks of one layer are submitted
+        concurrently, at most `max_workers` at a time. When all chunks have finished, their
+        results and csv-errors files are merged into a single report.
+
+        Note:
+            Objects of the same type are imported concurrently. Import files that rely on the
+            row order within one object type, i.e. nested network containers, should be
+            imported with `csv_import` or with a `max_rows` large enough to keep them in one
+            chunk.
+
+        Args:
+            task_operation (CsvOperation): The operation to be performed on the CSV file.
+            csv_import_file (str): The path to the CSV file to be imported.
+            max_rows (int): The maximum number of data rows per chunk. Default is 10000.
+            max_workers (int): The maximum number of concurrent import tasks. Default is 4.
+            exit_on_error (bool): Stop each import task on the first error, and do not submit
+                further layers once a layer had failures. Default is False.
+            output_path (str, optional): Directory for the chunk files. Default is a new
+                temporary directory, which is removed unless chunks failed or were
+                skipped.
+            timeout (float, optional): Give up on a chunk after this many seconds.
+                Default is None.
+
+        Returns:
+            CsvImportReport: The merged result of all chunks.
+
+        Raises:
+            WapiRequestException: If a request fails or a chunk times out.
+
+        Example usage:
+
+        ```python
+        report = wapi.csv_import_parallel(
+            task_operation="INSERT", csv_import_file="hosts.csv", max_rows=5000
+        )
+        print(report.status, report.lines_processed, report.lines_failed)
+        ```
+        """
+        temp_dir = output_path is None
+        if temp_dir:
+            output_path = tempfile.mkdtemp(prefix="csvimport-")
+        report = None
+        try:
+            chunks = split_csv_import_file(csv_import_file, max_rows, output_path)
+            layers = plan_csv_import(chunks)
+
+            results = []
+            skipped = []
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for index, layer in enumerate(layers):
+                    logging.info(
+                        "submitting layer %s: %s chunk(s)", index + 1, len(layer)
+                    )
+                    futures = [
+                        executor.submit(
+                            self.__csv_import_chunk,
+                            task_operation,
+                            chunk,
+                            exit_on_error,
+                            timeout,
+                        )
+                        for chunk in layer
+                    ]
+                    layer_results = [future.result() for future in futures]
+                    results.extend(layer_results)
+                    if exit_on_error and any(
+                        progress.lines_failed or progress.status != "COMPLETED"
+                        for _, progress in layer_results
+                    ):
+                        skipped = [c for rest in layers[index + 1:] for c in rest]
+                        logging.error(
+                            "layer %s had failures, skipping %s chunk(s)",
+                            index + 1,
+                            len(skipped),
+                        )
+                        break
+
+            report = merge_csv_import_results(csv_import_file, results, skipped)
+            return report
+        finally:
+            if temp_dir:
+                if report is not None and (
+                    report.skipped
+                    or report.lines_failed
+                    or report.status != "COMPLETED"
+                ):
+                    logging.warning(
+                        "keeping the chunk files of the failed import in %s",
+                        output_path,
+                    )
+                else:
+                    shutil.rmtree(output_path, ignore_errors=True)
+
+    def get_csv_errors_file(self, filename: str, job_id: str) -> str:
         """
         Fetches the csv-errors file for a specific job ID.
 
@@ -391,7 +602,7 @@ class NiosFileopMixin:
             job_id (str): The job ID for which the csv-errors file should be fetched.
 
         Returns:
-            None
+            str: The name of the saved csv-errors file.
 
         Raises:
             httpx.RequestError: If there is an error during the request.
@@ -430,6 +641,8 @@ class NiosFileopMixin:
             logging.error(exc)
             raise WapiRequestException(exc)
 
+        return csv_error_file
+
     def download_certificate(
         self,
         member: str,
@@ -797,6 +1010,102 @@ class NiosFileopMixin:
         logging.info("step 2 - saving backup to %s", filename)
         self.file_download(token=token, url=download_url, filename=filename)
 
+    def grid_backup_pipeline(
+        self,
+        stages: Optional[list[PipelineStage]] = None,
+        filename: Optional[str] = None,
+        sink: Optional[BinaryIO] = None,
+        chunk_size: int = 1048576,
+        max_pending: int = 8,
+    ) -> PipelineResult:
+        """
+        Perform a NIOS Grid Backup and stream it through a pipeline of stages.
+
+        The backup is read from the Grid in `chunk_size` chunks and passed through the
+        stages (i.e. compression, hashing or encryption) and into a file or a user-supplied
+        sink in a single pass. The stages run on a worker thread, so they do not slow down
+        the network read.
+
+        Args:
+            stages (list[PipelineStage], optional): The stages to apply, in order, i.e.
+                `[ZstdStage(), HashStage()]`. Default is no stages.
+            filename (str, optional): The file to write. Default is 'database.bak'.
+                Ignored when `sink` is given.
+            sink (BinaryIO, optional): A writable binary file object to write to instead of
+                a file. It is flushed but not closed.
+            chunk_size (int): The size of the chunks read from the Grid. Default is 1 MiB.
+            max_pending (int): Maximum number of chunks waiting for the stages.
+                Default is 8.
+
+        Returns:
+            PipelineResult: The number of bytes read and written, and the values reported by
+                the stages, i.e. digests.
+
+        Raises:
+            WapiRequestException: If an error occurs during the backup process.
+
+        Example usage:
+
+        ```python
+        from ibx_sdk.nios.pipeline import GzipStage, HashStage
+
+        result = wapi.grid_backup_pipeline(
+            stages=[GzipStage(), HashStage()], filename="database.bak.gz"
+        )
+        print(result.bytes_out, result.results["sha256"])
+        ```
+        """
+        payload = {"type": "BACKUP"}
+        if sink is None and not filename:
+            filename = "database.bak"
+        target = sink if sink is not None else filename
+
+        logging.info("step 1 - request gridbackup %s", filename)
+        try:
+            res = self.__getgriddata(payload)
+        except httpx.RequestError as exc:
+            logging.error(exc)
+            raise WapiRequestException(exc)
+
+        token = res.get("token")
+        download_url = res.get("url")
+
+        logging.info("step 2 - streaming backup to %s", target)
+        pipeline = StreamPipeline(stages or [], target, max_pending=max_pending)
+        try:
+            self.__stream_download(download_url, pipeline, chunk_size)
+        except httpx.TimeoutException as exc:
+            pipeline.abort()
+            logging.error(f"Timeout error: {exc}")
+            raise WapiRequestException(exc) from exc
+        except httpx.HTTPStatusError as exc:
+            pipeline.abort()
+            logging.error(f"HTTP error: {exc}")
+            raise WapiRequestException(exc) from exc
+        except httpx.RequestError as exc:
+            pipeline.abort()
+            logging.error(f"Request error: {exc}")
+            raise WapiRequestException(exc) from exc
+        except Exception as exc:
+            pipeline.abort()
+            logging.error(f"Pipeline error: {exc}")
+            raise WapiRequestException(exc) from exc
+        except BaseException:
+            pipeline.abort()
+            raise
+        try:
+            result = pipeline.close()
+        except Exception as exc:
+            logging.error(f"Pipeline error: {exc}")
+            raise WapiRequestException(exc) from exc
+
+        try:
+            self.__download_complete(token, filename or "backup stream")
+        except httpx.RequestError as exc:
+            logging.error(exc)
+            raise WapiRequestException(exc)
+        return result
+
     def grid_restore(
         self,
         filename: str = "database.bak",
@@ -879,7 +1188,7 @@ class NiosFileopMixin:
         start_time: int = None,
         end_time: int = None,
         remove_url: str = None,
-    ) -> None:
+    ) -> str:
         """
         fetch DHCP lease history files from a NIOS Grid Member
 
@@ -890,7 +1199,8 @@ class NiosFileopMixin:
             remove_url: An optional string representing the remove URL. Defaults to None.
 
         Returns:
-            A string representing the filename of the downloaded DHCP lease history file.
+            A string representing the filename of the downloaded DHCP lease history file. Use
+            `ibx_sdk.nios.lease_history.iter_lease_history` to stream its events.
 
         Raises:
             WapiRequestException: If there is an error in the API request.
@@ -920,7 +1230,11 @@ class NiosFileopMixin:
         download_url = obj.get("url")
         download_token = obj.get("token")
 
-        self.file_download(token=download_token, url=download_url)
+        filename = util.extract_filename_from_url(download_url)
+        self.file_download(
+            token=download_token, url=download_url, filename=filename
+        )
+        return filename
 
     def __csv_import(
         self,
@@ -965,6 +1279,25 @@ class NiosFileopMixin:
 
         return res.json()
 
+    def __csv_import_chunk(
+        self,
+        task_operation: CsvOperation,
+        chunk: CsvImportChunk,
+        exit_on_error: bool,
+        timeout: Optional[float],
+    ) -> tuple[CsvImportChunk, CsvTaskProgress]:
+        csvtask = self.csv_import(
+            task_operation=task_operation,
+            csv_import_file=chunk.filename,
+            exit_on_error=exit_on_error,
+        )
+        progress = None
+        for progress in self.wait_for_csvtask(
+            csvtask, lines_total=chunk.lines, timeout=timeout
+        ):
+            pass
+        return chunk, progress
+
     def __download_complete(self, token: str, filename: str) -> None:
         header = {"Content-type": "application/json"}
         payload = {"token": token}
@@ -1002,6 +1335,22 @@ class NiosFileopMixin:
                 for chunk in res.iter_bytes(chunk_size=1024):
                     file_out.write(chunk)
 
+    def __stream_download(
+        self, download_url: str, pipeline: StreamPipeline, chunk_size: int
+    ) -> None:
+        download_url = self.__update_url(url=download_url)
+        header = {"Content-type": "application/force-download"}
+        logging.info(download_url)
+        self.conn.verify = self.ssl_verify
+        with self.conn.stream(
+            "GET",
+            download_url,
+            headers=header,
+        ) as res:
+            res.raise_for_status()
+            for chunk in res.iter_bytes(chunk_size=chunk_size):
+                pipeline.feed(chunk)
+
     def __getgriddata(self, payload: dict) -> dict:
         headers = {"content-type": "application/json"}
         try:
@@ -0,0 +1,391 @@
+"""
+Copyright 2023 Infoblox
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import calendar
+import csv
+import gzip
+import io
+import logging
+import re
+import sqlite3
+import tarfile
+import time
+from typing import IO, Iterable, Iterator, NamedTuple, Optional, Union
+
+
+class LeaseEvent(NamedTuple):
+    """
+    A single DHCP lease history event.
+
+    Attributes:
+        timestamp (int | None): Time of the event in epoch seconds (UTC).
+        action (str): The lease action or state, i.e. Issued, Renewed or Freed.
+        ip (str): The leased IPv4 or IPv6 address.
+        mac (str): The MAC address (lower case, colon separated) or DUID of the client.
+        hostname (str): The client hostname.
+        start (int | None): Start of the lease in epoch seconds (UTC).
+        end (int | None): End of the lease in epoch seconds (UTC).
+        member (str): The Grid Member that served the lease.
+        protocol (str): IPV4 or IPV6.
+        fingerprint (str): The DHCP fingerprint of the client.
+    """
+
+    timestamp: Optional[int]
+    action: str
+    ip: str
+    mac: str
+    hostname: str = ""
+    start: Optional[int] = None
+    end: Optional[int] = None
+    member: str = ""
+    protocol: str = ""
+    fingerprint: str = ""
+
+
+# lease history column names, normalized to lower case alphanumerics, per event field
+LEASE_COLUMN_ALIASES = {
+    "timestamp": ("time", "timestamp", "eventtime", "date", "datetime"),
+    "action": ("action", "leasestate", "state", "bindingstate", "event"),
+    "ip": ("ipaddress", "ip", "address", "leaseip", "ipv4address", "ipv6address"),
+    "mac": ("macduid", "macaddress", "mac", "duid", "hardware", "hwaddress"),
+    "hostname": ("clienthostname", "hostname", "host", "name"),
+    "start": ("leasestart", "start", "starts", "starttime"),
+    "end": ("leaseend", "end", "ends", "endtime"),
+    "member": ("member", "membername", "gridmember", "server", "leaseserver"),
+    "protocol": ("protocol", "type"),
+    "fingerprint": ("fingerprint", "dhcpfingerprint"),
+}
+
+# column order assumed for files without a recognizable header row
+DEFAULT_LEASE_COLUMNS = (
+    "timestamp",
+    "protocol",
+    "action",
+    "ip",
+    "mac",
+    "hostname",
+    "start",
+    "end",
+    "member",
+    "fingerprint",
+)
+
+_TIME_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y/%m/%d %H:%M:%S",
+    "%m/%d/%Y %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%a %b %d %H:%M:%S %Y",
+)
+_NON_ALNUM = re.compile(r"[^a-z0-9]")
+_MAC_SEPARATORS = re.compile(r"[-.]")
+
+
+def parse_lease_time(value: str) -> Optional[int]:
+    """
+    Convert a lease history time value into epoch seconds.
+
+    Epoch values and common date formats are accepted. Dates are taken as UTC; a trailing
+    `UTC`, `GMT` or `Z` is ignored.
+
+    Args:
+        value (str): The time value.
+
+    Returns:
+        int | None: The epoch seconds, or None if the value is empty or not recognized.
+    """
+    value = value.strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return int(value)
+    for suffix in (" UTC", " GMT", "Z"):
+        if value.endswith(suffix):
+            value = value[: -len(suffix)].strip()
+            break
+    value = value.split(".", 1)[0] if "." in value[-7:] else value
+    for fmt in _TIME_FORMATS:
+        try:
+            return calendar.timegm(time.strptime(value, fmt))
+        except ValueError:
+            continue
+    return None
+
+
+def normalize_mac(value: str) -> str:
+    """
+    Normalize a MAC address to lower case with colon separators.
+
+    Values that are not MAC addresses, i.e. DUIDs, are only lower cased.
+
+    Args:
+        value (str): The MAC address or DUID.
+
+    Returns:
+        str: The normalized value.
+    """
+    value = value.strip().lower()
+    plain = _MAC_SEPARATORS.sub("", value).replace(":", "")
+    if len(plain) == 12 and all(c in "0123456789abcdef" for c in plain):
+        return ":".join(plain[i: i + 2] for i in range(0, 12, 2))
+    return value
+
+
+def _column_map(header: list[str]) -> dict[str, int]:
+    columns = {}
+    names = [_NON_ALNUM.sub("", cell.lower()) for cell in header]
+    for field, aliases in LEASE_COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in names:
+                columns[field] = names.index(alias)
+                break
+    return columns
+
+
+def _parse_rows(rows: Iterable[list[str]]) -> Iterator[LeaseEvent]:
+    columns = None
+    for row in rows:
+        if not row or not any(cell.strip() for cell in row):
+            continue
+        if columns is None:
+            columns = _column_map(row)
+            if "ip" in columns:
+                continue
+            columns = {name: i for i, name in enumerate(DEFAULT_LEASE_COLUMNS)}
+        values = {
+            field: row[index].strip() if index < len(row) else ""
+            for field, index in columns.items()
+        }
+        yield LeaseEvent(
+            timestamp=parse_lease_time(values.get("timestamp", "")),
+            action=values.get("action", ""),
+            ip=values.get("ip", ""),
+            mac=normalize_mac(values.get("mac", "")),
+            hostname=values.get("hostname", ""),
+            start=parse_lease_time(values.get("start", "")),
+            end=parse_lease_time(values.get("end", "")),
+            member=values.get("member", ""),
+            protocol=values.get("protocol", "").upper(),
+            fingerprint=values.get("fingerprint", ""),
+        )
+
+
+def _parse_stream(stream: IO[bytes], name: str) -> Iterator[LeaseEvent]:
+    if name.endswith(".gz"):
+        stream = gzip.GzipFile(fileobj=stream)
+    text = io.TextIOWrapper(stream, encoding="utf8", errors="replace", newline="")
+    yield from _parse_rows(csv.reader(text))
+
+
+def iter_lease_history(filename: str) -> Iterator[LeaseEvent]:
+    """
+    Stream the events of a downloaded DHCP lease history file.
+
+    Tar archives (compressed or not), gzip files and plain CSV files are read as a stream,
+    without decompressing to disk. Every CSV file inside an archive is parsed in turn.
+    Columns are matched by name using `LEASE_COLUMN_ALIASES`; files without a header row
+    are read in the `DEFAULT_LEASE_COLUMNS` order.
+
+    Args:
+        filename (str): The lease history file, i.e. as returned by `get_lease_history`.
+
+    Yields:
+        LeaseEvent: One event per lease history row.
+
+    Example usage:
+
+    ```python
+    filename = wapi.get_lease_history(member="dhcp1.example.com")
+    for event in iter_lease_history(filename):
+        print(event.timestamp, event.action, event.ip, event.mac)
+    ```
+    """
+    logging.debug("parsing lease history %s", filename)
+    if tarfile.is_tarfile(filename):
+        with tarfile.open(filename, "r|*") as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                logging.debug("parsing lease history member %s", member.name)
+                handle = archive.extractfile(member)
+                yield from _parse_stream(handle, member.name)
+        return
+
+    with open(filename, "rb") as handle:
+        magic = handle.read(2)
+        handle.seek(0)
+        name = filename if magic != b"\x1f\x8b" else f"{filename}.gz"
+        yield from _parse_stream(handle, name)
+
+
+class LeaseIndex:
+    """
+    An on-disk SQLite index of DHCP lease history events.
+
+    Events are indexed by IP address, by MAC address and by time, so per-address and
+    time-range queries do not need to re-read the lease history files.
+
+    Args:
+        filename (str): The index database file, or ':memory:' for an in-memory index.
+
+    Example usage:
+
+    ```python
+    with LeaseIndex("leases.db") as index:
+        index.add(iter_lease_history("leasehistory.tar.gz"))
+        for event in index.query(ip="10.0.0.10", start=1700000000):
+            print(event)
+    ```
+    """
+
+    _COLUMNS = ", ".join(f'"{field}"' for field in LeaseEvent._fields)
+
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        self.conn = sqlite3.connect(filename)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS lease_events ('
+            '"timestamp" INTEGER, "action" TEXT, "ip" TEXT, "mac" TEXT, '
+            '"hostname" TEXT, "start" INTEGER, "end" INTEGER, "member" TEXT, '
+            '"protocol" TEXT, "fingerprint" TEXT)'
+        )
+
+    def __enter__(self) -> "LeaseIndex":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def add(self, events: Iterable[LeaseEvent], batch_size: int = 10000) -> int:
+        """
+        Add events to the index.
+
+        Secondary indexes are (re)built after loading, which keeps bulk loads fast.
+
+        Args:
+            events (Iterable[LeaseEvent]): The events to add.
+            batch_size (int): Number of events inserted per transaction. Default is 10000.
+
+        Returns:
+            int: The number of events added.
+        """
+        sql = (
+            f"INSERT INTO lease_events ({self._COLUMNS}) "
+            f"VALUES ({', '.join('?' * len(LeaseEvent._fields))})"
+        )
+        count = 0
+        batch = []
+        for event in events:
+            batch.append(event)
+            if len(batch) >= batch_size:
+                count += self._insert(sql, batch)
+                batch = []
+        if batch:
+            count += self._insert(sql, batch)
+        with self.conn:
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS lease_ip ON lease_events (ip, timestamp)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS lease_mac ON lease_events (mac, timestamp)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS lease_time ON lease_events (timestamp)"
+            )
+        logging.info("indexed %s lease events in %s", count, self.filename)
+        return count
+
+    def _insert(self, sql: str, batch: list) -> int:
+        with self.conn:
+            self.conn.executemany(sql, batch)
+        return len(batch)
+
+    def query(
+        self,
+        ip: Optional[str] = None,
+        mac: Optional[str] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[LeaseEvent]:
+        """
+        Query events by address and time range.
+
+        Args:
+            ip (str, optional): Only events of this IP address.
+            mac (str, optional): Only events of this MAC address or DUID.
+            start (int, optional): Only events at or after this epoch time.
+            end (int, optional): Only events before this epoch time.
+            limit (int, optional): Return at most this many events.
+
+        Yields:
+            LeaseEvent: The matching events, ordered by time.
+        """
+        clauses = []
+        params: list[Union[str, int]] = []
+        if ip is not None:
+            clauses.append("ip = ?")
+            params.append(ip)
+        if mac is not None:
+            clauses.append("mac = ?")
+            params.append(normalize_mac(mac))
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("timestamp < ?")
+            params.append(end)
+        sql = f"SELECT {self._COLUMNS} FROM lease_events"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        for row in self.conn.execute(sql, params):
+            yield LeaseEvent(*row)
+
+    def count(self) -> int:
+        """
+        Return the number of indexed events.
+
+        Returns:
+            int: The number of events.
+        """
+        return self.conn.execute("SELECT COUNT(*) FROM lease_events").fetchone()[0]
+
+    def close(self) -> None:
+        """
+        Close the index database.
+        """
+        self.conn.close()
+
+
+def build_lease_index(filename: str, index_file: str) -> LeaseIndex:
+    """
+    Stream a lease history file into an on-disk index.
+
+    Args:
+        filename (str): The lease history file.
+        index_file (str): The index database file.
+
+    Returns:
+        LeaseIndex: The open index.
+    """
+    index = LeaseIndex(index_file)
+    index.add(iter_lease_history(filename))
+    return index
@@ -0,0 +1,309 @@
+"""
+Copyright 2023 Infoblox
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import hashlib
+import logging
+import threading
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Optional, Union
+
+from pydantic import BaseModel, Field
+
+
+class PipelineStage:
+    """
+    Base class of a streaming pipeline stage.
+
+    A stage transforms a stream of byte chunks. `process` is called once per chunk and
+    returns the bytes to pass on to the next stage (possibly empty), `flush` is called once
+    at the end of the stream and returns any buffered bytes. Custom stages, i.e. encryption
+    with a key management system of choice, subclass this and override both methods.
+
+    Attributes:
+        name (str): The name of the stage, used in the pipeline result.
+    """
+
+    name = "stage"
+
+    def process(self, data: bytes) -> bytes:
+        """
+        Transform a chunk of the stream.
+
+        Args:
+            data (bytes): The input chunk.
+
+        Returns:
+            bytes: The output chunk.
+        """
+        return data
+
+    def flush(self) -> bytes:
+        """
+        Finish the stream.
+
+        Returns:
+            bytes: Any remaining output.
+        """
+        return b""
+
+    def result(self) -> Optional[str]:
+        """
+        Return a value to report in the pipeline result, i.e. a digest.
+
+        Returns:
+            str | None: The value, or None if the stage has nothing to report.
+        """
+        return None
+
+
+class GzipStage(PipelineStage):
+    """
+    Compress the stream in gzip format.
+
+    Args:
+        level (int): The compression level, 1 (fastest) to 9 (smallest). Default is 6.
+    """
+
+    name = "gzip"
+
+    def __init__(self, level: int = 6) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def process(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+class ZstdStage(PipelineStage):
+    """
+    Compress the stream in zstd format.
+
+    Requires the optional `zstandard` package.
+
+    Args:
+        level (int): The compression level. Default is 3.
+        threads (int): Number of compression threads used by zstd, 0 to compress in the
+            pipeline worker only. Default is 0.
+
+    Raises:
+        ImportError: If the `zstandard` package is not installed.
+    """
+
+    name = "zstd"
+
+    def __init__(self, level: int = 3, threads: int = 0) -> None:
+        try:
+            import zstandard
+        except ImportError as exc:
+            raise ImportError(
+                "ZstdStage requires the zstandard package, "
+                "install it with 'pip install zstandard'"
+            ) from exc
+        self._compressor = zstandard.ZstdCompressor(
+            level=level, threads=threads
+        ).compressobj()
+
+    def process(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+class HashStage(PipelineStage):
+    """
+    Hash the stream as it passes through, without changing it.
+
+    The digest covers the bytes at the position of the stage in the pipeline, so a hash
+    stage placed after a compression stage hashes the compressed output.
+
+    Args:
+        algorithm (str): A `hashlib` algorithm name. Default is sha256.
+        name (str, optional): The name of the digest in the pipeline result. Default is the
+            algorithm name.
+    """
+
+    def __init__(self, algorithm: str = "sha256", name: Optional[str] = None) -> None:
+        self._hash = hashlib.new(algorithm)
+        self.name = name or algorithm
+
+    def process(self, data: bytes) -> bytes:
+        self._hash.update(data)
+        return data
+
+    def result(self) -> Optional[str]:
+        return self._hash.hexdigest()
+
+
+class PipelineResult(BaseModel):
+    """
+    The result of a streaming pipeline run.
+
+    Attributes:
+        filename (str | None): The file written, if the sink was a file name.
+        bytes_in (int): Number of bytes fed into the pipeline.
+        bytes_out (int): Number of bytes written to the sink.
+        results (dict[str, str]): Values reported by the stages, i.e. digests, by stage name.
+    """
+
+    filename: Optional[str] = None
+    bytes_in: int = 0
+    bytes_out: int = 0
+    results: dict[str, str] = Field(default_factory=dict)
+
+
+class StreamPipeline:
+    """
+    Run byte chunks through a chain of stages and into a sink on a worker thread.
+
+    The caller feeds chunks as they are read, i.e. from the network, while a single worker
+    thread runs the stages and writes to the sink, so compression and hashing overlap with
+    the read. At most `max_pending` chunks are queued; `feed` blocks when the worker falls
+    behind, which keeps the memory use bounded.
+
+    Args:
+        stages (list[PipelineStage]): The stages, applied in order.
+        sink (str | BinaryIO): A file name to write to, or a writable binary file object.
+            File objects passed in are flushed but not closed.
+        max_pending (int): Maximum number of chunks queued for the worker. Default is 8.
+
+    Example usage:
+
+    ```python
+    with StreamPipeline([GzipStage(), HashStage()], "data.gz") as pipeline:
+        for chunk in chunks:
+            pipeline.feed(chunk)
+    print(pipeline.result.results["sha256"])
+    ```
+    """
+
+    def __init__(
+        self,
+        stages: list[PipelineStage],
+        sink: Union[str, BinaryIO],
+        max_pending: int = 8,
+    ) -> None:
+        self.stages = list(stages)
+        if isinstance(sink, str):
+            self._sink = open(sink, "wb")
+            self._owns_sink = True
+            self.result = PipelineResult(filename=sink)
+        else:
+            self._sink = sink
+            self._owns_sink = False
+            self.result = PipelineResult()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="ibx-pipeline"
+        )
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._error: Optional[BaseException] = None
+        self._closed = False
+
+    def __enter__(self) -> "StreamPipeline":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def feed(self, data: bytes) -> None:
+        """
+        Queue a chunk for processing.
+
+        Args:
+            data (bytes): The chunk.
+
+        Raises:
+            Exception: Any error raised by a stage or the sink on an earlier chunk.
+        """
+        if self._error:
+            raise self._error
+        self.result.bytes_in += len(data)
+        self._slots.acquire()
+        future = self._executor.submit(self._run, data, final=False)
+        future.add_done_callback(self._done)
+
+    def close(self) -> PipelineResult:
+        """
+        Flush all stages, close the sink and return the result.
+
+        Returns:
+            PipelineResult: The result of the run.
+
+        Raises:
+            Exception: Any error raised by a stage or the sink.
+        """
+        if self._closed:
+            return self.result
+        self._closed = True
+        try:
+            if self._error is None:
+                self._executor.submit(self._run, b"", final=True).result()
+        finally:
+            self._executor.shutdown(wait=True)
+            self._close_sink()
+        if self._error:
+            raise self._error
+        for stage in self.stages:
+            value = stage.result()
+            if value is not None:
+                self.result.results[stage.name] = value
+        logging.debug(
+            "pipeline wrote %s bytes from %s bytes input",
+            self.result.bytes_out,
+            self.result.bytes_in,
+        )
+        return self.result
+
+    def abort(self) -> None:
+        """
+        Stop the pipeline without flushing the stages.
+        """
+        self._closed = True
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._close_sink()
+
+    def _close_sink(self) -> None:
+        if self._owns_sink:
+            self._sink.close()
+        else:
+            self._sink.flush()
+
+    def _done(self, future: Future) -> None:
+        self._slots.release()
+        if future.cancelled():
+            return
+        if future.exception() is not None and self._error is None:
+            self._error = future.exception()
+
+    def _run(self, data: bytes, final: bool) -> None:
+        if self._error:
+            return
+        for stage in self.stages:
+            if final:
+                data = stage.process(data) + stage.flush() if data else stage.flush()
+            else:
+                data = stage.process(data)
+                if not data:
+                    return
+        if data:
+            self._sink.write(data)
+            self.result.bytes_out += len(data)
@@ -19,7 +19,12 @@ import io
 import logging
 import os
 import pprint
+import shutil
 import subprocess
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Iterable, NamedTuple
 from urllib.parse import urlparse
 
 
@@ -143,15 +148,19 @@ rewrite_zone_file = named_compilezone
 
 
 def remove_lines_from_file(
-    file_path: str, lines_to_remove: list, output_path: str = None
+    file_path: str, lines_to_remove: Iterable[int], output_path: str = None
 ) -> None:
     """
     The function remove_lines_from_file removes specific lines from a file.
 
+    The file is streamed line by line and the output is written to a temporary file that
+    replaces the output file when done, so the output is never left half written and
+    the memory use does not depend on the size of the file.
+
     Args:
         file_path (str): The fully qualified path to the file from which lines are to be removed.
-        lines_to_remove (list): A list of integers, with each integer being a line
-                                number (1-indexed) of the line to be removed from the file.
+        lines_to_remove (Iterable[int]): The line numbers (1-indexed) of the lines to
+                                be removed from the file.
         output_path (str, optional): Path to the output file. If provided, the function will
                                      write result to this file.
                                      If not provided, the function will overwrite the original
@@ -177,13 +186,20 @@ def remove_lines_from_file(
 
     if not output_path:
         output_path = file_path
-    logging.warning("file: %s lines to remove: %s", file_path, lines_to_remove)
-    with open(file_path, "r", encoding="utf8") as fin:
-        lines = fin.readlines()
-        ptr = 1
-        with open(output_path, "w", encoding="utf8") as fout:
-            for line in lines:
-                if ptr not in lines_to_remove:
+    remove = set(lines_to_remove)
+    logging.warning("file: %s lines to remove: %s", file_path, sorted(remove))
+    # write to a temporary file next to the output, so the output is replaced
+    # atomically and never left half written
+    directory = os.path.dirname(os.path.abspath(output_path))
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(output_path)}."
+    )
+    try:
+        with open(file_path, "r", encoding="utf8", newline="") as fin, open(
+            fd, "w", encoding="utf8", newline=""
+        ) as fout:
+            for ptr, line in enumerate(fin, start=1):
+                if ptr not in remove:
                     fout.write(line)
                 else:
                     logging.warning(
@@ -191,8 +207,189 @@ def remove_lines_from_file(
                         output_path,
                         line.strip(),
                     )
-                ptr += 1
-            logging.info("file %s rewritten", output_path)
+        shutil.copymode(
+            output_path if os.path.exists(output_path) else file_path, temp_path
+        )
+        os.replace(temp_path, output_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    logging.info("file %s rewritten", output_path)
+
+
+def remove_lines_from_files(
+    removals: dict, max_workers: int = None, executor: Executor = None
+) -> None:
+    """
+    The function remove_lines_from_files applies remove_lines_from_file to many files
+    concurrently, i.e. after named_compilezone_batch reported the offending lines of
+    many zones.
+
+    Args:
+        removals (dict): The line numbers (1-indexed) to remove per file path. Files are
+            rewritten in place.
+        max_workers (int, optional): The maximum number of files rewritten at the same
+            time. Defaults to the number of CPUs.
+        executor (Executor, optional): An executor to use instead of a thread pool.
+
+    Usage:
+        >>> remove_lines_from_files({'/path/to/db.a': [3], '/path/to/db.b': [7, 9]})
+    """
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=max_workers or os.cpu_count())
+    try:
+        futures = [
+            executor.submit(remove_lines_from_file, file_path, lines)
+            for file_path, lines in removals.items()
+            if lines
+        ]
+        for future in futures:
+            future.result()
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+
+class CompileZoneResult(NamedTuple):
+    """
+    The result of compiling one zone with `named_compilezone_batch`.
+
+    Attributes:
+        zone_name (str): The name of the zone.
+        zone_file (str): The zone file that was compiled.
+        output_file (str): The canonicalized zone file.
+        errors (list): The offending line numbers of the last attempt, empty on success.
+        removed (list): The line numbers removed per retry, numbered as in the file
+            that was compiled by that attempt.
+        attempts (int): The number of named-compilezone runs.
+    """
+
+    zone_name: str
+    zone_file: str
+    output_file: str
+    errors: list
+    removed: list
+    attempts: int
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def _compile_zone(
+    zone_name: str,
+    zone_file: str,
+    output_file: str,
+    input_format: str,
+    fix: bool,
+    max_retries: int,
+) -> CompileZoneResult:
+    source = zone_file
+    removed = []
+    attempts = 1
+    errors = named_compilezone(zone_name, source, output_file, input_format)
+    while errors and fix and attempts <= max_retries:
+        # never modify the original zone file, fix a copy next to the output instead
+        fixed_file = f"{output_file}.fixed"
+        if source == zone_file:
+            shutil.copyfile(zone_file, fixed_file)
+            source = fixed_file
+        remove_lines_from_file(source, errors)
+        removed.append(sorted(set(errors)))
+        attempts += 1
+        errors = named_compilezone(zone_name, source, output_file, input_format)
+    return CompileZoneResult(
+        zone_name, zone_file, output_file, errors, removed, attempts
+    )
+
+
+def named_compilezone_batch(
+    zones: Iterable[tuple],
+    output_dir: str = ".",
+    input_format: str = "text",
+    max_workers: int = None,
+    fix: bool = False,
+    max_retries: int = 3,
+    executor: Executor = None,
+) -> list:
+    """
+    The function named_compilezone_batch runs named_compilezone over many zones
+    concurrently, optionally removing the offending lines and retrying.
+
+    Each zone runs in its own named-compilezone process; at most `max_workers` of them
+    run at the same time. With `fix` enabled, the lines reported by named-compilezone
+    are removed from a copy of the zone file (`<output_file>.fixed`) with
+    remove_lines_from_file and the zone is compiled again, up to `max_retries` times.
+    The original zone files are never modified.
+
+    Args:
+        zones (Iterable[tuple]): (zone_name, zone_file) pairs, or (zone_name, zone_file,
+            output_file) triples to choose the output file.
+        output_dir (str, optional): The directory for the canonicalized zone files,
+            named `db.<zone_name>`. Defaults to the current directory.
+        input_format (str, optional): 'text' or 'raw'. Defaults to 'text'.
+        max_workers (int, optional): The maximum number of concurrent named-compilezone
+            processes. Defaults to the number of CPUs.
+        fix (bool, optional): Remove offending lines and retry. Defaults to False.
+        max_retries (int, optional): The maximum number of retries per zone when fixing.
+            Defaults to 3.
+        executor (Executor, optional): An executor to use instead of a thread pool.
+
+    Returns:
+        list: A CompileZoneResult per zone, in the order of `zones`.
+
+    Raises:
+        ValueError: If `input_format` is neither 'text' or 'raw', or if two zones have
+            the same output file, i.e. a zone name given twice without output files
+
+    Usage:
+        >>> results = named_compilezone_batch(
+        ...     [('example.com', 'db.example.com'), ('10.in-addr.arpa', 'db.10')],
+        ...     output_dir='/tmp/zones', fix=True)
+        >>> failed = [result.zone_name for result in results if not result.ok]
+    """
+
+    if input_format not in ["raw", "text"]:
+        raise ValueError('specify one of "text" or "raw" value')
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = []
+    outputs = set()
+    for zone in zones:
+        zone_name, zone_file = zone[0], zone[1]
+        if len(zone) > 2:
+            output_file = zone[2]
+        else:
+            output_file = os.path.join(output_dir, f"db.{zone_name.rstrip('.')}")
+        # zones sharing an output file would write it (and its .fixed copy) at once
+        output_path = os.path.abspath(output_file)
+        if output_path in outputs:
+            raise ValueError(
+                f"{zone_name}: output file {output_file} is used by another zone, "
+                "give zones of the same name in several views their own output file"
+            )
+        outputs.add(output_path)
+        jobs.append((zone_name, zone_file, output_file))
+
+    # the work happens in the named-compilezone child processes, the threads only wait
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=max_workers or os.cpu_count())
+    try:
+        futures = [
+            executor.submit(_compile_zone, *job, input_format, fix, max_retries)
+            for job in jobs
+        ]
+        results = [future.result() for future in futures]
+    finally:
+        if own_executor:
+            executor.shutdown()
+    failed = sum(1 for result in results if not result.ok)
+    logging.info(
+        "compiled %s zones, %s with errors", len(results) - failed, failed
+    )
+    return results
 
 
 def _parse_named_checkzone_log(error_output: str) -> list:
@@ -307,18 +504,55 @@ def extract_filename_from_url(url) -> str:
     return filename
 
 
-def ibx_csv_file_split(filename: str, output_path: str = "."):
+class _SplitOutput:
+    """The output file state of one object type in ibx_csv_file_split."""
+
+    def __init__(self, obj_type: str, header: list):
+        self.obj_type = obj_type
+        self.header = header
+        self.written_header = None
+        self.filepath = None
+        self.chunk = 0
+        self.rows = 0
+        self.total = 0
+        self.handle = None
+        self.writer = None
+
+
+def ibx_csv_file_split(
+    filename: str,
+    output_path: str = ".",
+    max_rows: int = None,
+    max_open_files: int = 64,
+) -> list:
     """
     The function ibx_csv_file_split splits a globally exported CSV file into separate CSV files
     based on the CSV object type(s).
 
+    The source file is streamed in a single pass, so memory use does not depend on its
+    size. Rows are written as they are read to one output file per object type, of
+    which at most `max_open_files` are kept open; the least recently used one is closed
+    and reopened for appending when needed. Output files are only created for object
+    types with objects.
+
     Args:
         filename (str): The name of the source CSV file to be split.
         output_path (str, optional): The directory where the output CSV files will be written.
             If the directory does not exist, it will be created. Defaults to the current directory.
+        max_rows (int, optional): Split every object type further into files of at
+            most `max_rows` objects named `<type>_0001.csv`, `<type>_0002.csv`, ...,
+            each with the header row, ready for parallel import. Defaults to one
+            `<type>.csv` per type.
+        max_open_files (int, optional): The maximum number of output files kept open.
+            Defaults to 64.
+
+    Returns:
+        list: The paths of the output files, in the order they were created.
 
     Raises:
         Exception: An exception is raised if the output directory cannot be created.
+        ValueError: If `max_rows` or `max_open_files` is not positive or an object has
+            no header row.
 
     Logging:
         This function logs warning messages when a CSV object type has no associated objects in
@@ -331,6 +565,10 @@ def ibx_csv_file_split(filename: str, output_path: str = "."):
         >>> ibx_csv_file_split('/path/to/my_exported_csv_file', '/path/to/output_directory')
     """
 
+    if max_rows is not None and max_rows < 1:
+        raise ValueError("max_rows must be a positive integer")
+    if max_open_files < 1:
+        raise ValueError("max_open_files must be a positive integer")
     if not os.path.exists(output_path):
         logging.warning(
             "output path %s does not exist, creating...", output_path
@@ -341,65 +579,222 @@ def ibx_csv_file_split(filename: str, output_path: str = "."):
             logging.error(err)
             raise
 
-    # build the struct using the csv object type as the key
-    csv_objects = {}
-    with open(filename, "r", encoding="utf8") as handle:
-        myreader = csv.reader(handle)
-        for row in myreader:
-            if row[0].lower().startswith("header-"):
-                obj_type = row[0].lower().replace("header-", "")
-                csv_output_file = f"{obj_type}.csv"
-                csv_output_file_path = os.path.join(
-                    output_path, csv_output_file
-                )
-                csv_objects[obj_type] = {}
-                csv_objects[obj_type]["filename"] = csv_output_file
-                csv_objects[obj_type]["filepath"] = csv_output_file_path
-                csv_objects[obj_type]["data"] = [row]
-            else:
-                obj_type = row[0].lower()
-                csv_objects[obj_type]["data"].append(row)
+    outputs = {}
+    # object types with an open output file, least recently used first
+    open_outputs = OrderedDict()
+    files = []
+
+    def close(output: _SplitOutput) -> None:
+        output.handle.close()
+        output.handle = None
+        output.writer = None
+        open_outputs.pop(output.obj_type, None)
+
+    def write(output: _SplitOutput, row: list) -> None:
+        if output.filepath is None or (max_rows and output.rows >= max_rows):
+            if output.handle:
+                close(output)
+            output.chunk += 1
+            name = output.obj_type
+            if max_rows:
+                name = f"{name}_{output.chunk:04d}"
+            output.filepath = os.path.join(output_path, f"{name}.csv")
+            output.rows = 0
+            output.written_header = None
+            files.append(output.filepath)
+            logging.info("creating output file %s", output.filepath)
+            mode = "w"
+        else:
+            mode = "a"
+        if output.handle is None:
+            if len(open_outputs) >= max_open_files:
+                _, oldest = open_outputs.popitem(last=False)
+                close(oldest)
+            output.handle = open(output.filepath, mode, encoding="utf8", newline="")
+            output.writer = csv.writer(output.handle)
+        open_outputs[output.obj_type] = output
+        open_outputs.move_to_end(output.obj_type)
+        if output.written_header != output.header:
+            output.writer.writerow(output.header)
+            output.written_header = output.header
+        output.writer.writerow(row)
+        output.rows += 1
+        output.total += 1
 
-    # output the struct
-    for obj_type, obj_data in csv_objects.items():
-        num_of_objects = len(obj_data["data"])
-        if num_of_objects == 1:
-            logging.warning(
-                "skipping creating output file %s, no %s objects",
-                obj_data["filename"],
+    try:
+        with open(filename, "r", encoding="utf8", newline="") as handle:
+            for lineno, row in enumerate(csv.reader(handle), start=1):
+                if not row or not any(cell.strip() for cell in row):
+                    continue
+                first = row[0].strip().lower()
+                if first.startswith("header-"):
+                    obj_type = first[len("header-"):]
+                    output = outputs.get(obj_type)
+                    if output is None:
+                        outputs[obj_type] = _SplitOutput(obj_type, row)
+                    else:
+                        output.header = row
+                    continue
+                output = outputs.get(first)
+                if output is None:
+                    raise ValueError(
+                        f"{filename}:{lineno}: {row[0]} object found before its "
+                        "header row"
+                    )
+                write(output, row)
+    finally:
+        for output in list(open_outputs.values()):
+            close(output)
+
+    for obj_type, output in outputs.items():
+        if output.total:
+            logging.info(
+                "wrote %s %s objects to %s file(s)",
+                output.total,
                 obj_type,
+                output.chunk,
             )
         else:
-            logging.info(
-                "creating output file %s with %s %s objects",
-                obj_data["filename"],
-                num_of_objects,
+            logging.warning(
+                "skipping creating output file %s, no %s objects",
+                f"{obj_type}.csv",
                 obj_type,
             )
-            with open(obj_data["filepath"], "w", encoding="utf8") as fh_out:
-                mywriter = csv.writer(fh_out)
-                for row in obj_data["data"]:
-                    mywriter.writerow(row)
-                fh_out.close()
+    return files
 
 
-def _get_include_data(chroot: str, include_file: str):
-    data = ""
-    full_path = f"{chroot}{include_file}"
-    if not os.path.exists(full_path):
-        logging.error("%s include file does not exist!", full_path)
-        return data
+class IncludeStats:
+    """
+    Statistics of an include expansion by write_from_includes.
+
+    Attributes:
+        files (int): The number of distinct files read.
+        includes (int): The number of include directives expanded.
+        cache_hits (int): The number of includes served from the cache.
+        max_depth (int): The deepest include nesting, 0 without includes.
+        lines (int): The number of lines written.
+        size (int): The number of characters written.
+    """
+
+    def __init__(self):
+        self.files = 0
+        self.includes = 0
+        self.cache_hits = 0
+        self.max_depth = 0
+        self.lines = 0
+        self.size = 0
+
+    def __repr__(self):
+        return (
+            f"IncludeStats(files={self.files}, includes={self.includes}, "
+            f"cache_hits={self.cache_hits}, max_depth={self.max_depth}, "
+            f"lines={self.lines}, size={self.size})"
+        )
+
+
+def _include_file_name(line: str) -> str:
+    _, include_file, _ = line.split('"', 2)
+    return include_file
+
+
+def _iter_include_data(
+    chroot: str,
+    full_path: str,
+    nested: bool,
+    cache: dict,
+    stats: IncludeStats,
+    stack: tuple,
+):
+    """yield the lines of a file with its include directives expanded"""
+    stats.files += 1
     with open(full_path, "r", encoding="utf8") as file:
         for line in file:
-            if "include " in line:
-                logging.warning("nested include file found in %s", include_file)
-                _, _inc_file, _ = line.split('"', 2)
-                content = _get_include_data(chroot, _inc_file)
-                if content:
-                    data += content
+            if ("include " in line) if nested else line.startswith("include "):
+                include_file = _include_file_name(line)
+                if nested:
+                    logging.warning("nested include file found in %s", full_path)
+                else:
+                    logging.debug(line.strip())
+                    logging.info("processing include file %s", include_file)
+                yield from _iter_include(chroot, include_file, cache, stats, stack)
             else:
-                data += line
-        return data
+                yield line
+
+
+def _iter_include(
+    chroot: str, include_file: str, cache: dict, stats: IncludeStats, stack: tuple
+):
+    """yield the expanded lines of an include file, caching them by path"""
+    full_path = f"{chroot}{include_file}"
+    key = os.path.normpath(full_path)
+    stats.includes += 1
+    if key in stack:
+        raise ValueError(f"include loop: {' -> '.join((*stack, key))}")
+    entry = cache.get(key)
+    if entry is not None:
+        lines, below = entry
+        stats.cache_hits += 1
+        stats.max_depth = max(stats.max_depth, len(stack) + below)
+        yield from lines
+        return
+    if not os.path.exists(full_path):
+        logging.error("%s include file does not exist!", full_path)
+        return
+    outer_depth = stats.max_depth
+    stats.max_depth = len(stack)
+    lines = []
+    stack = (*stack, key)
+    for line in _iter_include_data(chroot, full_path, True, cache, stats, stack):
+        lines.append(line)
+        yield line
+    # keep the nesting depth below this file, for the depth of later cache hits
+    cache[key] = (lines, stats.max_depth - len(stack) + 1)
+    stats.max_depth = max(outer_depth, stats.max_depth)
+
+
+def write_from_includes(
+    chroot: str, filepath: str, stream: io.TextIOBase
+) -> IncludeStats:
+    """
+    The function write_from_includes writes a configuration file with its include
+    directives expanded to a stream.
+
+    Lines are streamed from the files to the output without building strings in memory.
+    Each include file is read once: its expanded lines are cached and written again for
+    every later include of the same file. Include loops are detected.
+
+    Args:
+        chroot (str): The path to the chroot environment of the config file.
+        filepath (str): Path to the initial config file to process, relative to chroot.
+        stream (io.TextIOBase): The stream the expanded configuration is written to.
+
+    Returns:
+        IncludeStats: The number of files read, includes expanded and cache hits, the
+            deepest include nesting and the size of the output.
+
+    Raises:
+        ValueError: If a file includes itself, directly or through other files.
+
+    Usage:
+        >>> with open('named.conf.full', 'w') as out:
+        ...     stats = write_from_includes('/path/to/chroot', '/etc/named.conf', out)
+    """
+
+    stats = IncludeStats()
+    if filepath.startswith("/"):
+        filepath = filepath.lstrip("/")
+    full_path = os.path.join(chroot, filepath)
+    logging.info("processing file %s", f"{chroot}{filepath}")
+    if not os.path.exists(full_path):
+        logging.error("file %s does not exist!", full_path)
+        return stats
+    stack = (os.path.normpath(full_path),)
+    for line in _iter_include_data(chroot, full_path, False, {}, stats, stack):
+        stream.write(line)
+        stats.lines += 1
+        stats.size += len(line)
+    logging.info("expanded %s: %s", full_path, stats)
+    return stats
 
 
 def generate_from_includes(chroot: str, filepath: str) -> str:
@@ -432,22 +827,6 @@ def generate_from_includes(chroot: str, filepath: str) -> str:
         >>> full_config = generate_from_includes('/path/to/chroot', '/path/to/my_config')
     """
 
-    if filepath.startswith("/"):
-        filepath = filepath.lstrip("/")
-    logging.info("processing file %s", f"{chroot}{filepath}")
-    data = ""
-    if os.path.exists(os.path.join(chroot, filepath)):
-        with open(os.path.join(chroot, filepath), "r", encoding="utf8") as file:
-            for line in file:
-                if line.startswith("include "):
-                    logging.debug(line.strip())
-                    _, include_file, _ = line.split('"', 2)
-                    logging.info("processing include file %s", include_file)
-                    contents = _get_include_data(chroot, include_file)
-                    if contents:
-                        data += contents
-                else:
-                    data += line
-    else:
-        logging.error("file %s does not exist!", os.path.join(chroot, filepath))
-    return data
+    output = io.StringIO()
+    write_from_includes(chroot, filepath, output)
+    return output.getvalue()
@@ -0,0 +1,58 @@
+import pkgutil
+import subprocess
+import sys
+
+import ibx_sdk.bin
+
+SCRIPTS = sorted(
+    module.name
+    for module in pkgutil.iter_modules(ibx_sdk.bin.__path__)
+    if "nios_" in module.name
+)
+
+CHECK = """
+import sys
+from importlib import import_module
+
+for name in {scripts!r}:
+    module = import_module("ibx_sdk.bin." + name)
+    command = getattr(module, "main", None) or module.cli
+    try:
+        command(["--help"])
+    except SystemExit as exc:
+        assert exc.code == 0, (name, exc.code)
+heavy = [m for m in ("httpx", "ibx_sdk.nios.gift", "coloredlogs") if m in sys.modules]
+assert not heavy, heavy
+"""
+
+
+def test_help_does_not_load_sdk(tmp_path):
+    assert len(SCRIPTS) == 20
+    result = subprocess.run(
+        [sys.executable, "-c", CHECK.format(scripts=SCRIPTS)],
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert "Usage:" in result.stdout
+    # logging is only set up once a command runs
+    assert not (tmp_path / "wapi.log").exists()
+
+
+def test_argument_errors_do_not_log(tmp_path):
+    for script, args in (
+        ("nios_get_log", ["-g", "gm", "-m", "m1", "-t", "AUDITLOG", "-r"]),
+        ("nios_get_log", ["-g", "gm", "-m", "m1", "-t", "BOGUS"]),
+        ("nios_certificate", ["upload", "-g", "gm", "-m", "m1"]),
+    ):
+        result = subprocess.run(
+            [sys.executable, "-m", f"ibx_sdk.bin.{script}", *args],
+            cwd=tmp_path,
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 2, result.stderr
+        assert "Error:" in result.stderr
+        assert "INFO" not in result.stderr + result.stdout
+    assert not (tmp_path / "wapi.log").exists()
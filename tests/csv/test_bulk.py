@@ -0,0 +1,107 @@
+from ipaddress import IPv4Address
+
+import pytest
+
+from ibx_sdk.nios.csv.bulk import construct, construct_many, validate_many
+from ibx_sdk.nios.csv.dhcp import IPv4DhcpRange
+from ibx_sdk.nios.csv.dns_records import ARecord, HostRecord
+from ibx_sdk.nios.csv.util import output_to_file
+
+
+def a_records(count):
+    for i in range(count):
+        yield {
+            "fqdn": f"a{i}.example.com",
+            "view": "default",
+            "address": IPv4Address(f"10.0.{i // 250}.{i % 250 + 1}"),
+            "ttl": 3600,
+            "EA-Site": "HQ",
+        }
+
+
+def test_construct_maps_aliases_and_extras():
+    record = construct(
+        ARecord,
+        {"fqdn": "a.example.com", "address": "10.0.0.1", "_new_fqdn": "b.example.com"},
+    )
+    assert record.new_fqdn == "b.example.com"
+    assert record.arecord == "arecord"
+    host = construct(
+        HostRecord, {"header-hostrecord": "hostrecord", "fqdn": "h.example.com"}
+    )
+    assert host.fqdn == "h.example.com"
+
+
+def test_construct_many_output_identical(tmp_path):
+    rows = list(a_records(20))
+    validated = []
+    for row in rows:
+        record = ARecord(**{k: v for k, v in row.items() if k != "EA-Site"})
+        record.add_property("EA-Site", row["EA-Site"])
+        validated.append(record)
+    constructed = list(construct_many(ARecord, rows, validate_every=5))
+    output_to_file(filename="validated", data=validated, output_dir=str(tmp_path))
+    output_to_file(filename="constructed", data=constructed, output_dir=str(tmp_path))
+    assert (tmp_path / "validated.csv").read_text() == (
+        tmp_path / "constructed.csv"
+    ).read_text()
+
+
+def test_construct_many_list_fields():
+    ranges = list(
+        construct_many(
+            IPv4DhcpRange,
+            [
+                {
+                    "start_address": "10.0.0.10",
+                    "end_address": "10.0.0.20",
+                    "exclusion_ranges": ["10.0.0.11-10.0.0.12"],
+                }
+            ],
+            validate_every=1,
+        )
+    )
+    dump = ranges[0].model_dump(by_alias=True, exclude_none=True)
+    assert dump["exclusion_ranges"] == "10.0.0.11-10.0.0.12"
+
+
+def test_construct_many_sampled_validation_failure():
+    rows = list(a_records(4))
+    rows[2]["address"] = "not-an-ip"
+    # row 2 is not sampled
+    assert len(list(construct_many(ARecord, rows, validate_every=3))) == 4
+    with pytest.raises(ValueError, match="row 2"):
+        list(construct_many(ARecord, rows, validate_every=2))
+
+
+def test_construct_many_sampled_mismatch():
+    rows = [{"fqdn": "a.example.com", "address": "10.0.0.1", "ttl": "3600"}]
+    with pytest.raises(ValueError, match="differs"):
+        list(construct_many(ARecord, rows, validate_every=1))
+
+
+def test_validate_many():
+    rows = [
+        {"fqdn": "a1.example.com", "address": "10.0.0.1", "_new_fqdn": "b.example.com"},
+        {"fqdn": "a2.example.com", "address": "bad"},
+        {"fqdn": "a3.example.com", "address": "10.0.0.3", "EA-Site": "HQ"},
+        {"address": "10.0.0.4"},
+    ]
+    result = validate_many(ARecord, rows, batch_size=3)
+    assert [m is None for m in result.models] == [False, True, False, True]
+    assert sorted(result.errors) == [1, 3]
+    assert result.errors[1][0]["loc"] == ("address",)
+    assert result.errors[3][0]["loc"] == ("fqdn",)
+    assert result.models[0].new_fqdn == "b.example.com"
+    assert getattr(result.models[2], "EA-Site") == "HQ"
+    assert [str(m.address) for m in result.valid] == ["10.0.0.1", "10.0.0.3"]
+
+
+def test_validate_many_matches_per_row():
+    rows = [
+        {"start_address": f"10.0.{i}.10", "end_address": f"10.0.{i}.20"}
+        for i in range(5)
+    ]
+    result = validate_many(IPv4DhcpRange, rows)
+    assert not result.errors
+    assert result.models == [IPv4DhcpRange(**row) for row in rows]
@@ -0,0 +1,60 @@
+import os
+
+from ibx_sdk.nios.csv.bundle import CsvBundle, bundle_csv_models
+from ibx_sdk.nios.csv.dhcp import (
+    IPv4DhcpRange,
+    IPv4Network,
+    IPv4NetworkContainer,
+    NetworkView,
+)
+from ibx_sdk.nios.csv.dns import AuthZone, DnsView
+from ibx_sdk.nios.csv.dns_records import ARecord
+
+
+def _models():
+    return [
+        ARecord(fqdn="www.example.com", address="10.1.0.5", view="internal"),
+        IPv4DhcpRange(start_address="10.1.0.10", end_address="10.1.0.20"),
+        IPv4Network(address="10.1.0.0", netmask="255.255.255.0"),
+        IPv4NetworkContainer(address="10.1.0.0", netmask="255.255.0.0"),
+        IPv4NetworkContainer(address="10.0.0.0", netmask="255.0.0.0"),
+        AuthZone(fqdn="example.com", zone_format="FORWARD", view="internal"),
+        DnsView(name="internal"),
+        NetworkView(name="lab"),
+    ]
+
+
+def test_layers():
+    bundle = CsvBundle(_models())
+    assert len(bundle) == 8
+    layers = [
+        [(model.__name__, len(items)) for model, items in layer]
+        for layer in bundle.layers()
+    ]
+    assert layers == [
+        [("NetworkView", 1)],
+        [("DnsView", 1), ("IPv4NetworkContainer", 2)],
+        [("IPv4Network", 1), ("AuthZone", 1)],
+        [("IPv4DhcpRange", 1)],
+        [("ARecord", 1)],
+    ]
+    containers = bundle.layers()[1][1][1]
+    assert [str(c.address) for c in containers] == ["10.0.0.0", "10.1.0.0"]
+
+
+def test_write(tmp_path):
+    files = bundle_csv_models(
+        _models(), output_dir=str(tmp_path), file_prefix="site", import_action="I"
+    )
+    assert [os.path.basename(f) for f in files] == [
+        f"site-layer_0{n}.csv" for n in range(1, 6)
+    ]
+    with open(files[1]) as f:
+        lines = f.read().splitlines()
+    headers = [line.split(",")[:2] for line in lines if line.startswith("header-")]
+    assert headers == [
+        ["header-view", "import-action"],
+        ["header-networkcontainer", "import-action"],
+    ]
+    assert len(lines) == 5
+    assert lines[3].startswith("networkcontainer,I,10.0.0.0")
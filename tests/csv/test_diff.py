@@ -0,0 +1,128 @@
+import csv
+
+from ibx_sdk.nios.csv.dhcp import IPv4Network, NetworkView
+from ibx_sdk.nios.csv.diff import (
+    diff_csv_files,
+    diff_models,
+    natural_key,
+    natural_key_fields,
+    row_digest,
+)
+from ibx_sdk.nios.csv.dns import AuthZone
+from ibx_sdk.nios.csv.dns_records import ARecord, HostRecord
+from ibx_sdk.nios.csv.serializer import to_dict
+from ibx_sdk.nios.csv.util import output_to_file
+
+
+def test_natural_keys():
+    assert natural_key_fields(HostRecord) == ("fqdn", "view")
+    assert natural_key_fields(ARecord) == ("fqdn", "address", "view")
+    assert natural_key_fields(AuthZone) == ("fqdn", "view")
+    assert natural_key_fields(IPv4Network) == ("address", "netmask", "network_view")
+    host = HostRecord(fqdn="A.Example.com", addresses="10.0.0.1")
+    assert natural_key(host) == ("hostrecord", "a.example.com", "default")
+
+
+def test_row_digest_ignores_import_action_and_default_view():
+    first = ARecord(
+        fqdn="a.example.com", address="10.0.0.1", **{"import-action": "I"}
+    )
+    second = ARecord(fqdn="a.example.com", address="10.0.0.1", view="default")
+    assert row_digest(first) == row_digest(second)
+    third = ARecord(fqdn="a.example.com", address="10.0.0.1", comment="x")
+    assert row_digest(first) != row_digest(third)
+
+
+def test_rename_columns_are_not_changes():
+    desired = ARecord(
+        fqdn="a.example.com", address="10.0.0.1", **{"_new_fqdn": "b.example.com"}
+    )
+    current = ARecord(fqdn="a.example.com", address="10.0.0.1")
+    assert "_new_fqdn" in to_dict(desired)
+    assert row_digest(desired) == row_digest(current)
+    for modify_action in ("M", "O"):
+        result = diff_models([desired], [current], modify_action=modify_action)
+        assert not result
+        assert result.unchanged == 1
+
+
+def test_diff_models():
+    current = [
+        ARecord(fqdn="a.example.com", address="10.0.0.1", view="default"),
+        ARecord(fqdn="b.example.com", address="10.0.0.2", comment="old"),
+        ARecord(fqdn="c.example.com", address="10.0.0.3", disabled=False),
+        ARecord(fqdn="gone.example.com", address="10.0.0.9"),
+    ]
+    desired = [
+        ARecord(fqdn="a.example.com", address="10.0.0.1"),
+        ARecord(fqdn="b.example.com", address="10.0.0.2", comment="new"),
+        ARecord(fqdn="c.example.com", address="10.0.0.3"),
+        ARecord(fqdn="d.example.com", address="10.0.0.4"),
+    ]
+    diff = diff_models(desired, current)
+    assert diff.summary() == {"insert": 1, "modify": 1, "delete": 1, "unchanged": 2}
+    assert [r.fqdn for r in diff.inserts] == ["d.example.com"]
+    assert [r.comment for r in diff.changes] == ["new"]
+    assert [r.fqdn for r in diff.deletes] == ["gone.example.com"]
+
+    override = diff_models(desired, current, modify_action="O")
+    assert sorted(r.fqdn for r in override.changes) == [
+        "b.example.com",
+        "c.example.com",
+    ]
+
+
+def test_diff_only_deletes_desired_types():
+    current = [
+        NetworkView(name="default"),
+        IPv4Network(address="10.0.0.0", netmask="255.255.255.0"),
+        ARecord(fqdn="a.example.com", address="10.0.0.1"),
+        ARecord(fqdn="gone.example.com", address="10.0.0.9"),
+        HostRecord(fqdn="h.example.com", addresses="10.0.0.10"),
+    ]
+    desired = [ARecord(fqdn="a.example.com", address="10.0.0.1")]
+    diff = diff_models(desired, current)
+    assert [r.fqdn for r in diff.deletes] == ["gone.example.com"]
+
+    diff = diff_models(desired, current, delete_types=["header-hostrecord"])
+    assert [r.fqdn for r in diff.deletes] == ["h.example.com"]
+    assert not diff_models([], current)
+
+
+def test_diff_write_and_files(tmp_path):
+    output_to_file(
+        filename="current",
+        data=[
+            ARecord(fqdn="a.example.com", address="10.0.0.1"),
+            ARecord(fqdn="gone.example.com", address="10.0.0.9"),
+        ],
+        output_dir=str(tmp_path),
+    )
+    output_to_file(
+        filename="desired",
+        data=[
+            ARecord(fqdn="a.example.com", address="10.0.0.1"),
+            ARecord(fqdn="new.example.com", address="10.0.0.2"),
+        ],
+        output_dir=str(tmp_path),
+    )
+    diff = diff_csv_files(str(tmp_path / "desired.csv"), str(tmp_path / "current.csv"))
+    assert diff
+    files = diff.write(output_dir=str(tmp_path))
+    assert files == [
+        str(tmp_path / "insert-arecord.csv"),
+        str(tmp_path / "delete-arecord.csv"),
+    ]
+    with open(files[1], newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert rows == [
+        {
+            "header-arecord": "arecord",
+            "import-action": "D",
+            "fqdn": "gone.example.com",
+            "address": "10.0.0.9",
+        }
+    ]
+    assert not diff_csv_files(
+        str(tmp_path / "desired.csv"), str(tmp_path / "desired.csv")
+    )
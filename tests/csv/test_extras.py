@@ -0,0 +1,106 @@
+from ibx_sdk.nios.csv.dns import AuthZone
+from ibx_sdk.nios.csv.dns_records import HostRecord
+from ibx_sdk.nios.csv.extras import ExtraColumns
+from ibx_sdk.nios.csv.table import ModelTable
+from ibx_sdk.nios.csv.util import output_to_file
+
+
+def test_extra_columns_sparse_rows():
+    extras = ExtraColumns()
+    first = extras.new_row()
+    second = extras.new_row()
+    extras.update(first, {"EA-Site": "HQ", "EA-Owner": "netops"})
+    extras.set(second, "EA-Site", "DC1")
+    extras.set(second, "EA-Owner", None)
+    extras.set(second, "ADMGRP-admins", "RW")
+    assert extras.rows == 2
+    assert list(extras) == ["EA-Site", "EA-Owner", "ADMGRP-admins"]
+    assert extras.row(first) == {"EA-Site": "HQ", "EA-Owner": "netops"}
+    assert extras.row(second) == {"EA-Site": "DC1", "ADMGRP-admins": "RW"}
+    assert extras.count("EA-Site") == 2
+    assert extras.count("EA-Missing") == 0
+    assert extras.header(prefix="EA-") == ["EA-Site", "EA-Owner"]
+    extras.set(first, "EA-Owner", None)
+    assert extras.header() == ["EA-Site", "ADMGRP-admins"]
+
+
+def test_extra_columns_from_models():
+    host = HostRecord(fqdn="a.example.com", addresses="10.0.0.1")
+    host.add_property("EA-Site", "HQ")
+    extras = ExtraColumns()
+    row = extras.add_model(host)
+    assert extras.row(row) == {"EA-Site": "HQ"}
+    assert host.__pydantic_extra__ == {"EA-Site": "HQ"}
+
+
+def test_shared_extra_columns(tmp_path):
+    extras = ExtraColumns()
+    hosts = []
+    zones = []
+    for i in range(6):
+        host = HostRecord(fqdn=f"h{i}.example.com", addresses=f"10.0.0.{i + 1}")
+        host.add_property(f"EA-Host{i % 3}", str(i))
+        hosts.append(host)
+        zone = AuthZone(fqdn=f"z{i}.example.com", zone_format="FORWARD")
+        if i % 2:
+            zone.add_property("EA-Zone", "yes")
+        zones.append(zone)
+    host_table = ModelTable.from_models(HostRecord, hosts, extras=extras)
+    zone_table = ModelTable.from_models(AuthZone, zones, extras=extras)
+
+    assert extras.rows == 12
+    assert extras.header() == ["EA-Host0", "EA-Host1", "EA-Host2", "EA-Zone"]
+    assert host_table.header()[-3:] == ["EA-Host0", "EA-Host1", "EA-Host2"]
+    assert "EA-Zone" not in host_table.header()
+    assert list(host_table) == hosts
+    assert list(zone_table) == zones
+
+    for name, items, table in (
+        ("hosts", hosts, host_table),
+        ("zones", zones, zone_table),
+    ):
+        output_to_file(filename=f"{name}-models", data=items, output_dir=str(tmp_path))
+        output_to_file(
+            filename=f"{name}-table", data=table, output_dir=str(tmp_path)
+        )
+        output_to_file(
+            filename=f"{name}-shared",
+            data=table,
+            output_dir=str(tmp_path),
+            extras=extras,
+        )
+        assert (tmp_path / f"{name}-models.csv").read_text() == (
+            tmp_path / f"{name}-table.csv"
+        ).read_text()
+        # a shared store only adds the columns used by the rows written
+        assert (tmp_path / f"{name}-shared.csv").read_text() == (
+            tmp_path / f"{name}-table.csv"
+        ).read_text()
+
+
+def test_writer_extra_columns_store(tmp_path):
+    extras = ExtraColumns()
+    extras.set(extras.new_row(), "EA-Site", "HQ")
+    hosts = [
+        HostRecord(fqdn=f"h{i}.example.com", addresses=f"10.0.0.{i + 1}")
+        for i in range(3)
+    ]
+    hosts[2].add_property("EA-Site", "DC1")
+    extras.add_models(hosts)
+    output_to_file(
+        filename="hosts", data=hosts[:2], output_dir=str(tmp_path), extras=extras
+    )
+    header = (tmp_path / "hosts.csv").read_text().splitlines()[0]
+    assert "EA-Site" not in header
+
+    # rows after the look-ahead may use any column of the store
+    output_to_file(
+        filename="stream",
+        data=iter(hosts),
+        output_dir=str(tmp_path),
+        extras=extras,
+        lookahead=1,
+    )
+    lines = (tmp_path / "stream.csv").read_text().splitlines()
+    assert lines[0].endswith(",EA-Site")
+    assert lines[3].endswith(",DC1")
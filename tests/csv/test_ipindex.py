@@ -0,0 +1,96 @@
+import pytest
+
+from ibx_sdk.nios.csv.dhcp import (
+    IPv4DhcpRange,
+    IPv4FixedAddress,
+    IPv4Network,
+    IPv4NetworkContainer,
+    IPv6DhcpRange,
+    IPv6FixedAddress,
+    IPv6Network,
+)
+from ibx_sdk.nios.csv.dns_records import ARecord
+from ibx_sdk.nios.csv.ipindex import IPIndex, validate_ip_space
+
+
+def network(address, netmask="255.255.255.0", **kwargs):
+    return IPv4Network(address=address, netmask=netmask, **kwargs)
+
+
+def kinds(violations):
+    return sorted((v.kind, str(v.interval)) for v in violations)
+
+
+def test_valid_dataset():
+    items = [
+        IPv4NetworkContainer(address="10.0.0.0", netmask="255.0.0.0"),
+        IPv4NetworkContainer(address="10.1.0.0", netmask="255.255.0.0"),
+        network("10.1.1.0"),
+        network("10.1.2.0"),
+        network("10.1.1.0", network_view="other"),
+        IPv4DhcpRange(start_address="10.1.1.10", end_address="10.1.1.20"),
+        IPv4DhcpRange(start_address="10.1.1.30", end_address="10.1.1.40"),
+        IPv4FixedAddress(ip_address="10.1.1.50", mac_address="00:11:22:33:44:55"),
+        IPv6Network(address="2001:db8::", cidr=64),
+        IPv6DhcpRange(start_address="2001:db8::10", end_address="2001:db8::ff"),
+        IPv6FixedAddress(ip_address="2001:db8::1:1", match_client="DUID", duid="01"),
+        ARecord(fqdn="a.example.com", address="10.9.9.9"),
+    ]
+    index = IPIndex(items)
+    assert len(index) == 11
+    assert index.validate() == []
+    assert index.network_views() == ["default", "other"]
+    assert index.find_network("10.1.2.7").address.exploded == "10.1.2.0"
+    assert index.find_network("10.1.3.7") is None
+    with pytest.raises(TypeError):
+        index.add(ARecord(fqdn="a.example.com", address="10.9.9.9"))
+
+
+def test_network_problems():
+    items = [
+        network("10.0.0.0", "255.255.0.0"),
+        network("10.0.1.0"),
+        IPv4NetworkContainer(address="10.0.0.0", netmask="255.255.255.0"),
+        IPv4NetworkContainer(address="10.4.0.0", netmask="255.255.0.0"),
+        network("10.4.0.0", "255.255.0.0"),
+        network("10.3.0.1"),
+    ]
+    assert kinds(validate_ip_space(items)) == [
+        ("container-in-network", "container 10.0.0.0/24"),
+        ("duplicate-network", "network 10.4.0.0/16"),
+        ("invalid-network", "network 0.0.0.0/32"),
+        ("network-overlap", "network 10.0.1.0/24"),
+    ]
+
+
+def test_range_and_fixed_address_problems():
+    items = [
+        network("10.0.0.0"),
+        IPv4DhcpRange(start_address="10.0.0.0", end_address="10.0.0.10"),
+        IPv4DhcpRange(start_address="10.0.0.5", end_address="10.0.0.20"),
+        IPv4DhcpRange(start_address="10.0.0.250", end_address="10.0.1.5"),
+        IPv4FixedAddress(ip_address="10.0.0.15", mac_address="00:11:22:33:44:55"),
+        IPv4FixedAddress(ip_address="10.0.5.1", mac_address="00:11:22:33:44:56"),
+        IPv6DhcpRange(start_address="2001:db8::10", end_address="2001:db8::ff"),
+    ]
+    # NIOS allows fixed addresses inside DHCP ranges, so they are not reported
+    # unless asked for
+    assert kinds(validate_ip_space(items)) == [
+        ("fixedaddress-outside-network", "fixedaddress 10.0.5.1"),
+        ("range-network-address", "range 10.0.0.0-10.0.0.10"),
+        ("range-outside-network", "range 10.0.0.250-10.0.1.5"),
+        ("range-outside-network", "range 2001:db8::10-2001:db8::ff"),
+        ("range-overlap", "range 10.0.0.5-10.0.0.20"),
+    ]
+    violations = validate_ip_space(items, fixed_in_range=True)
+    assert kinds(violations) == [
+        ("fixedaddress-in-range", "fixedaddress 10.0.0.15"),
+        ("fixedaddress-outside-network", "fixedaddress 10.0.5.1"),
+        ("range-network-address", "range 10.0.0.0-10.0.0.10"),
+        ("range-outside-network", "range 10.0.0.250-10.0.1.5"),
+        ("range-outside-network", "range 2001:db8::10-2001:db8::ff"),
+        ("range-overlap", "range 10.0.0.5-10.0.0.20"),
+    ]
+    in_range = [v for v in violations if v.kind == "fixedaddress-in-range"][0]
+    assert str(in_range.other) == "range 10.0.0.5-10.0.0.20"
+    assert in_range.message.startswith("default: ")
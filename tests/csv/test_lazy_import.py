@@ -0,0 +1,30 @@
+import subprocess
+import sys
+
+import pytest
+
+import ibx_sdk.nios.csv as csv_models
+from ibx_sdk.nios.csv import dhcp, dns_records
+
+
+def test_package_import_is_lazy():
+    code = (
+        "import sys, ibx_sdk.nios.csv\n"
+        "loaded = lambda: sorted(m for m in sys.modules if m.startswith(PREFIX))\n"
+        "assert loaded() == [], loaded()\n"
+        "from ibx_sdk.nios.csv import HostRecord\n"
+        "assert loaded() == [PREFIX + 'dns_records', PREFIX + 'enums'], loaded()\n"
+    )
+    code = "PREFIX = 'ibx_sdk.nios.csv.'\n" + code
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_public_names():
+    assert csv_models.NetworkView is dhcp.NetworkView
+    assert csv_models.HostRecord is dns_records.HostRecord
+    assert csv_models.dhcp is dhcp
+    for name in csv_models.__all__:
+        assert getattr(csv_models, name) is not None
+    assert set(csv_models.__all__) <= set(dir(csv_models))
+    with pytest.raises(AttributeError):
+        csv_models.NoSuchModel
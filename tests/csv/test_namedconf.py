@@ -0,0 +1,219 @@
+import os
+
+import pytest
+
+from ibx_sdk.nios.csv.dns import AuthZone, ForwardZone, StubZone
+from ibx_sdk.nios.csv.enums import ZoneFormatTypeEnum
+from ibx_sdk.nios.csv.namedconf import (
+    _INCLUDE_CACHE,
+    acl_address,
+    build_named_conf_models,
+    clear_include_cache,
+    parse_named_conf,
+    tokenize,
+)
+
+NAMED_CONF = """
+// main configuration
+options {
+    directory "/var/named";  # zone files
+    recursion no;
+};
+/* trusted clients
+   of the internal view */
+acl "internal" { 10.0.0.0/8; !10.9.0.0/16; key tsig-key; localhost; };
+acl trusted { internal; 192.168.1.1; };
+view "internal" {
+    match-clients { internal; };
+    recursion yes;
+    forwarders { 10.1.1.1; 10.1.1.2 port 5353; };
+    forward only;
+    include "zones.conf";
+};
+view "external" {
+    match-clients { any; };
+    include "zones.conf";
+    zone "example.net" { type forward; forwarders { 192.0.2.53; }; };
+};
+zone "." { type hint; file "named.ca"; };
+"""
+
+ZONES_CONF = """
+zone "example.com" IN {
+    type primary;
+    file "db.example.com";
+    allow-transfer { trusted; none; };
+};
+zone "10.in-addr.arpa" { type master; file "db.10"; };
+zone "stub.example.org." { type stub; masters { 192.0.2.1; 192.0.2.2 key k; }; };
+zone "copy.example.org" { type secondary; primaries { 192.0.2.3; }; };
+"""
+
+
+@pytest.fixture
+def named_conf(tmp_path):
+    (tmp_path / "zones.conf").write_text(ZONES_CONF)
+    path = tmp_path / "named.conf"
+    path.write_text(NAMED_CONF)
+    clear_include_cache()
+    yield str(path)
+    clear_include_cache()
+
+
+def test_tokenize():
+    text = 'zone "a b;{" { type x; }; // comment\n# other\n/* multi\nline */ x;'
+    assert list(tokenize(text)) == [
+        ("word", "zone"),
+        ("string", "a b;{"),
+        ("punct", "{"),
+        ("word", "type"),
+        ("word", "x"),
+        ("punct", ";"),
+        ("punct", "}"),
+        ("punct", ";"),
+        ("word", "x"),
+        ("punct", ";"),
+    ]
+
+
+def test_acl_address():
+    assert acl_address("10.0.0.0/8") == "10.0.0.0/8/Allow"
+    assert acl_address("! 10.0.0.1") == "10.0.0.1/Deny"
+    assert acl_address("any") == "Any/Allow"
+    assert acl_address("none") == "Any/Deny"
+    assert acl_address("!none") is None
+
+
+def test_none_address_lists(tmp_path):
+    path = tmp_path / "named.conf"
+    path.write_text(
+        'acl "a" { !none; 10.0.0.1; };\n'
+        'zone "closed.example" { type primary; allow-transfer { none; }; };\n'
+        'zone "open.example" { type primary; allow-transfer { !none; }; };\n'
+    )
+    result = build_named_conf_models(str(path))
+    assert [item.address for item in result.acl_items] == ["10.0.0.1/Allow"]
+    closed, still_closed = result.auth_zones
+    assert closed.allow_transfer == ["Any/Deny"]
+    assert still_closed.allow_transfer == []
+
+
+def test_parse_caches_includes(named_conf):
+    statements = parse_named_conf(named_conf)
+    assert [s.keyword for s in statements] == [
+        "options", "acl", "acl", "view", "view", "zone"
+    ]
+    internal = statements[3]
+    assert internal.args == ("internal",)
+    assert [s.args[0] for s in internal.block if s.keyword == "zone"] == [
+        "example.com",
+        "10.in-addr.arpa",
+        "stub.example.org.",
+        "copy.example.org",
+    ]
+    # zones.conf is parsed once although it is included twice
+    assert len(_INCLUDE_CACHE) == 2
+
+
+def test_parse_errors(tmp_path):
+    path = tmp_path / "loop.conf"
+    path.write_text('include "loop.conf";')
+    with pytest.raises(ValueError, match="include loop"):
+        parse_named_conf(str(path))
+    path.write_text("zone x { type primary }")
+    with pytest.raises(ValueError, match="missing ;"):
+        parse_named_conf(str(path))
+
+
+def test_build_models(named_conf, tmp_path):
+    result = build_named_conf_models(named_conf)
+
+    assert [acl.name for acl in result.acls] == ["internal", "trusted"]
+    items = [
+        (i.parent, i.address, i.tsig_key, i.defined_acl) for i in result.acl_items
+    ]
+    assert items == [
+        ("internal", "10.0.0.0/8/Allow", None, None),
+        ("internal", "10.9.0.0/16/Deny", None, None),
+        ("internal", "", "tsig-key", None),
+        ("trusted", "", None, "internal"),
+        ("trusted", "192.168.1.1/Allow", None, None),
+    ]
+
+    internal, external = result.views
+    assert internal.name == "internal"
+    assert internal.match_clients == ["internal/Allow"]
+    assert internal.recursion is True
+    assert internal.forwarders == ["10.1.1.1", "10.1.1.2"]
+    assert internal.forwarders_only is True
+    assert external.match_clients == ["Any/Allow"]
+    assert external.recursion is None
+
+    assert len(result.auth_zones) == 6
+    zone = result.auth_zones[0]
+    assert isinstance(zone, AuthZone)
+    assert (zone.fqdn, zone.view) == ("example.com", "internal")
+    assert zone.allow_transfer == ["trusted/Allow", "Any/Deny"]
+    assert result.auth_zones[1].zone_format == ZoneFormatTypeEnum.IPV4
+    assert result.zone_files[0] == (
+        "/var/named/db.example.com", "example.com", "internal"
+    )
+    assert len(result.zone_files) == 4
+    assert result.auth_zones[0].external_primaries is None
+    secondary = result.auth_zones[2]
+    assert (secondary.fqdn, secondary.view) == ("copy.example.org", "internal")
+    assert secondary.external_primaries == ["192.0.2.3/192.0.2.3/FALSE/FALSE"]
+    assert secondary.model_dump(by_alias=True)["external_primaries"] == (
+        "192.0.2.3/192.0.2.3/FALSE/FALSE"
+    )
+
+    (forward,) = result.forward_zones
+    assert isinstance(forward, ForwardZone)
+    assert (forward.fqdn, forward.view, forward.forward_to) == (
+        "example.net",
+        "external",
+        ["192.0.2.53"],
+    )
+    assert [(z.fqdn, z.stub_from) for z in result.stub_zones] == [
+        ("stub.example.org", ["192.0.2.1", "192.0.2.2"]),
+        ("stub.example.org", ["192.0.2.1", "192.0.2.2"]),
+    ]
+    assert isinstance(result.stub_zones[0], StubZone)
+    assert result.skipped == {"hint": 1}
+
+    models = list(result.models())
+    assert len(models) == 2 + 5 + 2 + 6 + 1 + 2
+
+    files = result.write(output_dir=str(tmp_path), file_prefix="bind")
+    assert [os.path.basename(f) for f in files] == [
+        "bind-namedacl.csv",
+        "bind-namedaclitem.csv",
+        "bind-view.csv",
+        "bind-authzone.csv",
+        "bind-forwardzone.csv",
+        "bind-stubzone.csv",
+    ]
+    with open(files[3]) as f:
+        lines = f.read().splitlines()
+    assert lines[0].startswith("header-authzone")
+    assert len(lines) == 7
+
+
+def test_zone_file_directory(named_conf, tmp_path):
+    result = build_named_conf_models(named_conf, directory=str(tmp_path))
+    assert result.zone_files[0][0] == str(tmp_path / "db.example.com")
+
+
+def test_zone_file_chroot(tmp_path):
+    conf = tmp_path / "etc" / "named.conf"
+    conf.parent.mkdir()
+    conf.write_text(
+        'options { directory "/var/named"; };\n'
+        'zone "a.example" { type primary; file "db.a"; };\n'
+        'zone "b.example" { type primary; file "/var/named/zones/db.b"; };\n'
+    )
+    result = build_named_conf_models(str(conf), chroot=str(tmp_path))
+    assert [path for path, _, _ in result.zone_files] == [
+        str(tmp_path / "var" / "named" / "db.a"),
+        str(tmp_path / "var" / "named" / "zones" / "db.b"),
+    ]
@@ -0,0 +1,99 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from ibx_sdk.nios.csv.bulk import validate_many
+from ibx_sdk.nios.csv.dns_records import ARecord
+from ibx_sdk.nios.csv.parallel import merge_headers, output_to_file_parallel
+from ibx_sdk.nios.csv.util import output_to_file
+
+
+def a_rows(count):
+    rows = []
+    for i in range(count):
+        row = {"fqdn": f"a{i}.example.com", "address": f"10.0.{i >> 8}.{i & 255}"}
+        if i >= count - 3:
+            row["EA-Site"] = "HQ"
+        if i % 7 == 0:
+            row["comment"] = "seven"
+        rows.append(row)
+    return rows
+
+
+def test_parallel_output_matches_single_file(tmp_path):
+    rows = a_rows(50)
+    rows[10]["address"] = "not-an-ip"
+    result = output_to_file_parallel(
+        filename="arecords",
+        model=ARecord,
+        rows=iter(rows),
+        import_action="I",
+        output_dir=str(tmp_path),
+        shard_size=8,
+        max_workers=2,
+    )
+    assert result.files == [str(tmp_path / "arecords.csv")]
+    assert result.rows == 49
+    assert list(result.errors) == [10]
+    assert result.errors[10][0]["loc"] == ("address",)
+
+    output_to_file(
+        filename="expected",
+        data=validate_many(ARecord, rows).valid,
+        import_action="I",
+        output_dir=str(tmp_path),
+    )
+    assert (tmp_path / "arecords.csv").read_text() == (
+        tmp_path / "expected.csv"
+    ).read_text()
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "arecords.csv",
+        "expected.csv",
+    ]
+
+
+def test_parallel_keeps_parts_with_merged_header(tmp_path):
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        result = output_to_file_parallel(
+            filename="arecords",
+            model=ARecord,
+            rows=a_rows(20),
+            output_dir=str(tmp_path),
+            shard_size=8,
+            concatenate=False,
+            executor=executor,
+        )
+    assert [f.rsplit("/", 1)[1] for f in result.files] == [
+        "arecords_part_0000.csv",
+        "arecords_part_0001.csv",
+        "arecords_part_0002.csv",
+    ]
+    assert result.rows == 20
+    assert result.header[-1] == "EA-Site"
+    for filename in result.files:
+        with open(filename) as f:
+            assert f.readline().strip() == ",".join(result.header)
+
+
+def test_parallel_empty_input(tmp_path):
+    result = output_to_file_parallel(
+        filename="arecords", model=ARecord, rows=[], output_dir=str(tmp_path)
+    )
+    assert result.files == [] and result.rows == 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_merge_headers():
+    header = merge_headers(
+        ARecord,
+        [
+            ["header-arecord", "address", "fqdn", "EA-Site"],
+            ["header-arecord", "import-action", "address", "comment", "fqdn"],
+        ],
+    )
+    assert header == [
+        "header-arecord",
+        "import-action",
+        "fqdn",
+        "address",
+        "comment",
+        "EA-Site",
+    ]
@@ -0,0 +1,79 @@
+import io
+
+import pytest
+
+from ibx_sdk.nios.csv.dhcp import IPv4FixedAddress, IPv4Network, NetworkView
+from ibx_sdk.nios.csv.dns import AuthZone, MemberDns, NsGroup
+from ibx_sdk.nios.csv.dns_records import ARecord, HostRecord
+from ibx_sdk.nios.csv.reader import CSV_MODEL_REGISTRY, get_model, read_csv
+from ibx_sdk.nios.csv.util import output_to_file
+
+GLOBAL_EXPORT = (
+    "header-networkview,name*,comment,EA-Site\n"
+    "networkview,nv1,first view,HQ\n"
+    "header-network,address*,netmask*,network_view,comment\n"
+    "network,10.0.0.0,255.255.255.0,nv1,\n"
+    "header-memberdns,parent*\n"
+    "memberdns,ns1.example.com\n"
+    "header-unknowntype,name*\n"
+    "unknowntype,x\n"
+    "header-hostrecord,fqdn*,view,addresses,ADMGRP-admins\n"
+    "hostrecord,h1.example.com,default,10.0.0.10,RW\n"
+    "header-arecord,fqdn*,address*,_new_fqdn\n"
+    "arecord,a.example.com,10.0.0.11,b.example.com\n"
+)
+
+
+def test_registry_covers_models():
+    assert get_model("header-hostrecord") is HostRecord
+    assert get_model("fixedaddress") is IPv4FixedAddress
+    assert get_model("authzone") is AuthZone
+    assert get_model("memberdns") is MemberDns
+    assert get_model("header-nsgroup") is NsGroup
+    assert len(CSV_MODEL_REGISTRY) == 54
+
+
+def test_read_global_export():
+    models = list(read_csv(io.StringIO(GLOBAL_EXPORT)))
+    assert [type(m) for m in models] == [
+        NetworkView, IPv4Network, MemberDns, HostRecord, ARecord
+    ]
+    view, network, member, host, record = models
+    assert member.parent == "ns1.example.com"
+    assert view.name == "nv1"
+    assert getattr(view, "EA-Site") == "HQ"
+    assert network.comment is None
+    assert str(host.addresses) == "10.0.0.10"
+    assert getattr(host, "ADMGRP-admins") == "RW"
+    assert record.new_fqdn == "b.example.com"
+
+
+def test_read_unknown_type_strict():
+    with pytest.raises(ValueError):
+        list(read_csv(io.StringIO(GLOBAL_EXPORT), skip_unknown=False))
+
+
+def test_read_invalid_rows():
+    data = (
+        "header-network,address*,netmask*\n"
+        "network,not-an-ip,255.255.255.0\n"
+        "network,10.0.1.0,255.255.255.0\n"
+    )
+    with pytest.raises(ValueError):
+        list(read_csv(io.StringIO(data)))
+    models = list(read_csv(io.StringIO(data), skip_invalid=True))
+    assert [str(m.address) for m in models] == ["10.0.1.0"]
+
+
+def test_read_requires_header():
+    with pytest.raises(ValueError):
+        list(read_csv(io.StringIO("network,10.0.1.0,255.255.255.0\n")))
+
+
+def test_round_trip(tmp_path):
+    networks = [
+        IPv4Network(address=f"10.0.{i}.0", netmask="255.255.255.0", comment=f"n{i}")
+        for i in range(3)
+    ]
+    output_to_file(filename="network", data=networks, output_dir=str(tmp_path))
+    assert list(read_csv(str(tmp_path / "network.csv"))) == networks
@@ -0,0 +1,81 @@
+from ipaddress import IPv4Address, IPv6Address
+
+import pytest
+
+from ibx_sdk.nios.csv.dns import AuthZone
+from ibx_sdk.nios.csv.dns_records import AAAARecord, ARecord, HostRecord, PTRRecord
+from ibx_sdk.nios.csv.enums import ZoneFormatTypeEnum
+from ibx_sdk.nios.csv.reverse import (
+    ReverseZoneLookup,
+    reverse_zone_name,
+    reverse_zone_prefix,
+    synthesize_ptr_records,
+)
+
+
+def test_reverse_zone_names():
+    assert reverse_zone_name(IPv4Address("10.1.2.3"), 24) == "2.1.10.in-addr.arpa"
+    assert reverse_zone_name(IPv4Address("10.1.2.3"), 8) == "10.in-addr.arpa"
+    assert (
+        reverse_zone_name(IPv6Address("2001:db8::1"), 32) == "8.b.d.0.1.0.0.2.ip6.arpa"
+    )
+    assert reverse_zone_prefix("2.1.10.in-addr.arpa.") == (4, 24)
+    assert reverse_zone_prefix("8.b.d.0.1.0.0.2.ip6.arpa") == (6, 32)
+    assert reverse_zone_prefix("example.com") is None
+    with pytest.raises(ValueError):
+        reverse_zone_name(IPv4Address("10.1.2.3"), 20)
+    with pytest.raises(ValueError):
+        ReverseZoneLookup(ipv6_prefix=66)
+
+
+def test_lookup_uses_most_specific_zone():
+    lookup = ReverseZoneLookup(
+        [
+            "10.in-addr.arpa",
+            "2.1.10.in-addr.arpa",
+            "0/26.3.1.10.in-addr.arpa",
+            AuthZone(fqdn="example.com", zone_format="FORWARD"),
+            AuthZone(fqdn="1.10.in-addr.arpa", zone_format="IPV4", view="internal"),
+        ]
+    )
+    assert lookup.zone(IPv4Address("10.1.2.3")) == "2.1.10.in-addr.arpa"
+    assert lookup.zone(IPv4Address("10.1.3.3")) == "10.in-addr.arpa"
+    assert lookup.zone(IPv4Address("10.1.3.3"), "internal") == "1.10.in-addr.arpa"
+    assert lookup.zone(IPv4Address("192.168.1.1")) == "1.168.192.in-addr.arpa"
+    assert list(lookup.missing) == [("default", "1.168.192.in-addr.arpa")]
+
+
+def test_synthesize_ptr_records():
+    records = [
+        ARecord(fqdn="a.example.com", address="10.1.2.3"),
+        ARecord(fqdn="b.example.com", address="10.1.2.4", view="internal"),
+        AAAARecord(fqdn="c.example.com", address="2001:db8::1"),
+        HostRecord(fqdn="h.example.com", addresses="10.1.2.5"),
+        HostRecord(
+            fqdn="nodns.example.com", addresses="10.1.2.6", configure_for_dns=False
+        ),
+    ]
+    zones = [AuthZone(fqdn="2.1.10.in-addr.arpa", zone_format="IPV4")]
+    result = synthesize_ptr_records(records, zones=zones, ipv6_prefix=32)
+
+    assert result.skipped == 1
+    assert list(result.records) == [
+        ("default", "2.1.10.in-addr.arpa"),
+        ("internal", "2.1.10.in-addr.arpa"),
+        ("default", "8.b.d.0.1.0.0.2.ip6.arpa"),
+    ]
+    ptrs = result.records[("default", "2.1.10.in-addr.arpa")]
+    assert [(p.fqdn, p.dname) for p in ptrs] == [
+        ("3.2.1.10.in-addr.arpa", "a.example.com"),
+        ("5.2.1.10.in-addr.arpa", "h.example.com"),
+    ]
+    assert all(isinstance(p, PTRRecord) for p in result.all_records())
+    assert len(result.all_records()) == 4
+    assert [
+        (z.fqdn, z.zone_format, z.view) for z in result.missing_zones
+    ] == [
+        ("2.1.10.in-addr.arpa", ZoneFormatTypeEnum.IPV4, "internal"),
+        ("8.b.d.0.1.0.0.2.ip6.arpa", ZoneFormatTypeEnum.IPV6, "default"),
+    ]
+    validated = PTRRecord.model_validate(ptrs[0].model_dump(by_alias=True))
+    assert validated.fqdn == ptrs[0].fqdn
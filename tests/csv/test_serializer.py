@@ -0,0 +1,82 @@
+import pytest
+from pydantic import BaseModel, model_serializer
+
+from ibx_sdk.nios.csv.dhcp import IPv4DhcpRange, IPv4Network, NetworkView
+from ibx_sdk.nios.csv.dns import AuthZone
+from ibx_sdk.nios.csv.dns_records import ARecord, HostRecord
+from ibx_sdk.nios.csv.enums import ImportActionEnum
+from ibx_sdk.nios.csv.other import NamedACLItem
+from ibx_sdk.nios.csv.serializer import serialization_plan, to_dict, to_row
+
+
+def samples():
+    network = IPv4Network(
+        address="10.0.0.0",
+        netmask="255.255.255.0",
+        dhcp_members=["m1.example.com", "m2.example.com"],
+        option_logic_filters=[],
+        import_action=ImportActionEnum.OVERRIDE,
+    )
+    network.add_property("EA-Site", "HQ")
+    record = ARecord(fqdn="a.example.com", address="10.0.0.1", _new_fqdn="b.example.com")
+    record.add_property("EA-Owner", "ops")
+    return [
+        network,
+        record,
+        NetworkView(name="nv1", comment="first"),
+        IPv4DhcpRange(
+            start_address="10.0.0.10",
+            end_address="10.0.0.20",
+            exclusion_ranges=["10.0.0.11-10.0.0.12"],
+        ),
+        AuthZone(
+            fqdn="example.com",
+            zone_format="FORWARD",
+            grid_primaries=["ns1.example.com/False"],
+        ),
+        HostRecord(fqdn="h.example.com", addresses="10.0.0.5"),
+        NamedACLItem(parent="acl1", address="10.0.0.0/8"),
+    ]
+
+
+@pytest.mark.parametrize("item", samples(), ids=lambda item: type(item).__name__)
+def test_dump_matches_model_dump(item):
+    assert to_dict(item) == item.model_dump(by_alias=True, exclude_none=True)
+    assert not serialization_plan(type(item)).fallback
+
+
+@pytest.mark.parametrize("item", samples(), ids=lambda item: type(item).__name__)
+def test_row_matches_dump(item):
+    dump = item.model_dump(by_alias=True, exclude_none=True)
+    header = tuple(dump) + ("unused",)
+    row = to_row(item, header)
+    assert len(row) == len(header)
+    assert row[-1] == ""
+    for column, value in zip(header, row):
+        expected = dump.get(column)
+        if expected is None:
+            assert value == ""
+        else:
+            assert value == getattr(expected, "value", expected)
+
+
+def test_row_missing_column():
+    record = ARecord(fqdn="a.example.com", address="10.0.0.1", comment="x")
+    with pytest.raises(ValueError):
+        to_row(record, ("header-arecord", "fqdn", "address"))
+    record.add_property("EA-Site", "HQ")
+    with pytest.raises(ValueError):
+        to_row(record, ("header-arecord", "fqdn", "address", "comment"))
+
+
+def test_model_serializer_falls_back():
+    class Custom(BaseModel):
+        name: str
+
+        @model_serializer
+        def serialize(self):
+            return {"header-custom": "custom", "name": self.name.upper()}
+
+    plan = serialization_plan(Custom)
+    assert plan.fallback
+    assert to_row(Custom(name="x"), ("header-custom", "name")) == ("custom", "X")
@@ -0,0 +1,97 @@
+import tracemalloc
+from ipaddress import IPv4Address
+
+import pytest
+
+from ibx_sdk.nios.csv.dhcp import IPv4DhcpRange
+from ibx_sdk.nios.csv.dns_records import ARecord, HostRecord, PTRRecord
+from ibx_sdk.nios.csv.enums import ImportActionEnum
+from ibx_sdk.nios.csv.table import ModelTable
+from ibx_sdk.nios.csv.util import output_to_file
+
+
+def host_records(count):
+    hosts = []
+    for i in range(count):
+        host = HostRecord(
+            fqdn=f"host{i}.example.com",
+            view="default",
+            addresses=f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}",
+            comment="migrated" if i % 3 else None,
+        )
+        if i % 2:
+            host.add_property("EA-Site", "HQ")
+        hosts.append(host)
+    return hosts
+
+
+def test_table_round_trip():
+    hosts = host_records(10)
+    table = ModelTable.from_models(HostRecord, hosts)
+    assert len(table) == 10
+    assert list(table) == hosts
+    assert table[-1] == hosts[-1]
+    assert isinstance(table[1].addresses, IPv4Address)
+    assert getattr(table[1], "EA-Site") == "HQ"
+    with pytest.raises(IndexError):
+        table.get(10)
+
+
+def test_table_rejects_other_models():
+    table = ModelTable(HostRecord)
+    with pytest.raises(TypeError):
+        table.append(ARecord(fqdn="a.example.com", address="10.0.0.1"))
+
+
+def test_table_output_identical(tmp_path):
+    hosts = host_records(20)
+    records = [
+        PTRRecord(
+            fqdn="1.0.0.10.in-addr.arpa",
+            dname=f"h{i}.example.com",
+            address=f"10.0.0.{i}",
+            import_action=ImportActionEnum.INSERT if i % 2 else None,
+        )
+        for i in range(1, 10)
+    ]
+    ranges = [
+        IPv4DhcpRange(
+            start_address="10.0.0.10",
+            end_address="10.0.0.20",
+            exclusion_ranges=["10.0.0.11-10.0.0.12"] if i % 2 else None,
+        )
+        for i in range(4)
+    ]
+    for name, model, items in (
+        ("hosts", HostRecord, hosts),
+        ("ptrs", PTRRecord, records),
+        ("ranges", IPv4DhcpRange, ranges),
+    ):
+        output_to_file(filename=f"{name}-models", data=items, output_dir=str(tmp_path))
+        output_to_file(
+            filename=f"{name}-table",
+            data=ModelTable.from_models(model, items),
+            output_dir=str(tmp_path),
+        )
+        assert (tmp_path / f"{name}-models.csv").read_text() == (
+            tmp_path / f"{name}-table.csv"
+        ).read_text()
+
+
+def test_table_rows_missing_column():
+    table = ModelTable.from_models(HostRecord, host_records(2))
+    with pytest.raises(ValueError):
+        list(table.rows(["header-hostrecord", "fqdn"]))
+
+
+def test_table_uses_less_memory():
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    hosts = host_records(2000)
+    models_size = tracemalloc.get_traced_memory()[0] - before
+    table = ModelTable.from_models(HostRecord, hosts)
+    del hosts
+    table_size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    assert len(table) == 2000
+    assert table_size * 3 < models_size
@@ -0,0 +1,84 @@
+import pytest
+
+from ibx_sdk.nios.csv.dhcp import NetworkView
+from ibx_sdk.nios.csv.dns_records import HostRecord
+from ibx_sdk.nios.csv.util import CsvModelWriter, get_header, output_to_file
+
+
+def network_views(count):
+    for i in range(count):
+        view = NetworkView(name=f"nv{i}")
+        if i % 2:
+            view.comment = f"view {i}"
+        if i == 3:
+            view.add_property("EA-Site", "HQ")
+        yield view
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        return f.read().splitlines()
+
+
+def test_get_header_unique_columns():
+    header = get_header(data=list(network_views(4)))
+    assert header == ["header-networkview", "name", "comment", "EA-Site"]
+
+
+def test_output_to_file_list(tmp_path):
+    rows = output_to_file(
+        filename="networkview",
+        data=list(network_views(4)),
+        import_action="I",
+        output_dir=str(tmp_path),
+    )
+    assert rows == 4
+    lines = read_lines(tmp_path / "networkview.csv")
+    assert lines[0] == "header-networkview,import-action,name,comment,EA-Site"
+    assert lines[1] == "networkview,I,nv0,,"
+    assert lines[4] == "networkview,I,nv3,view 3,HQ"
+
+
+def test_output_to_file_generator_orders_by_model_fields(tmp_path):
+    # the first row has no comment, the header still follows the field order
+    rows = output_to_file(
+        filename="networkview.csv", data=network_views(4), output_dir=str(tmp_path)
+    )
+    assert rows == 4
+    assert read_lines(tmp_path / "networkview.csv")[0] == (
+        "header-networkview,name,comment,EA-Site"
+    )
+
+
+def test_output_to_file_no_data(tmp_path):
+    assert output_to_file(filename="empty", data=iter([]), output_dir=str(tmp_path)) == 0
+    assert not (tmp_path / "empty.csv").exists()
+
+
+def test_writer_lookahead_declared_extras(tmp_path):
+    path = tmp_path / "views.csv"
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        with CsvModelWriter(f, lookahead=1, extras=["comment", "EA-Site"]) as writer:
+            writer.write_all(network_views(4))
+    assert writer.rows == 4
+    assert read_lines(path)[0] == "header-networkview,name,comment,EA-Site"
+
+
+def test_writer_unseen_column_after_lookahead(tmp_path):
+    with open(tmp_path / "views.csv", "w", encoding="utf-8", newline="") as f:
+        writer = CsvModelWriter(f, lookahead=1)
+        with pytest.raises(ValueError):
+            writer.write_all(network_views(4))
+
+
+def test_writer_declared_columns(tmp_path):
+    path = tmp_path / "hosts.csv"
+    host = HostRecord(fqdn="h1.example.com", view="default")
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        with CsvModelWriter(
+            f, columns=["header-hostrecord", "fqdn", "view", "configure_for_dns"]
+        ) as writer:
+            writer.write(host)
+    lines = read_lines(path)
+    assert lines[0] == "header-hostrecord,fqdn,view,configure_for_dns"
+    assert lines[1].startswith("hostrecord,h1.example.com,default")
@@ -0,0 +1,195 @@
+import csv
+import io
+from concurrent.futures import ThreadPoolExecutor
+from ipaddress import IPv4Address
+
+from ibx_sdk.nios.csv.dns_records import ARecord, MXRecord, TXTRecord
+from ibx_sdk.nios.csv.zonefile import (
+    ZoneEntry,
+    iter_zone_entries,
+    iter_zone_models,
+    zone_to_csv,
+    zones_to_csv,
+)
+
+ZONE = """$TTL 3600
+$ORIGIN example.com.
+@ IN SOA ns1 hostmaster (
+   1 ; serial
+   3600 600 86400 300 )
+  IN NS ns1
+  IN MX 10 mail
+ns1 300 IN A 10.0.0.1
+mail IN A 10.0.0.2 ; mail server
+www 3600 CNAME ns1
+txt IN TXT "a;  b" "c"
+_sip._tcp IN SRV 10 20 5060 sip
+sub.example.com. 60 IN AAAA 2001:db8::1
+bad IN A 10.0.0
+x IN HINFO "pc" "linux"
+"""
+
+CANONICAL = """example.org.\t86400\tIN\tSOA\tns.example.org. h.example.org. 1 2 3 4 5
+example.org.\t86400\tIN\tNS\tns.example.org.
+a.example.org.\t86400\tIN\tA\t10.1.0.1
+b.example.org.\t300\tIN\tA\t10.1.0.2
+"""
+
+
+def read_rows(filename):
+    with open(filename, newline="") as f:
+        return list(csv.reader(f))
+
+
+def test_iter_zone_entries():
+    entries = list(iter_zone_entries(io.StringIO(ZONE), "example.com"))
+    assert entries[0] == ZoneEntry(
+        "example.com",
+        None,
+        "SOA",
+        "ns1 hostmaster   1 3600 600 86400 300",
+        "example.com",
+    )
+    assert entries[2] == ZoneEntry("example.com", None, "MX", "10 mail", "example.com")
+    assert entries[3] == ZoneEntry(
+        "ns1.example.com", 300, "A", "10.0.0.1", "example.com"
+    )
+    assert entries[5] == ZoneEntry(
+        "www.example.com", 3600, "CNAME", "ns1", "example.com"
+    )
+    assert entries[6].rdata == '"a;  b" "c"'
+    assert entries[8] == ZoneEntry(
+        "sub.example.com", 60, "AAAA", "2001:db8::1", "example.com"
+    )
+
+
+def test_parentheses_inside_quotes():
+    zone = (
+        'spf IN TXT "v=spf1 include:x (note) -all"\n'
+        'open IN TXT "open ( paren"\n'
+        'multi IN TXT ( "a (b"\n'
+        '    "c" )\n'
+        "after IN A 10.0.0.9\n"
+    )
+    entries = list(iter_zone_entries(io.StringIO(zone), "example.com"))
+    assert [(e.name, e.rdata.strip()) for e in entries] == [
+        ("spf.example.com", '"v=spf1 include:x (note) -all"'),
+        ("open.example.com", '"open ( paren"'),
+        ("multi.example.com", '"a (b" "c"'),
+        ("after.example.com", "10.0.0.9"),
+    ]
+    models = list(iter_zone_models(io.StringIO(zone), "example.com"))
+    assert models[0].text == "v=spf1 include:x (note) -all"
+    assert str(models[-1].address) == "10.0.0.9"
+
+
+def test_iter_zone_models():
+    skipped = {}
+    errors = []
+    models = list(
+        iter_zone_models(
+            io.StringIO(ZONE),
+            "example.com",
+            view="internal",
+            default_ttl=3600,
+            skipped=skipped,
+            errors=errors,
+        )
+    )
+    assert skipped == {"SOA": 1, "NS": 1, "HINFO": 1}
+    assert len(errors) == 1 and errors[0].startswith("bad.example.com A")
+    assert [type(m).__name__ for m in models] == [
+        "MXRecord",
+        "ARecord",
+        "ARecord",
+        "CNAMERecord",
+        "TXTRecord",
+        "SRVRecord",
+        "AAAARecord",
+    ]
+    mx, a = models[0], models[1]
+    assert isinstance(mx, MXRecord) and mx.mx == "mail.example.com"
+    assert isinstance(a, ARecord) and a.address == IPv4Address("10.0.0.1")
+    assert a.ttl == 300 and a.view == "internal"
+    assert models[3].ttl is None
+    assert models[3].canonical_name == "ns1.example.com"
+    assert isinstance(models[4], TXTRecord) and models[4].text == '"a;  b" "c"'
+    assert ARecord.model_validate(a.model_dump(by_alias=True)) == a
+
+
+def test_origin_changes_rdata_names():
+    zone = (
+        "$ORIGIN example.com.\n"
+        "www IN CNAME host\n"
+        "$ORIGIN sub.example.com.\n"
+        "www IN CNAME host\n"
+        "@ IN MX 10 mail\n"
+        "abs IN CNAME target.example.net.\n"
+    )
+    entries = list(iter_zone_entries(io.StringIO(zone), "example.com"))
+    assert [entry.origin for entry in entries] == [
+        "example.com",
+        "sub.example.com",
+        "sub.example.com",
+        "sub.example.com",
+    ]
+    first, second, mx, absolute = iter_zone_models(io.StringIO(zone), "example.com")
+    assert (first.fqdn, first.canonical_name) == (
+        "www.example.com",
+        "host.example.com",
+    )
+    assert (second.fqdn, second.canonical_name) == (
+        "www.sub.example.com",
+        "host.sub.example.com",
+    )
+    assert (mx.fqdn, mx.mx) == ("sub.example.com", "mail.sub.example.com")
+    assert absolute.canonical_name == "target.example.net"
+
+
+def test_zone_to_csv(tmp_path):
+    zone_file = tmp_path / "example.db"
+    zone_file.write_text(ZONE)
+    result = zone_to_csv(
+        str(zone_file), "example.com", output_dir=str(tmp_path), import_action="I"
+    )
+    assert result.counts == {
+        "mxrecord": 1,
+        "arecord": 2,
+        "cnamerecord": 1,
+        "txtrecord": 1,
+        "srvrecord": 1,
+        "aaaarecord": 1,
+    }
+    assert read_rows(result.files["arecord"]) == [
+        ["header-arecord", "import-action", "fqdn", "view", "address", "ttl"],
+        ["arecord", "I", "ns1.example.com", "", "10.0.0.1", "300"],
+        ["arecord", "I", "mail.example.com", "", "10.0.0.2", ""],
+    ]
+
+
+def test_zones_to_csv(tmp_path):
+    (tmp_path / "example.db").write_text(ZONE)
+    (tmp_path / "example.org.db").write_text(CANONICAL)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        result = zones_to_csv(
+            [
+                (str(tmp_path / "example.db"), "example.com"),
+                (str(tmp_path / "example.org.db"), "example.org"),
+            ],
+            output_dir=str(tmp_path),
+            file_prefix="zones",
+            default_ttl=86400,
+            executor=executor,
+        )
+    assert result.counts["arecord"] == 4
+    assert result.skipped == {"SOA": 2, "NS": 2, "HINFO": 1}
+    rows = read_rows(tmp_path / "zones-arecord.csv")
+    assert rows[0] == ["header-arecord", "fqdn", "view", "address", "ttl"]
+    assert [row[1] for row in rows[1:]] == [
+        "ns1.example.com",
+        "mail.example.com",
+        "a.example.org",
+        "b.example.org",
+    ]
+    assert rows[3][4] == "" and rows[4][4] == "300"
+    assert sorted(p.name for p in tmp_path.iterdir() if p.is_dir()) == []
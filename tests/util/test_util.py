@@ -0,0 +1,204 @@
+import io
+import os
+
+import pytest
+
+from ibx_sdk.util import util
+
+COMPILEZONE_ERRORS = """zone example.com/IN: loading from master file db failed: bad
+dns_rdata_fromtext: {file}:3: near 'bad': bad dotted quad
+dns_master_load: {file}:5: unknown RR type
+zone example.com/IN: not loaded due to errors."""
+
+
+@pytest.fixture
+def fake_compilezone(monkeypatch):
+    """Replace named-compilezone with a check for lines containing 'bad'."""
+    calls = []
+
+    def compilezone(zone_name, zone_file, output_file, input_format="text"):
+        calls.append((zone_name, zone_file))
+        with open(zone_file, encoding="utf8") as f:
+            lines = f.read().splitlines()
+        errors = [number for number, line in enumerate(lines, 1) if "bad" in line]
+        if not errors:
+            with open(output_file, "w", encoding="utf8") as f:
+                f.write("\n".join(lines) + "\n")
+        # report only the first bad line, like a load failure stopping early
+        return errors[:1]
+
+    monkeypatch.setattr(util, "named_compilezone", compilezone)
+    return calls
+
+
+def test_parse_named_checkzone_log():
+    output = COMPILEZONE_ERRORS.format(file="db")
+    assert util._parse_named_checkzone_log(output) == [3, 5]
+
+
+def test_named_compilezone_batch(tmp_path, fake_compilezone):
+    good = tmp_path / "db.good"
+    good.write_text("a\nb\n")
+    broken = tmp_path / "db.broken"
+    broken.write_text("a\nbad 1\nc\nbad 2\n")
+    output_dir = tmp_path / "out"
+
+    results = util.named_compilezone_batch(
+        [("good.com", str(good)), ("broken.com.", str(broken))],
+        output_dir=str(output_dir),
+        max_workers=2,
+    )
+    assert [result.ok for result in results] == [True, False]
+    assert results[1].errors == [2]
+    assert results[1].attempts == 1
+    assert (output_dir / "db.good.com").exists()
+
+    results = util.named_compilezone_batch(
+        [("broken.com", str(broken), str(tmp_path / "broken.out"))], fix=True
+    )
+    (result,) = results
+    assert result.ok
+    assert result.removed == [[2], [3]]
+    assert result.attempts == 3
+    assert (tmp_path / "broken.out").read_text() == "a\nc\n"
+    # the original zone file is left untouched
+    assert broken.read_text() == "a\nbad 1\nc\nbad 2\n"
+
+    (result,) = util.named_compilezone_batch(
+        [("broken.com", str(broken), str(tmp_path / "broken.out"))],
+        fix=True,
+        max_retries=1,
+    )
+    assert result.errors == [3]
+    assert result.attempts == 2
+
+
+def test_named_compilezone_batch_duplicate_output(tmp_path, fake_compilezone):
+    zone = tmp_path / "db.example"
+    zone.write_text("a\n")
+    with pytest.raises(ValueError, match="output file"):
+        util.named_compilezone_batch(
+            [("example.com", str(zone)), ("example.com.", str(zone))],
+            output_dir=str(tmp_path),
+        )
+    assert fake_compilezone == []
+
+    results = util.named_compilezone_batch(
+        [
+            ("example.com", str(zone), str(tmp_path / "internal.db")),
+            ("example.com", str(zone), str(tmp_path / "external.db")),
+        ]
+    )
+    assert [result.ok for result in results] == [True, True]
+
+
+def test_named_compilezone_batch_input_format(tmp_path):
+    with pytest.raises(ValueError):
+        util.named_compilezone_batch([], output_dir=str(tmp_path), input_format="x")
+    assert not os.listdir(tmp_path)
+
+
+EXPORT = """header-networkview,name*,comment
+networkview,default,
+header-view,fqdn*,comment
+header-network,address*,netmask*
+network,10.0.0.0,255.0.0.0
+network,10.1.0.0,255.255.0.0
+networkview,other,second
+network,10.2.0.0,255.255.0.0
+"""
+
+
+def test_ibx_csv_file_split(tmp_path):
+    source = tmp_path / "export.csv"
+    source.write_text(EXPORT)
+    output_dir = tmp_path / "split"
+
+    files = util.ibx_csv_file_split(str(source), str(output_dir), max_open_files=1)
+    assert [os.path.basename(f) for f in files] == ["networkview.csv", "network.csv"]
+    assert (output_dir / "networkview.csv").read_text().splitlines() == [
+        "header-networkview,name*,comment",
+        "networkview,default,",
+        "networkview,other,second",
+    ]
+    assert len((output_dir / "network.csv").read_text().splitlines()) == 4
+    assert not (output_dir / "view.csv").exists()
+
+    files = util.ibx_csv_file_split(str(source), str(tmp_path / "chunks"), max_rows=2)
+    assert [os.path.basename(f) for f in files] == [
+        "networkview_0001.csv",
+        "network_0001.csv",
+        "network_0002.csv",
+    ]
+    assert (tmp_path / "chunks" / "network_0002.csv").read_text().splitlines() == [
+        "header-network,address*,netmask*",
+        "network,10.2.0.0,255.255.0.0",
+    ]
+
+
+def test_ibx_csv_file_split_errors(tmp_path):
+    source = tmp_path / "export.csv"
+    source.write_text("network,10.0.0.0,255.0.0.0\n")
+    with pytest.raises(ValueError, match="before its header row"):
+        util.ibx_csv_file_split(str(source), str(tmp_path))
+    with pytest.raises(ValueError):
+        util.ibx_csv_file_split(str(source), str(tmp_path), max_rows=0)
+
+
+def test_remove_lines_from_file(tmp_path):
+    source = tmp_path / "db.example"
+    source.write_text("a\nb\r\nc\nd\n")
+    output = tmp_path / "db.out"
+    util.remove_lines_from_file(str(source), (2, 4, 9), str(output))
+    assert output.read_bytes() == b"a\nc\n"
+    assert source.read_text() == "a\nb\nc\nd\n"
+
+    util.remove_lines_from_file(str(source), [1])
+    assert source.read_bytes() == b"b\r\nc\nd\n"
+    assert sorted(os.listdir(tmp_path)) == ["db.example", "db.out"]
+
+
+def test_remove_lines_from_files(tmp_path):
+    files = {}
+    for index in range(5):
+        path = tmp_path / f"db.{index}"
+        path.write_text("".join(f"{line}\n" for line in range(10)))
+        files[str(path)] = range(index + 1, 11)
+    util.remove_lines_from_files(files, max_workers=2)
+    for index in range(5):
+        lines = (tmp_path / f"db.{index}").read_text().splitlines()
+        assert lines == [str(line) for line in range(index)]
+
+
+def test_generate_from_includes(tmp_path):
+    etc = tmp_path / "etc"
+    etc.mkdir()
+    (etc / "named.conf").write_text(
+        'options { };\ninclude "/etc/acl.conf";\ninclude "/etc/zones.conf";\n'
+        'include "/etc/missing.conf";\ninclude "/etc/zones.conf";\n'
+    )
+    (etc / "acl.conf").write_text('acl a { any; };\n')
+    (etc / "zones.conf").write_text('zone "a" { };\n    include "/etc/more.conf";\n')
+    (etc / "more.conf").write_text('zone "b" { };\n')
+
+    expected = (
+        'options { };\nacl a { any; };\nzone "a" { };\nzone "b" { };\n'
+        'zone "a" { };\nzone "b" { };\n'
+    )
+    assert util.generate_from_includes(str(tmp_path), "/etc/named.conf") == expected
+
+    output = io.StringIO()
+    stats = util.write_from_includes(str(tmp_path) + "/", "etc/named.conf", output)
+    assert output.getvalue() == expected
+    assert (stats.files, stats.includes, stats.cache_hits) == (4, 5, 1)
+    assert stats.max_depth == 2
+    assert (stats.lines, stats.size) == (6, len(expected))
+
+
+def test_generate_from_includes_loop(tmp_path):
+    (tmp_path / "named.conf").write_text('include "/a.conf";\n')
+    (tmp_path / "a.conf").write_text('include "/b.conf";\n')
+    (tmp_path / "b.conf").write_text('include "/named.conf";\n')
+    with pytest.raises(ValueError, match="include loop"):
+        util.generate_from_includes(str(tmp_path), "named.conf")
+    assert util.generate_from_includes(str(tmp_path), "none.conf") == ""
@@ -10,6 +10,7 @@ import pytest
 import urllib3
 
 from ibx_sdk.nios.exceptions import WapiRequestException
+from ibx_sdk.nios.pipeline import GzipStage, HashStage
 
 log = logging.getLogger(__name__)
 
@@ -78,6 +79,14 @@ def test_wapi_csv_task_status(get_wapi):
         time.sleep(5)
 
 
+def test_wapi_wait_for_csvtask(get_wapi):
+    wapi = get_wapi
+    events = list(wapi.wait_for_csvtask(csvtask=CSV_TASK, fetch_errors=False))
+    assert events
+    assert events[-1].done is True
+    assert events[-1].status in ["COMPLETED", "STOPPED", "FAILED"]
+
+
 def test_wapi_get_csv_errors(get_wapi):
     wapi = get_wapi
     wapi.get_csv_errors_file(
@@ -146,6 +155,17 @@ def test_wapi_grid_backup(get_wapi):
     assert os.path.exists("database.bak")
 
 
+def test_wapi_grid_backup_pipeline(get_wapi):
+    wapi = get_wapi
+    result = wapi.grid_backup_pipeline(
+        stages=[GzipStage(), HashStage()], filename="database.bak.gz"
+    )
+    assert os.path.exists("database.bak.gz")
+    assert result.bytes_out == os.path.getsize("database.bak.gz")
+    assert "sha256" in result.results
+    os.remove("database.bak.gz")
+
+
 def test_wapi_grid_restore(get_wapi):
     wapi = get_wapi
     wapi.grid_restore()
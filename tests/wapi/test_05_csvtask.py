@@ -0,0 +1,428 @@
+"""
+CSV task waiter test module
+"""
+
+import csv
+import logging
+import os
+import tempfile
+
+import pytest
+
+from ibx_sdk.nios import fileop
+from ibx_sdk.nios.asynchronous import fileop as async_fileop
+from ibx_sdk.nios.csvtask import (
+    CsvImportError,
+    CsvImportErrors,
+    CsvTaskBackoff,
+    CsvTaskProgress,
+    count_csv_data_lines,
+    classify_csv_error,
+    csv_import_layer,
+    merge_csv_import_results,
+    parse_csv_errors_file,
+    plan_csv_import,
+    split_csv_import_file,
+)
+from ibx_sdk.nios.exceptions import WapiRequestException
+
+log = logging.getLogger(__name__)
+
+CSV_TASK = {
+    "csv_import_task": {
+        "_ref": "csvimporttask/b25lLmNzdl9pbXBvcnRfdGFzayQx:1",
+        "file_name": "networks.csv",
+        "import_id": 1,
+    }
+}
+
+
+def task_states(*states):
+    return [
+        {
+            "_ref": CSV_TASK["csv_import_task"]["_ref"],
+            "file_name": "networks.csv",
+            "import_id": 1,
+            "status": status,
+            "lines_processed": processed,
+            "lines_failed": failed,
+        }
+        for status, processed, failed in states
+    ]
+
+
+class FakeWapi(fileop.NiosFileopMixin):
+    def __init__(self, states, errors_dir):
+        self.states = list(states)
+        self.errors_dir = errors_dir
+        self.polls = 0
+
+    def csvtask_status(self, csvtask: dict) -> dict:
+        self.polls += 1
+        if len(self.states) > 1:
+            return self.states.pop(0)
+        return self.states[0]
+
+    def get_csv_errors_file(self, filename: str, job_id: str) -> str:
+        path = self.errors_dir / f"csv-errors-{filename}.csv"
+        with open(path, "w", encoding="utf8", newline="") as fh:
+            csv.writer(fh).writerow(["network", "10.0.1.0", "255.255.255.0"])
+        return str(path)
+
+
+class AsyncFakeWapi(async_fileop.NiosFileopMixin):
+    def __init__(self, states, errors_dir):
+        self.sync = FakeWapi(states, errors_dir)
+
+    async def csvtask_status(self, csvtask: dict) -> dict:
+        return self.sync.csvtask_status(csvtask)
+
+    async def get_csv_errors_file(self, filename: str, job_id: str) -> str:
+        return self.sync.get_csv_errors_file(filename, job_id)
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    delays = []
+    monkeypatch.setattr(fileop.time, "sleep", delays.append)
+
+    async def fake_async_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(async_fileop.asyncio, "sleep", fake_async_sleep)
+    return delays
+
+
+def test_backoff_grows_while_idle():
+    backoff = CsvTaskBackoff(min_interval=1.0, max_interval=10.0)
+    assert backoff.update(0, 0.0) == 1.0
+    assert backoff.update(0, 1.0) == 2.0
+    assert backoff.update(0, 3.0) == 4.0
+    assert backoff.update(0, 7.0) == 8.0
+    assert backoff.update(0, 15.0) == 10.0
+
+
+def test_backoff_first_delay_is_min_interval():
+    backoff = CsvTaskBackoff(min_interval=3.0, max_interval=60.0)
+    assert backoff.update(0, 0.0, lines_total=1000) == 3.0
+
+
+def test_backoff_tracks_rate_and_eta():
+    backoff = CsvTaskBackoff(min_interval=1.0, max_interval=60.0)
+    backoff.update(0, 0.0, lines_total=1000)
+    delay = backoff.update(100, 10.0, lines_total=1000)
+    assert backoff.rate == pytest.approx(10.0)
+    assert backoff.eta(100, 1000) == pytest.approx(90.0)
+    assert delay == pytest.approx(22.5)
+
+
+def test_backoff_invalid_bounds():
+    with pytest.raises(ValueError):
+        CsvTaskBackoff(min_interval=5.0, max_interval=1.0)
+
+
+def test_count_csv_data_lines(tmp_path):
+    path = tmp_path / "import.csv"
+    path.write_text(
+        "header-network,address,netmask\n"
+        "network,10.0.0.0,255.255.255.0\n"
+        "\n"
+        "network,10.0.1.0,255.255.255.0\n"
+    )
+    assert count_csv_data_lines(str(path)) == 2
+
+
+def test_wait_for_csvtask_completes(tmp_path, no_sleep):
+    wapi = FakeWapi(
+        task_states(
+            ("PENDING", 0, 0), ("RUNNING", 50, 0), ("COMPLETED", 100, 0)
+        ),
+        tmp_path,
+    )
+    events = list(wapi.wait_for_csvtask(CSV_TASK, lines_total=100))
+    assert [event.status for event in events] == [
+        "PENDING",
+        "RUNNING",
+        "COMPLETED",
+    ]
+    assert events[-1].done is True
+    assert events[-1].eta == 0.0
+    assert events[-1].error_log is None
+    assert len(no_sleep) == 2
+
+
+def test_wait_for_csvtask_fetches_errors(tmp_path, no_sleep):
+    wapi = FakeWapi(task_states(("COMPLETED", 2, 1)), tmp_path)
+    events = list(wapi.wait_for_csvtask(CSV_TASK))
+    assert len(events) == 1
+    assert events[0].errors_file.endswith("csv-errors-networks.csv.csv")
+    assert [e.data for e in events[0].error_log.errors] == [
+        ["network", "10.0.1.0", "255.255.255.0"]
+    ]
+
+
+def test_wait_for_csvtask_timeout(tmp_path, no_sleep):
+    wapi = FakeWapi(task_states(("RUNNING", 0, 0)), tmp_path)
+    with pytest.raises(WapiRequestException):
+        for _ in wapi.wait_for_csvtask(CSV_TASK, timeout=0):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_async_wait_for_csvtask(tmp_path, no_sleep):
+    wapi = AsyncFakeWapi(
+        task_states(("RUNNING", 10, 0), ("COMPLETED", 20, 1)), tmp_path
+    )
+    events = [event async for event in wapi.wait_for_csvtask(CSV_TASK)]
+    assert [event.status for event in events] == ["RUNNING", "COMPLETED"]
+    assert [e.data for e in events[-1].error_log.errors] == [
+        ["network", "10.0.1.0", "255.255.255.0"]
+    ]
+
+
+MIXED_CSV = (
+    "header-hostrecord,fqdn*,view\n"
+    "hostrecord,h1.example.com,default\n"
+    "hostrecord,h2.example.com,default\n"
+    "hostrecord,h3.example.com,default\n"
+    "header-network,address*,netmask*\n"
+    "network,10.0.0.0,255.255.255.0\n"
+    "header-networkview,name*\n"
+    "networkview,nv1\n"
+)
+
+
+class ImportWapi(fileop.NiosFileopMixin):
+    def __init__(self, failed=None):
+        self.failed = failed or {}
+        self.imported = []
+
+    def csv_import(self, task_operation, csv_import_file, exit_on_error=False):
+        self.imported.append(csv_import_file)
+        return {
+            "csv_import_task": {
+                "_ref": f"csvimporttask/{len(self.imported)}",
+                "file_name": csv_import_file,
+                "import_id": len(self.imported),
+            }
+        }
+
+    def csvtask_status(self, csvtask: dict) -> dict:
+        task = dict(csvtask["csv_import_task"])
+        lines = count_csv_data_lines(task["file_name"])
+        task.update(
+            status="COMPLETED",
+            lines_processed=lines,
+            lines_failed=self.failed.get(task["file_name"], 0),
+        )
+        return task
+
+    def get_csv_errors_file(self, filename: str, job_id: str) -> str:
+        path = f"{filename}.errors"
+        with open(path, "w", encoding="utf8", newline="") as fh:
+            csv.writer(fh).writerow(["error", filename])
+        return path
+
+
+class FailingImportWapi(ImportWapi):
+    def csvtask_status(self, csvtask: dict) -> dict:
+        task = super().csvtask_status(csvtask)
+        task["lines_failed"] = task["lines_processed"]
+        return task
+
+
+class AsyncImportWapi(async_fileop.NiosFileopMixin):
+    def __init__(self):
+        self.sync = ImportWapi()
+
+    async def csv_import(self, task_operation, csv_import_file, exit_on_error=False):
+        return self.sync.csv_import(task_operation, csv_import_file, exit_on_error)
+
+    async def csvtask_status(self, csvtask: dict) -> dict:
+        return self.sync.csvtask_status(csvtask)
+
+
+def test_csv_import_layer():
+    assert csv_import_layer("header-networkview") < csv_import_layer("network")
+    assert csv_import_layer("authzone") < csv_import_layer("arecord")
+    assert csv_import_layer("hostrecord") < csv_import_layer("hostaddress")
+    assert csv_import_layer("unknown") > csv_import_layer("ipv6hostaddress")
+
+
+def test_split_csv_import_file(tmp_path):
+    path = tmp_path / "mixed.csv"
+    path.write_text(MIXED_CSV)
+    chunks = split_csv_import_file(str(path), 2, str(tmp_path / "out"))
+    assert [(c.object_type, c.lines) for c in chunks] == [
+        ("hostrecord", 2),
+        ("hostrecord", 1),
+        ("network", 1),
+        ("networkview", 1),
+    ]
+    assert [c.rows for c in chunks] == [[2, 3], [4], [6], [8]]
+    assert chunks[0].source_row(3) == 3
+    assert chunks[1].source_row(2) == 4
+    assert chunks[1].source_row(3) is None
+    with open(chunks[1].filename, encoding="utf8") as fh:
+        assert fh.read().splitlines() == [
+            "header-hostrecord,fqdn*,view",
+            "hostrecord,h3.example.com,default",
+        ]
+    layers = plan_csv_import(chunks)
+    assert [[c.object_type for c in layer] for layer in layers] == [
+        ["networkview"],
+        ["network"],
+        ["hostrecord", "hostrecord"],
+    ]
+
+
+def test_split_csv_import_file_requires_header(tmp_path):
+    path = tmp_path / "bad.csv"
+    path.write_text("network,10.0.0.0,255.255.255.0\n")
+    with pytest.raises(ValueError):
+        split_csv_import_file(str(path), 10, str(tmp_path))
+
+
+def test_csv_import_parallel(tmp_path, no_sleep, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "mixed.csv"
+    path.write_text(MIXED_CSV)
+    wapi = ImportWapi()
+    report = wapi.csv_import_parallel(
+        "INSERT", str(path), max_rows=2, output_path=str(tmp_path / "out")
+    )
+    assert report.status == "COMPLETED"
+    assert report.lines_processed == 5
+    assert len(report.tasks) == 4
+    assert "networkview" in wapi.imported[0]
+    assert "network_" in wapi.imported[1]
+
+
+def test_csv_import_parallel_removes_temp_dir(tmp_path, no_sleep, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    temp = tmp_path / "temp"
+    temp.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(temp))
+    path = tmp_path / "mixed.csv"
+    path.write_text(MIXED_CSV)
+    wapi = ImportWapi()
+    report = wapi.csv_import_parallel("INSERT", str(path), max_rows=2)
+    assert report.lines_processed == 5
+    assert any(str(temp) in name for name in wapi.imported)
+    assert list(temp.iterdir()) == []
+
+    wapi = FailingImportWapi()
+    report = wapi.csv_import_parallel("INSERT", str(path), max_rows=2)
+    assert report.lines_failed == 5
+    # the chunk files are kept for the failed import
+    assert all(os.path.exists(task["filename"]) for task in report.tasks)
+
+
+def test_merge_csv_import_results_maps_rows(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "mixed.csv"
+    path.write_text(MIXED_CSV)
+    chunks = split_csv_import_file(str(path), 2, str(tmp_path / "out"))
+    results = []
+    for chunk in chunks[:2]:
+        error_log = CsvImportErrors()
+        error_log.add(CsvImportError(line=2, row=2, object_type="hostrecord"))
+        progress = CsvTaskProgress(
+            ref="csvimporttask/1",
+            status="COMPLETED",
+            lines_failed=1,
+            error_log=error_log,
+        )
+        results.append((chunk, progress))
+    report = merge_csv_import_results(str(path), results)
+    assert [error.row for error in report.error_log.errors] == [2, 4]
+    assert report.error_log.for_row(4) is report.error_log.errors[1]
+    assert report.error_log.for_row(3) is None
+
+
+def test_csv_import_parallel_exit_on_error(tmp_path, no_sleep, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "mixed.csv"
+    path.write_text(MIXED_CSV)
+    out = tmp_path / "out"
+    wapi = ImportWapi(failed={str(out / "mixed_network_0001.csv"): 1})
+    report = wapi.csv_import_parallel(
+        "INSERT", str(path), max_rows=2, exit_on_error=True, output_path=str(out)
+    )
+    assert report.status == "STOPPED"
+    assert report.lines_failed == 1
+    assert len(report.skipped) == 2
+    assert report.errors_file == "csv-errors-mixed.csv.csv"
+    assert [e.data for e in report.error_log.errors] == [
+        ["error", str(out / "mixed_network_0001.csv")]
+    ]
+    with open(report.errors_file, encoding="utf8") as fh:
+        assert fh.read() == f"error,{out / 'mixed_network_0001.csv'}\n"
+
+
+@pytest.mark.asyncio
+async def test_async_csv_import_parallel(tmp_path, no_sleep, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "mixed.csv"
+    path.write_text(MIXED_CSV)
+    wapi = AsyncImportWapi()
+    report = await wapi.csv_import_parallel(
+        "INSERT", str(path), max_rows=2, output_path=str(tmp_path / "out")
+    )
+    assert report.status == "COMPLETED"
+    assert report.lines_processed == 5
+    assert "networkview" in wapi.sync.imported[0]
+
+
+ERRORS_CSV = (
+    "header-network,address*,netmask*\n"
+    "3,network,10.0.0.0,255.255.255.0,Duplicate object '10.0.0.0/24' already exists.\n"
+    "7,network,10.0.1.0,255.255.255.0,Duplicate object '10.0.1.0/24' already exists.\n"
+    "header-hostrecord,fqdn*,view,Error\n"
+    "hostrecord,h1.example.com,nope,The view nope cannot be found.\n"
+)
+
+
+def test_classify_csv_error():
+    assert classify_csv_error("Duplicate object '10.0.0.0/24' at 12") == (
+        "Duplicate object <value> at <n>"
+    )
+    assert classify_csv_error("") == "unknown"
+
+
+def test_parse_csv_errors_file(tmp_path):
+    path = tmp_path / "csv-errors.csv"
+    path.write_text(ERRORS_CSV)
+    result = parse_csv_errors_file(str(path))
+    assert len(result.errors) == 3
+    assert result.classes() == {
+        "Duplicate object <value> already exists.": 2,
+        "The view nope cannot be found.": 1,
+    }
+    error = result.for_row(7)
+    assert error.object_type == "network"
+    assert error.data == ["network", "10.0.1.0", "255.255.255.0"]
+    assert error.message == "Duplicate object '10.0.1.0/24' already exists."
+    host = result.for_class("The view nope cannot be found.")[0]
+    assert host.row is None
+    assert host.header == ["header-hostrecord", "fqdn*", "view"]
+    assert result.for_row(1) is None
+
+
+def test_write_retry_csv(tmp_path):
+    path = tmp_path / "csv-errors.csv"
+    path.write_text(ERRORS_CSV)
+    result = parse_csv_errors_file(str(path))
+    retry = tmp_path / "retry.csv"
+    assert result.write_retry_csv(str(retry)) == 3
+    assert retry.read_text().splitlines() == [
+        "header-network,address*,netmask*",
+        "network,10.0.0.0,255.255.255.0",
+        "network,10.0.1.0,255.255.255.0",
+        "header-hostrecord,fqdn*,view",
+        "hostrecord,h1.example.com,nope",
+    ]
+    count = result.write_retry_csv(
+        str(retry), error_classes=["The view nope cannot be found."]
+    )
+    assert count == 1
@@ -0,0 +1,133 @@
+"""
+Streaming backup pipeline test module
+"""
+
+import gzip
+import hashlib
+import io
+from concurrent.futures import Future
+
+import pytest
+
+from ibx_sdk.nios import fileop
+from ibx_sdk.nios.asynchronous import fileop as async_fileop
+from ibx_sdk.nios.exceptions import WapiRequestException
+from ibx_sdk.nios.pipeline import (
+    GzipStage,
+    HashStage,
+    PipelineStage,
+    StreamPipeline,
+    ZstdStage,
+)
+
+DATA = [bytes([i % 251]) * 4096 for i in range(64)]
+
+
+class FailingStage(PipelineStage):
+    name = "failing"
+
+    def process(self, data: bytes) -> bytes:
+        raise RuntimeError("stage failed")
+
+
+class XorStage(PipelineStage):
+    name = "xor"
+
+    def process(self, data: bytes) -> bytes:
+        return bytes(b ^ 0x5A for b in data)
+
+
+class BackupWapi(fileop.NiosFileopMixin):
+    def _NiosFileopMixin__getgriddata(self, payload: dict) -> dict:
+        return {"token": "token", "url": "https://grid/backup"}
+
+    def _NiosFileopMixin__stream_download(self, download_url, pipeline, chunk_size):
+        pipeline.feed(b"abc")
+
+    def _NiosFileopMixin__download_complete(self, token: str, filename: str) -> None:
+        pass
+
+
+class AsyncBackupWapi(async_fileop.NiosFileopMixin):
+    async def _NiosFileopMixin__getgriddata(self, payload: dict) -> dict:
+        return {"token": "token", "url": "https://grid/backup"}
+
+    async def _NiosFileopMixin__stream_download(
+        self, download_url, pipeline, chunk_size
+    ):
+        pipeline.feed(b"abc")
+
+    async def _NiosFileopMixin__download_complete(
+        self, token: str, filename: str
+    ) -> None:
+        pass
+
+
+def test_pipeline_gzip_and_hash(tmp_path):
+    path = tmp_path / "backup.gz"
+    with StreamPipeline(
+        [HashStage(name="raw"), GzipStage(), HashStage()], str(path), max_pending=2
+    ) as pipeline:
+        for chunk in DATA:
+            pipeline.feed(chunk)
+    result = pipeline.result
+    raw = b"".join(DATA)
+    compressed = path.read_bytes()
+    assert gzip.decompress(compressed) == raw
+    assert result.bytes_in == len(raw)
+    assert result.bytes_out == len(compressed)
+    assert result.results["raw"] == hashlib.sha256(raw).hexdigest()
+    assert result.results["sha256"] == hashlib.sha256(compressed).hexdigest()
+
+
+def test_pipeline_custom_stage_and_sink():
+    sink = io.BytesIO()
+    pipeline = StreamPipeline([XorStage()], sink)
+    pipeline.feed(b"abc")
+    result = pipeline.close()
+    assert sink.getvalue() == bytes(b ^ 0x5A for b in b"abc")
+    assert result.filename is None
+    assert result.bytes_out == 3
+
+
+def test_pipeline_stage_error():
+    pipeline = StreamPipeline([FailingStage()], io.BytesIO())
+    pipeline.feed(b"abc")
+    with pytest.raises(RuntimeError):
+        pipeline.close()
+
+
+def test_pipeline_ignores_cancelled_futures():
+    pipeline = StreamPipeline([XorStage()], io.BytesIO())
+    future = Future()
+    future.cancel()
+    pipeline._slots.acquire()
+    pipeline._done(future)
+    pipeline.abort()
+    assert pipeline._error is None
+
+
+def test_grid_backup_pipeline_stage_error():
+    with pytest.raises(WapiRequestException):
+        BackupWapi().grid_backup_pipeline(stages=[FailingStage()], sink=io.BytesIO())
+    sink = io.BytesIO()
+    result = BackupWapi().grid_backup_pipeline(stages=[XorStage()], sink=sink)
+    assert result.bytes_out == 3
+
+
+@pytest.mark.asyncio
+async def test_async_grid_backup_pipeline_stage_error():
+    with pytest.raises(WapiRequestException):
+        await AsyncBackupWapi().grid_backup_pipeline(
+            stages=[FailingStage()], sink=io.BytesIO()
+        )
+
+
+def test_zstd_stage_roundtrip():
+    zstandard = pytest.importorskip("zstandard")
+    sink = io.BytesIO()
+    with StreamPipeline([ZstdStage()], sink) as pipeline:
+        for chunk in DATA:
+            pipeline.feed(chunk)
+    reader = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(sink.getvalue()))
+    assert reader.read() == b"".join(DATA)
@@ -0,0 +1,86 @@
+"""
+DHCP lease history parser test module
+"""
+
+import gzip
+import io
+import tarfile
+
+import pytest
+
+from ibx_sdk.nios.lease_history import (
+    LeaseIndex,
+    build_lease_index,
+    iter_lease_history,
+    normalize_mac,
+    parse_lease_time,
+)
+
+LEASES_CSV = (
+    "Time,Protocol,Lease State,IP Address,MAC/DUID,Client Hostname,"
+    "Lease Start,Lease End,Member,Fingerprint\n"
+    "2024-01-01 10:00:00 UTC,ipv4,Issued,10.0.0.10,00-11-22-33-44-55,pc1,"
+    "2024-01-01 10:00:00 UTC,2024-01-02 10:00:00 UTC,dhcp1.example.com,Windows\n"
+    "2024-01-01 11:00:00 UTC,ipv4,Issued,10.0.0.11,00:11:22:33:44:66,pc2,,,"
+    "dhcp1.example.com,\n"
+    "2024-01-01 12:00:00 UTC,ipv4,Freed,10.0.0.10,0011.2233.4455,pc1,,,"
+    "dhcp1.example.com,\n"
+)
+
+
+@pytest.fixture
+def lease_tar(tmp_path):
+    path = tmp_path / "leasehistory.tar.gz"
+    data = gzip.compress(LEASES_CSV.encode())
+    with tarfile.open(path, "w:gz") as archive:
+        info = tarfile.TarInfo("dhcp1/leasehistory.csv.gz")
+        info.size = len(data)
+        archive.addfile(info, io.BytesIO(data))
+    return str(path)
+
+
+def test_parse_lease_time():
+    assert parse_lease_time("1704103200") == 1704103200
+    assert parse_lease_time("2024-01-01 10:00:00 UTC") == 1704103200
+    assert parse_lease_time("2024-01-01T10:00:00Z") == 1704103200
+    assert parse_lease_time("") is None
+    assert parse_lease_time("never") is None
+
+
+def test_normalize_mac():
+    assert normalize_mac("00-11-22-33-44-55") == "00:11:22:33:44:55"
+    assert normalize_mac("0011.2233.4455") == "00:11:22:33:44:55"
+    assert normalize_mac("00:03:00:01:AA") == "00:03:00:01:aa"
+
+
+def test_iter_lease_history_plain(tmp_path):
+    path = tmp_path / "leases.csv"
+    path.write_text(LEASES_CSV)
+    events = list(iter_lease_history(str(path)))
+    assert len(events) == 3
+    first = events[0]
+    assert first.timestamp == 1704103200
+    assert first.action == "Issued"
+    assert first.ip == "10.0.0.10"
+    assert first.mac == "00:11:22:33:44:55"
+    assert first.end == 1704103200 + 86400
+    assert first.protocol == "IPV4"
+    assert events[1].start is None
+
+
+def test_iter_lease_history_tar(lease_tar):
+    events = list(iter_lease_history(lease_tar))
+    assert [event.ip for event in events] == ["10.0.0.10", "10.0.0.11", "10.0.0.10"]
+
+
+def test_lease_index_queries(lease_tar, tmp_path):
+    with build_lease_index(lease_tar, str(tmp_path / "leases.db")) as index:
+        assert index.count() == 3
+        by_ip = list(index.query(ip="10.0.0.10"))
+        assert [event.action for event in by_ip] == ["Issued", "Freed"]
+        by_mac = list(index.query(mac="00-11-22-33-44-55"))
+        assert len(by_mac) == 2
+        window = list(index.query(start=1704106800, end=1704110400))
+        assert [event.ip for event in window] == ["10.0.0.11"]
+    with LeaseIndex(str(tmp_path / "leases.db")) as index:
+        assert list(index.query(ip="10.0.0.11", limit=1))[0].hostname == "pc2"